@@ -2,7 +2,7 @@ import os
 import uuid
 
 from qfluentwidgets import (QConfig, ConfigItem, OptionsConfigItem, OptionsValidator,
-                            qconfig)
+                            RangeConfigItem, RangeValidator, qconfig)
 
 from src.py_qobject import PyQDict, PyQList
 
@@ -31,6 +31,9 @@ def getDefaultData() -> PyQDict:
 # path
 configPath = r"./config.json"
 dataPath = r"./data"
+databasePath = r"./data.db"
+journalPath = r"./data/sessions.jsonl"
+snapshotPath = r"./data/snapshot.pickle"
 logPath = r"./logs"
 resourcePath = r"./resources"
 
@@ -67,6 +70,16 @@ class Config(QConfig):
     onePomodoroTime = OptionsConfigItem("doThing", "onePomodoroTime", 25, OptionsValidator([15, 20, 25, 30]))
     pomodoroBreak = OptionsConfigItem("doThing", "pomodoroBreak", 5, OptionsValidator([0, 5, 10]))
     afterFourPomodoro = OptionsConfigItem("doThing", "afterFourPomodoro", 15, OptionsValidator([10, 15, 20, 25, 30]))
+    pageCacheSize = RangeConfigItem("doThing", "pageCacheSize", 8, RangeValidator(0, 64))  # pages
+    pageCacheMemory = RangeConfigItem("doThing", "pageCacheMemory", 16, RangeValidator(1, 512))  # MB
+
+    # data
+    dataBackend = OptionsConfigItem("data", "backend", "json", OptionsValidator(["json", "sqlite"]))
+    serializer = OptionsConfigItem("data", "serializer", "auto", OptionsValidator(["auto", "orjson", "json"]))
+    lazyLoad = ConfigItem("data", "lazyLoad", True)
+    dumpDebounce = RangeConfigItem("data", "dumpDebounce", 500, RangeValidator(0, 10000))  # ms
+    dumpMaxLatency = RangeConfigItem("data", "dumpMaxLatency", 5000, RangeValidator(0, 60000))  # ms
+    journalCompactInterval = RangeConfigItem("data", "journalCompactInterval", 10, RangeValidator(1, 1440))  # min
 
     # personalization
     language = OptionsConfigItem("personalization", "language", "English", OptionsValidator([
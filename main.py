@@ -7,7 +7,11 @@ from PySide6.QtWidgets import QApplication
 import config as cfg
 from log import logger
 from src.main import View as OneMoreThing
+from src.manager import SDManager
 from src.utils import getScreenScale, getScreenSize
+from src.utils.executor import ioExecutor
+from src.utils.journal import sessionJournal
+from src.utils.scheduler import dumpScheduler
 
 if __name__ == '__main__':
     screenWidth, screenHeight = getScreenSize()
@@ -33,5 +37,9 @@ if __name__ == '__main__':
     except Exception as e:
         logger.error(f"{e}")
     finally:
+        sessionJournal.flush(wait=True)
+        dumpScheduler.flush()
+        SDManager.saveSnapshot()
+        ioExecutor.shutdown()
         cfg.cfgDS.save()
         sys.exit()
@@ -1,160 +1,341 @@
-import gc
+import math
 import time
-from typing import Optional
+from collections import OrderedDict
+from typing import Any, Optional
 
-from PySide6.QtCore import Qt, Signal, QThread, QTimer, QEasingCurve
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QStackedWidget
-from qfluentwidgets import (ElevatedCardWidget, SubtitleLabel, IconWidget, TransparentPushButton, FlowLayout,
-                            BreadcrumbBar, SmoothScrollArea)
+from PySide6.QtCore import Qt, Signal, QTimer, QAbstractListModel, QModelIndex, QRect, QRectF, QSize
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QIcon, QMouseEvent, QPainter, QPixmap
+from PySide6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QStackedWidget, QListView, QStyledItemDelegate,
+                               QStyleOptionViewItem, QStyle)
+from qfluentwidgets import BreadcrumbBar, SearchLineEdit, SmoothScrollDelegate, getFont, isDarkTheme
 
+import config as cfg
 from log import logger
 from src.manager import SDManager
-from src.py_qobject import PyQDict, PyQList
+from src.py_qobject import PyQDict, PyQList, Change
+from src.utils.incremental import IncrementalLoader
 from src.widgets import OMThingIcon
 
-CARD_WIDTH = 240
-CARD_HEIGHT = 100
+CARD_SPACING = 5  # half of the gap between two cards
+CARD_WIDTH = 240 + 2 * CARD_SPACING
+CARD_HEIGHT = 100 + 2 * CARD_SPACING
+ROW_CHUNK = 64  # rows revealed at once, the first chunk fills the viewport
+PAGE_BYTES = 64 * 1024  # estimated size of an empty page
+ROW_BYTES = 256  # estimated size of a row in the view and the model
 
 
-class ProjectCard(ElevatedCardWidget):
-    def __init__(self, _dict: PyQDict, parent=None):
+class ProjectListModel(QAbstractListModel):
+    """ Projects of one page, rows are read without converting lazy sub items """
+    TimeRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, _list: PyQList, parent=None):
         super().__init__(parent)
-        self._dict = _dict
-        self.iconWidget = IconWidget(self)
-        self.name = SubtitleLabel(self)
-        self.timeBt = TransparentPushButton(self)
-        self.vLayout = QVBoxLayout(self)
+        self._list = _list
+        self._count = 0  # rows announced to the views, see revealRows
+        self._rows: Optional[dict[str, int]] = None  # uid -> row, rebuilt after structural changes
+        self._icons: dict[str, QIcon] = {}
+        self._removing = False
+        self._list.changed.connect(self.__onListChanged)
+        self._list.elementAboutToBeRemoved.connect(self.__onAboutToBeRemoved)
+        self._list.elementRemoved.connect(self.__onElementRemoved)
+        SDManager.changed.connect(self.__onChanged)
+        SDManager.totalsChanged.connect(self.__onTotalsChanged)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._count
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._list.list):
+            return None
+        item = self._list.list[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return item["name"]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.icon(item["icon"])
+        if role == Qt.ItemDataRole.UserRole:
+            return item["uid"]
+        if role == self.TimeRole:
+            return SDManager.index.totalHours(item["uid"])
+        return None
+
+    def icon(self, name: str) -> QIcon:
+        if name not in self._icons:
+            icon = OMThingIcon.deSerialization(name)
+            self._icons[name] = icon.qicon() if icon else QIcon()
+        return self._icons[name]
+
+    def revealRows(self, count: int) -> None:
+        """Announce the rows up to count to the views"""
+        count = min(count, len(self._list.list))
+        if count > self._count:
+            self.beginInsertRows(QModelIndex(), self._count, count - 1)
+            self._count = count
+            self.endInsertRows()
+
+    def resetRows(self) -> None:
+        """Show the list again from scratch, e.g. after it was replaced"""
+        self.beginResetModel()
+        self._rows = None
+        self._count = len(self._list.list)
+        self.endResetModel()
+
+    def nodeAt(self, row: int) -> PyQDict:
+        """PyQDict of row, it is converted if it is still lazy"""
+        return self._list[row]
+
+    def rowOf(self, uid: str) -> Optional[int]:
+        if self._rows is None:
+            self._rows = {item["uid"]: row for row, item in enumerate(self._list.list)}
+        return self._rows.get(uid)
+
+    def _updateRow(self, uid: str) -> None:
+        row = self.rowOf(uid)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def __onListChanged(self, change: Change):
+        if change.source is not self._list:
+            return
+        self._rows = None
+        key = change.path.rsplit("/", 1)[-1]
+        if change.op == "add" and key == "-":
+            # rows not revealed yet are left to revealRows
+            if self._count == len(self._list.list) - 1:
+                self.revealRows(self._count + 1)
+        elif change.op != "remove":
+            self.resetRows()
+
+    def __onAboutToBeRemoved(self, row: int):
+        if row < self._count:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            self._removing = True
+
+    def __onElementRemoved(self, _):
+        if self._removing:
+            self._removing = False
+            self._count -= 1
+            self.endRemoveRows()
+
+    def __onChanged(self, change: Change):
+        for c in (change.new if change.op == "batch" else (change,)):
+            source = c.source
+            if isinstance(source, PyQDict) and "uid" in source and (
+                    c.new is source or c.path.rsplit("/", 1)[-1] in ("name", "icon")):
+                self._updateRow(source["uid"])
+
+    def __onTotalsChanged(self, uid: str):
+        self._updateRow(uid)
+
+
+class ProjectCardDelegate(QStyledItemDelegate):
+    """ Paints a project as a card with its icon, name and total hours """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.nameFont = getFont(20, QFont.Weight.DemiBold)
+        self.nameMetrics = QFontMetrics(self.nameFont)
+        self.timeFont = getFont(14)
+        self._backgrounds: dict[tuple, QPixmap] = {}
+        self._icons: dict[tuple, QPixmap] = {}
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(CARD_WIDTH, CARD_HEIGHT)
+
+    @staticmethod
+    def cardRect(rect: QRect) -> QRect:
+        return rect.adjusted(CARD_SPACING, CARD_SPACING, -CARD_SPACING, -CARD_SPACING)
+
+    @classmethod
+    def timeRect(cls, rect: QRect) -> QRect:
+        card = cls.cardRect(rect)
+        return QRect(card.center().x() - CARD_WIDTH // 4, card.bottom() - 42, CARD_WIDTH // 2, 32)
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        dark = isDarkTheme()
+        hover = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        card = self.cardRect(option.rect)
+        painter.drawPixmap(card.topLeft(), self._background(card.size(), dark, hover, painter.device().devicePixelRatioF()))
+
+        # icon and name
+        top = card.top() + 13
+        iconRect = QRect(card.left() + 10, top, 32, 32)
+        icon: QIcon = index.data(Qt.ItemDataRole.DecorationRole)
+        if icon is not None and not icon.isNull():
+            painter.drawPixmap(iconRect, self._iconPixmap(icon, iconRect.size(), painter.device().devicePixelRatioF()))
+        nameRect = QRect(iconRect.right() + 10, top, card.right() - iconRect.right() - 20, 32)
+        painter.setFont(self.nameFont)
+        painter.setPen(Qt.GlobalColor.white if dark else Qt.GlobalColor.black)
+        name = self.nameMetrics.elidedText(index.data(), Qt.TextElideMode.ElideRight, nameRect.width())
+        painter.drawText(nameRect, Qt.AlignmentFlag.AlignCenter, name)
+
+        # total hours
+        painter.setFont(self.timeFont)
+        painter.drawText(self.timeRect(option.rect), Qt.AlignmentFlag.AlignCenter,
+                         f"{round(index.data(ProjectListModel.TimeRole), 2)} H")
+        painter.restore()
+
+    def _background(self, size: QSize, dark: bool, hover: bool, ratio: float) -> QPixmap:
+        # every card shares a few backgrounds, rounded antialiased rects are slow to paint
+        key = (size.width(), size.height(), dark, hover, ratio)
+        pixmap = self._backgrounds.get(key)
+        if pixmap is None:
+            pixmap = QPixmap(size * ratio)
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            if dark:
+                painter.setBrush(QColor(255, 255, 255, 21 if hover else 13))
+                painter.setPen(QColor(0, 0, 0, 48))
+            else:
+                painter.setBrush(QColor(255, 255, 255, 255 if hover else 170))
+                painter.setPen(QColor(0, 0, 0, 19))
+            painter.drawRoundedRect(QRectF(0.5, 0.5, size.width() - 1, size.height() - 1), 8, 8)
+            painter.end()
+            self._backgrounds[key] = pixmap
+        return pixmap
+
+    def _iconPixmap(self, icon: QIcon, size: QSize, ratio: float) -> QPixmap:
+        key = (icon.cacheKey(), ratio)
+        pixmap = self._icons.get(key)
+        if pixmap is None:
+            pixmap = icon.pixmap(size, ratio)
+            self._icons[key] = pixmap
+        return pixmap
+
+
+class ProjectPage(QListView):
+    """ Card grid of one level, only the visible cards are painted
+
+    The first rows, which cover the viewport, are shown at once. The others are
+    revealed by an IncrementalLoader a chunk at a time, so a large page never
+    blocks a frame.
+    """
+
+    def __init__(self, _list: PyQList, parent=None):
+        super().__init__(parent)
+        self._list = _list
+        self.projectModel = ProjectListModel(_list, self)
+        self.delegate = ProjectCardDelegate(self)
+        self.scrollDelegate = SmoothScrollDelegate(self)
+        self.loader = IncrementalLoader(self.__revealChunk, parent=self)
+        self._queuedRows = 0  # rows the revealed and queued chunks cover
 
         self.__initWidget()
+        self.__updateUI()
+        self._list.elementAppended.connect(self.__onElementAppended)
 
-    def resetText(self):
-        def getTotalTime(_dict: PyQDict):
-            return _dict["hours"] + sum([getTotalTime(d) for d in _dict.get("subItems", PyQList())])
+    def mouseReleaseEvent(self, e: QMouseEvent) -> None:
+        super().mouseReleaseEvent(e)
+        if e.button() != Qt.MouseButton.LeftButton:
+            return
+        index = self.indexAt(e.pos())
+        if not index.isValid() or not ProjectCardDelegate.cardRect(self.visualRect(index)).contains(e.pos()):
+            return
+        _dict = self.projectModel.nodeAt(index.row())
+        if ProjectCardDelegate.timeRect(self.visualRect(index)).contains(e.pos()):
+            self.timeBtClicked.emit(_dict)
+        else:
+            self.cardClicked.emit(_dict["uid"], _dict["name"], _dict["subItems"])
 
-        self.iconWidget.setIcon(OMThingIcon.deSerialization(self._dict["icon"]))
-        self.name.setText(self._dict["name"])
-        self.timeBt.setText(f"{getTotalTime(self._dict)} H")
+    @property
+    def list(self) -> PyQList:
+        return self._list
 
-    def __connectSignalToSlot(self):
-        self._dict.valueChanged.connect(self.resetText)
-        self.clicked.connect(self.__onCardClicked)
-        self.timeBt.clicked.connect(self.__onTimeBtClicked)
+    def estimatedMemory(self) -> int:
+        """Rough size of the page in bytes"""
+        return PAGE_BYTES + self.projectModel.rowCount() * ROW_BYTES
 
-    def __initWidget(self):
-        self.resetText()
-        self.iconWidget.setFixedSize(32, 32)
-        self.timeBt.setFixedWidth(CARD_WIDTH // 2)
-        self.setFixedSize(CARD_WIDTH, CARD_HEIGHT)
-        self.__initLayout()
-        self.__connectSignalToSlot()
+    def _setQss(self):
+        self.setStyleSheet("""QListView{background: transparent; border: none}""")
 
-    def __initLayout(self):
-        topLayout = QHBoxLayout()
-        topLayout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        topLayout.setSpacing(10)
-        topLayout.setContentsMargins(0, 0, 0, 0)
-        topLayout.addWidget(self.iconWidget, 0, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
-        topLayout.addWidget(self.name, 1, Qt.AlignmentFlag.AlignCenter)
-
-        bottomLayout = QHBoxLayout()
-        bottomLayout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        bottomLayout.setSpacing(10)
-        bottomLayout.setContentsMargins(0, 0, 0, 0)
-        bottomLayout.addWidget(self.timeBt)
-
-        self.vLayout.addLayout(topLayout)
-        self.vLayout.addLayout(bottomLayout)
-        self.vLayout.setSpacing(10)
-        self.vLayout.setContentsMargins(10, 10, 10, 10)
-        self.vLayout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-    def __onCardClicked(self):
-        self.cardClicked.emit(self._dict["uid"], self._dict["name"], self._dict["subItems"])
-
-    def __onTimeBtClicked(self):
-        self.timeBtClicked.emit(self._dict)
+    def __revealChunk(self, _):
+        self.projectModel.revealRows(self.projectModel.rowCount() + ROW_CHUNK)
+
+    def __onElementAppended(self, _):
+        # a row appended while chunks are still revealed would be left out
+        count = len(self._list.list)
+        if count > self._queuedRows and self.projectModel.rowCount() < count:
+            self._queuedRows += ROW_CHUNK
+            self.loader.add((None,))
+
+    def __updateUI(self):
+        self.projectModel.revealRows(ROW_CHUNK)
+        chunks = max(1, math.ceil(len(self._list.list) / ROW_CHUNK))
+        self._queuedRows = chunks * ROW_CHUNK
+        self.loader.add(range(chunks - 1))
+
+    def __initWidget(self):
+        self.setModel(self.projectModel)
+        self.setItemDelegate(self.delegate)
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(256)
+        self.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setMouseTracking(True)
+        self._setQss()
 
     cardClicked = Signal(str, str, PyQList)
     timeBtClicked = Signal(PyQDict)
 
 
-class ProjectPage(SmoothScrollArea):
-    def __init__(self, _list: PyQList, parent=None):
-        super().__init__(parent)
-        self.view = QWidget(self)
-        self.flowLayout = FlowLayout(self.view)
-        self._list = _list
-        self._map: dict[PyQDict, ProjectCard] = {}
+class ProjectPageCache:
+    """ LRU cache of the pages left through the breadcrumb
 
-        # customize scroll animation
-        self.setScrollAnimation(Qt.Orientation.Vertical, 400, QEasingCurve.OutQuint)
-        self.setScrollAnimation(Qt.Orientation.Horizontal, 400, QEasingCurve.OutQuint)
+    A cached page is hidden but stays connected, so it is up to date when it is
+    shown again. The cache is bounded by ``pageCacheSize`` pages and by the
+    estimated memory of the pages, ``pageCacheMemory`` MB.
+    """
 
-        self._setQss()
-        self.__initWidget()
+    def __init__(self):
+        self._pages: OrderedDict[str, ProjectPage] = OrderedDict()
 
-    def addWidget(self, obj: PyQDict):
-        if not isinstance(obj, PyQDict):
-            logger.error(f"Type of accident: {type(obj)}")
-            return
-        w = ProjectCard(obj, self)
-        self.flowLayout.addWidget(w)
-        self._map[obj] = w
-        w.cardClicked.connect(self.cardClicked)
-        w.timeBtClicked.connect(self.timeBtClicked)
-
-    def removeWidget(self, obj: PyQDict):
-        if not isinstance(obj, PyQDict):
-            logger.error(f"Type of accident: {type(obj)}")
-            return
-        w = self._map.pop(obj)
-        self.flowLayout.removeWidget(w)
-        w.deleteLater()
+    def __contains__(self, routeKey: str) -> bool:
+        return routeKey in self._pages
 
-    def _setQss(self):
-        self.setStyleSheet("""QScrollArea{background: transparent; border: none}""")
-        self.view.setStyleSheet("""QWidget {background: transparent;}""")
+    def __len__(self) -> int:
+        return len(self._pages)
 
-    def __connectSignalToSlot(self):
-        self._list.elementRemoved.connect(self.removeWidget)
-        self._list.elementAppended.connect(self.addWidget)
-        self.onAddWidget.connect(self.addWidget)
+    def put(self, routeKey: str, page: "ProjectPage") -> None:
+        self._pages[routeKey] = page
+        self._pages.move_to_end(routeKey)
+        self._evict()
 
-    def __initWidget(self):
-        self.setWidget(self.view)
-        self.setWidgetResizable(True)
-        self.__initLayout()
-        self.__connectSignalToSlot()
-        self.__updateUI()
+    def take(self, routeKey: str, datas: PyQList) -> Optional["ProjectPage"]:
+        """Cached page of routeKey, None if there is none for datas"""
+        page = self._pages.pop(routeKey, None)
+        if page is not None and page.list is not datas:
+            # the sub items were replaced since the page was built
+            self._drop(page)
+            page = None
+        return page
 
-    def __initLayout(self):
-        self.flowLayout.setHorizontalSpacing(10)
-        self.flowLayout.setVerticalSpacing(10)
+    def clear(self) -> None:
+        while self._pages:
+            self._drop(self._pages.popitem(last=False)[1])
 
-    def __updateUI(self):
-        if len(self._list) <= 100:
-            for d in self._list:
-                self.addWidget(d)
-        else:
-            class Worker(QThread):
-                def __init__(self, _list, signal):
-                    super().__init__(None)
-                    self.list = _list
-                    self.signal = signal
-
-                def run(self) -> None:
-                    for _dict in self.list:
-                        self.signal.emit(_dict)
-                        time.sleep(0.05)
-                    self.finished.emit()
-
-            self.worker = Worker(self._list, self.onAddWidget)
-            self.worker.finished.connect(self.worker.deleteLater)
-            self.worker.start()
-
-    onAddWidget = Signal(object)
-    cardClicked = Signal(str, str, PyQList)
-    timeBtClicked = Signal(PyQDict)
+    def memory(self) -> int:
+        return sum(page.estimatedMemory() for page in self._pages.values())
+
+    def _evict(self) -> None:
+        maxPages = cfg.cfgDS.pageCacheSize.value
+        maxMemory = cfg.cfgDS.pageCacheMemory.value * 1024 * 1024
+        while self._pages and (len(self._pages) > maxPages or self.memory() > maxMemory):
+            routeKey, page = self._pages.popitem(last=False)
+            logger.debug(f"Page {routeKey} evicted")
+            self._drop(page)
+
+    @staticmethod
+    def _drop(page: "ProjectPage") -> None:
+        page.loader.cancel()
+        page.deleteLater()
 
 
 class ChoiceProjectPage(QWidget):
@@ -164,14 +345,22 @@ class ChoiceProjectPage(QWidget):
         start = time.time()
         self._dict: dict[str, ProjectPage] = {}
         self._rootPyQList = PyQList()
-        self._rootPyQList.replaceList([d.storage.dict for d in SDManager.datas])
+        self._resultPyQList = PyQList()
         self.breadcrumb = BreadcrumbBar(self)
+        self.searchEdit = SearchLineEdit(self)
+        self.searchTimer = QTimer(self)
         self.view = QStackedWidget(self)
+        self.resultPage = ProjectPage(self._resultPyQList, self)
+        self.stack = QStackedWidget(self)
+        self.hLayout = QHBoxLayout()
         self.vLayout = QVBoxLayout(self)
-        self.gcTimer: Optional[QTimer] = None
+        self.pageCache = ProjectPageCache()
 
         self.__initWidget()
-        self.addPage("root", "Main", self._rootPyQList)
+        if SDManager.isLoaded():
+            self.__initRootPage()
+        else:
+            SDManager.dataLoaded.connect(self.__initRootPage)
         logger.info(f"ChoiceProjectPage Initialization time: {time.time() - start}")
         logger.debug("---ChoiceProjectPage initialized---")
 
@@ -182,13 +371,17 @@ class ChoiceProjectPage(QWidget):
         if not datas:
             logger.debug(f"Page data is empty")
             return
-        page = ProjectPage(datas, self)
+        page = self.pageCache.take(routeKey, datas)
+        if page is None:
+            page = ProjectPage(datas, self)
+            page.cardClicked.connect(self.addPage)
+            page.timeBtClicked.connect(self.timeBtClicked)
+            logger.debug(f"Page {routeKey} added")
+        else:
+            logger.debug(f"Page {routeKey} taken from cache")
         self.view.addWidget(page)
         self._dict[routeKey] = page
         self.breadcrumb.addItem(routeKey, name)
-        page.cardClicked.connect(self.addPage)
-        page.timeBtClicked.connect(self.timeBtClicked)
-        logger.debug(f"Page {routeKey} added")
 
     def removePage(self, routeKey: str):
         if routeKey not in self._dict:
@@ -196,13 +389,24 @@ class ChoiceProjectPage(QWidget):
             return
         page = self._dict.pop(routeKey)
         self.view.removeWidget(page)
-        page.deleteLater()
-        self.gcTimer = QTimer()
-        self.gcTimer.timeout.connect(gc.collect)
-        self.gcTimer.setSingleShot(True)
-        self.gcTimer.start(500)
+        self.pageCache.put(routeKey, page)
         logger.debug(f"Page {routeKey} removed")
 
+    def search(self, text: str):
+        if not text.strip():
+            self.stack.setCurrentWidget(self.view)
+            return
+        # the results stay owned by their trees
+        self._resultPyQList.replaceList([SDManager.findNode(uid) for uid in SDManager.search(text)], adopt=False)
+        self.stack.setCurrentWidget(self.resultPage)
+
+    def reveal(self, uid: str):
+        """Open the pages down to uid, a project without sub items is shown on its parent's page"""
+        self.breadcrumb.setCurrentIndex(0)
+        for entry in SDManager.index.ancestors(uid) + [SDManager.index.entry(uid)]:
+            node = SDManager.findNode(entry.uid)
+            self.addPage(entry.uid, node["name"], node["subItems"])
+
     def setCurrentPage(self, index: int):
         logger.debug(f"Set current index to {index}")
         self.view.setCurrentIndex(index)
@@ -211,8 +415,22 @@ class ChoiceProjectPage(QWidget):
         for key in deleteKeys:
             self.removePage(key)
 
+    def __initRootPage(self):
+        self._rootPyQList.replaceList([d.storage.dict for d in SDManager.datas])
+        self.addPage("root", "Main", self._rootPyQList)
+
+    def __onResultClicked(self, uid: str, name: str, datas: PyQList):
+        self.searchEdit.clear()
+        self.stack.setCurrentWidget(self.view)
+        self.reveal(uid)
+
     def __connectSignalToSlot(self):
         self.breadcrumb.currentIndexChanged.connect(self.setCurrentPage)
+        self.searchEdit.textChanged.connect(lambda: self.searchTimer.start())
+        self.searchEdit.searchSignal.connect(self.search)
+        self.searchTimer.timeout.connect(lambda: self.search(self.searchEdit.text()))
+        self.resultPage.cardClicked.connect(self.__onResultClicked)
+        self.resultPage.timeBtClicked.connect(self.timeBtClicked)
         SDManager.dataRemoved.connect(lambda data: self._rootPyQList.remove(data.storage.dict))
         SDManager.dataAdded.connect(lambda data: self._rootPyQList.append(data.storage.dict))
 
@@ -220,13 +438,22 @@ class ChoiceProjectPage(QWidget):
         font = self.breadcrumb.font()
         font.setPixelSize(20)
         self.breadcrumb.setFont(font)
+        self.searchEdit.setPlaceholderText("Search projects")
+        self.searchEdit.setFixedWidth(240)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(150)
+        self.stack.addWidget(self.view)
+        self.stack.addWidget(self.resultPage)
 
         self.__initLayout()
         self.__connectSignalToSlot()
 
     def __initLayout(self):
-        self.vLayout.addWidget(self.breadcrumb)
-        self.vLayout.addWidget(self.view)
+        self.hLayout.addWidget(self.breadcrumb, 1)
+        self.hLayout.addWidget(self.searchEdit)
+        self.hLayout.setContentsMargins(0, 0, 10, 0)
+        self.vLayout.addLayout(self.hLayout)
+        self.vLayout.addWidget(self.stack)
         self.vLayout.setContentsMargins(0, 0, 0, 0)
         self.vLayout.setSpacing(0)
         self.vLayout.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
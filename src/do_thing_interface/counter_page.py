@@ -3,8 +3,8 @@ import time
 from typing import Optional
 
 from PySide6.QtMultimedia import QMediaPlayer
-from PySide6.QtCore import QTimer, Qt, Signal, QObject, QUrl
-from PySide6.QtGui import QColor, QPaintEvent, QPainter, QImage
+from PySide6.QtCore import Qt, Signal, QObject, QUrl, QRectF
+from PySide6.QtGui import QColor, QPaintEvent, QPainter, QImage, QPixmap
 from PySide6.QtWidgets import QVBoxLayout, QWidget, QHBoxLayout, QFrame, QSpacerItem, QSizePolicy
 from qfluentwidgets import (ToolButton, FluentIcon, SwitchButton, StateToolTip, BodyLabel)
 from qframelesswindow import TitleBarBase
@@ -13,7 +13,10 @@ import config as cfg
 from config import cfgDS
 from log import logger
 from src.py_qobject import PyQDict
-from src.widgets import (TimePicker, getNextHour, getNextMinute, getNextSecond, Music, TimerLabel)
+from src.utils.clock import ClockEngine, splitSeconds
+from src.utils.image_loader import imageLoader, screenImageSize
+from src.utils.journal import sessionJournal
+from src.widgets import (TimePicker, Music, TimerLabel, ClockFace, isExposed)
 
 PlaybackState = QMediaPlayer.PlaybackState
 dataStorage = cfgDS
@@ -69,47 +72,83 @@ class MyWindow(QFrame):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._backgroundImage = None
+        self._backgroundKey = None  # cache key of the image waited for
+        self._backgroundPixmap = None  # the image scaled to the device pixels of the window
         self._backgroundColor = QColor("#e6e6e6")
         self.titleBar = self.TitleBar(self)
         self.titleBar.raise_()
         self.setWindowFlag(Qt.WindowType.FramelessWindowHint)
+        imageLoader.loaded.connect(self._onImageLoaded)
 
     def resizeEvent(self, e) -> None:
         super().resizeEvent(e)
         self.titleBar.resize(self.width(), self.titleBar.height())
 
     def paintEvent(self, e: QPaintEvent) -> None:
-        rect = self.rect()
+        rect = e.rect()
         painter = QPainter(self)
-
-        painter.setRenderHints(QPainter.RenderHint.Antialiasing)
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.setBrush(self._backgroundColor)
-
-        painter.drawRect(rect)
-        if self._backgroundImage is not None:
-            painter.drawImage(rect, self._backgroundImage)
+        pixmap = self._scaledBackground()
+        if pixmap is None:
+            painter.fillRect(rect, self._backgroundColor)
+            return
+        # blit only the repainted part, the pixmap already has the size of the window
+        dpr = pixmap.devicePixelRatio()
+        painter.drawPixmap(rect, pixmap, QRectF(rect.x() * dpr, rect.y() * dpr,
+                                                rect.width() * dpr, rect.height() * dpr).toRect())
+
+    def _scaledBackground(self) -> Optional[QPixmap]:
+        """Background image scaled once per window size and device pixel ratio"""
+        if self._backgroundImage is None or self._backgroundImage.isNull():
+            return None
+        dpr = self.devicePixelRatioF()
+        size = self.size() * dpr
+        pixmap = self._backgroundPixmap
+        if pixmap is None or pixmap.size() != size or pixmap.devicePixelRatio() != dpr:
+            image = self._backgroundImage
+            if image.hasAlphaChannel():
+                background = QImage(image.size(), QImage.Format.Format_ARGB32_Premultiplied)
+                background.fill(self._backgroundColor)
+                painter = QPainter(background)
+                painter.drawImage(0, 0, image)
+                painter.end()
+                image = background
+            pixmap = QPixmap.fromImage(image.scaled(size, Qt.AspectRatioMode.IgnoreAspectRatio,
+                                                    Qt.TransformationMode.SmoothTransformation))
+            pixmap.setDevicePixelRatio(dpr)
+            self._backgroundPixmap = pixmap
+        return pixmap
 
     def setBackgroundColor(self, color: QColor) -> None:
         self._backgroundColor = color
+        self._backgroundPixmap = None
         self.update()
 
     def setBackgroundImage(self, image: str) -> None:
-        image = QImage(image)
+        """Show the image at path image, it is decoded off the GUI thread unless it is cached"""
+        self._backgroundKey = imageLoader.key(image, screenImageSize(self.screen()))
+        decoded = None if self._backgroundKey is None else imageLoader.loadKey(self._backgroundKey)
+        if decoded is not None:
+            self._setDecodedImage(decoded)
+
+    def _setDecodedImage(self, image: QImage) -> None:
         self._backgroundImage = image
+        self._backgroundPixmap = None
         self.update()
 
+    def _onImageLoaded(self, key: tuple, image: QImage) -> None:
+        if key == self._backgroundKey:
+            self._setDecodedImage(image)
+
 
 class TimeClock(QWidget):
+    """Time pickers showing the time of a ClockEngine"""
+
     def __init__(self, parent=None, countDown=False):
         super().__init__(parent)
-        self.__hours = 0
-        self.__minutes = 0
-        self.__seconds = 0
-        self.__totalSeconds = 0
         self._countDown = countDown
+        self._shown = (0, 0, 0)  # hours, minutes and seconds on the pickers
         self._layout = QVBoxLayout(self)
-        self._timer = None
+        self.engine = ClockEngine(self)
         self.preSeconds = 0
         self.timePicker = TimePicker(self)
         self.finished.connect(lambda s: logger.info(f"Total seconds: {s}"))
@@ -120,24 +159,28 @@ class TimeClock(QWidget):
         return self._countDown
 
     def isRunning(self) -> bool:
-        if self._timer is None:
-            return False
-        return self._timer.isActive()
+        return self.engine.isRunning()
+
+    def shownSeconds(self) -> int:
+        """Seconds on the clock, the selected ones before a countdown starts"""
+        if self.engine.isStarted():
+            return self.engine.shownSeconds()
+        hours, minutes, seconds = (int(picker.getCurrentSelected()) for picker in self.__pickers())
+        return hours * 3600 + minutes * 60 + seconds
 
     def pause(self) -> None:
         """Pause the timer"""
-        self._timer.stop()
-        logger.info(f"Paused at {self.__hours}:{self.__minutes}:{self.__seconds}")
+        self.engine.pause()
+        logger.info("Paused at {}:{}:{}".format(*splitSeconds(self.engine.shownSeconds())))
 
     def resetTimeAttr(self) -> None:
         """Reset the time attributes"""
-        self.__hours = 0
-        self.__minutes = 0
-        self.__seconds = 0
-        self.__totalSeconds = 0
+        self.engine.setCountDown(self._countDown)
+        self._shown = (0, 0, 0)
 
     def setCountDown(self, countDown: bool) -> None:
         self._countDown = countDown
+        self.resetTimeAttr()
         self.timePicker.default()
         self.timePicker.setAcceptWheelEvent(countDown)
 
@@ -151,106 +194,58 @@ class TimeClock(QWidget):
         self.timePicker.setSecond(second)
 
     def start(self) -> None:
-        """Start the timer"""
-        self._timer = QTimer()
+        """Start the timer, or resume it after pause"""
         if self._countDown:
-            self.__hours = int(self.timePicker.hourPicker.getCurrentSelected())
-            self.__minutes = int(self.timePicker.minutePicker.getCurrentSelected())
-            self.__seconds = int(self.timePicker.secondPicker.getCurrentSelected())
-            self._timer.timeout.connect(self._subSecond)
+            # the pickers are read once, the engine counts from then on
+            self._shown = tuple(int(picker.getCurrentSelected()) for picker in self.__pickers())
+            hours, minutes, seconds = self._shown
+            selected = hours * 3600 + minutes * 60 + seconds
+            if not self.engine.isStarted():
+                self.engine.setCountDown(True, selected)
+            elif selected != self.engine.shownSeconds():
+                self.engine.setRemaining(selected)
             self.timePicker.setAcceptWheelEvent(False)
-        else:
-            self._timer.timeout.connect(self._addSecond)
-        self._timer.start(1000)
-        logger.info(f"Started at {self.__hours}:{self.__minutes}:{self.__seconds}")
+        self.engine.start()
+        logger.info("Started at {}:{}:{}".format(*self._shown))
 
     def stop(self) -> None:
         """Stop the timer"""
-        self._timer.stop()
+        logger.info("Stopped at {}:{}:{}".format(*splitSeconds(self.engine.shownSeconds())))
+        self.__finish(self.engine.stop())
+
+    def __finish(self, seconds: int) -> None:
         self.setCountDown(self._countDown)
-        logger.info(f"Stopped at {self.__hours}:{self.__minutes}:{self.__seconds}")
-        temp = self.__totalSeconds
-        self.resetTimeAttr()
-        self.preSeconds = temp
-        self.finished.emit(temp)
-
-    def _addSecond(self) -> None:
-        current = self.timePicker.secondPicker.getBottomItemText()
-        if self.__seconds < 59:
-            self.__seconds += 1
-            self.__totalSeconds += 1
-            self.timePicker.secondPicker.floatUp(getNextSecond(current, "up"))
-        else:
-            if self._addMinute():
-                self.timePicker.secondPicker.floatUp(getNextSecond(current, "up"))
-                self.__seconds = 0
-                self.__totalSeconds += 1
+        self.preSeconds = seconds
+        self.finished.emit(seconds)
+
+    def __pickers(self):
+        return self.timePicker.hourPicker, self.timePicker.minutePicker, self.timePicker.secondPicker
+
+    def __render(self, seconds: int) -> None:
+        """Move the pickers to seconds, a unit one step away floats to it unless it can't be seen"""
+        shown = splitSeconds(seconds)
+        exposed = isExposed(self)
+        for picker, old, new, base in zip(self.__pickers(), self._shown, shown, (24, 60, 60)):
+            if new == old:
+                continue
+            if not exposed:
+                picker.replaceItem(tuple(str((new + i) % base).zfill(2) for i in (-1, 0, 1)))
+            elif new == (old + 1) % base:
+                picker.floatUp(str((new + 1) % base).zfill(2))
+            elif new == (old - 1) % base:
+                picker.floatDown(str((new - 1) % base).zfill(2))
             else:
-                self.stop()
-
-    def _addMinute(self) -> bool:
-        current = self.timePicker.minutePicker.getBottomItemText()
-        if self.__minutes < 59:
-            self.__minutes += 1
-            self.timePicker.minutePicker.floatUp(getNextMinute(current, "up"))
-            return True
-        else:
-            if self._addHour():
-                self.timePicker.minutePicker.floatUp(getNextMinute(current, "up"))
-                self.__minutes = 0
-                return True
-            else:
-                return False
-
-    def _addHour(self) -> bool:
-        current = self.timePicker.hourPicker.getBottomItemText()
-        if self.__hours < 23:
-            self.__hours += 1
-            self.timePicker.hourPicker.floatUp(getNextHour(current, "up"))
-            return True
-        else:
-            return False
-
-    def _subSecond(self) -> None:
-        current = self.timePicker.secondPicker.getTopItemText()
-        if self.__seconds > 0:
-            self.__seconds -= 1
-            self.__totalSeconds += 1
-            self.timePicker.secondPicker.floatDown(getNextSecond(current, "down"))
-        else:
-            if self._subMinute():
-                self.__seconds = 59
-                self.__totalSeconds += 1
-                self.timePicker.secondPicker.floatDown(getNextSecond(current, "down"))
-            else:
-                self.stop()
-
-    def _subMinute(self) -> bool:
-        current = self.timePicker.minutePicker.getTopItemText()
-        if self.__minutes > 0:
-            self.__minutes -= 1
-            self.timePicker.minutePicker.floatDown(getNextMinute(current, "down"))
-            return True
-        else:
-            if self._subHour():
-                self.__minutes = 59
-                self.timePicker.minutePicker.floatDown(getNextMinute(current, "down"))
-                return True
-            else:
-                return False
-
-    def _subHour(self) -> bool:
-        current = self.timePicker.hourPicker.getTopItemText()
-        if self.__hours > 0:
-            self.__hours -= 1
-            self.timePicker.hourPicker.floatDown(getNextHour(current, "down"))
-            return True
-        else:
-            return False
+                picker.replaceItem(tuple(str((new + i) % base).zfill(2) for i in (-1, 0, 1)))
+        self._shown = shown
+
+    def __onEngineFinished(self, seconds: int) -> None:
+        logger.info("Stopped at {}:{}:{}".format(*self._shown))
+        self.__finish(seconds)
 
     def __initWidget(self):
         self.setCountDown(self._countDown)
         self.__initLayout()
+        self.__connectSignalToSlot()
 
     def __initLayout(self):
         self._layout.addWidget(self.timePicker)
@@ -258,6 +253,10 @@ class TimeClock(QWidget):
         self._layout.setSpacing(0)
         self._layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
+    def __connectSignalToSlot(self):
+        self.engine.ticked.connect(self.__render)
+        self.engine.finished.connect(self.__onEngineFinished)
+
     finished = Signal(int)  # Signal emit seconds
 
 
@@ -266,10 +265,10 @@ class CounterPage(QWidget):
         def __init__(self, timeClock: TimeClock, callback):
             super().__init__()
             self.timeClock = timeClock
-            self.timeClock.setParent(self)
+            self.clockFace = ClockFace(timeClock.engine, self, timeClock.shownSeconds())
             self.callback = callback
             self.vLayout = QVBoxLayout(self)
-            self.vLayout.addWidget(self.timeClock)
+            self.vLayout.addWidget(self.clockFace)
 
             self.titleBar.closeBtn.clicked.disconnect(self.window().close)
             self.titleBar.closeBtn.clicked.connect(callback)
@@ -285,6 +284,7 @@ class CounterPage(QWidget):
 
         # data
         self._dict: Optional[PyQDict] = None
+        self._sessionStart: Optional[float] = None
         self.music = Music(QUrl().fromLocalFile(os.path.join(
             cfg.resourcePath,
             "music",
@@ -292,6 +292,7 @@ class CounterPage(QWidget):
             "1.mp3"
         )))
         self.pomodoroTime = PomodoroTime(self)
+        self.prefetchBackgroundImage()
 
         # widget
         self.vLayout = QVBoxLayout(self)
@@ -314,13 +315,15 @@ class CounterPage(QWidget):
         if self.fullScreenWindow is None:
             return
         self.fullScreenWindow.hide()
-        self.timeClock.setParent(self)
-        self.__initLayout()
         self.window().show()
 
         self.fullScreenWindow.deleteLater()
         self.fullScreenWindow = None
 
+    def prefetchBackgroundImage(self, path: str = None) -> None:
+        """Decode the clock background ahead, so the full screen window shows it at once"""
+        imageLoader.prefetch(path or dataStorage.clockBackgroundImage.value, screenImageSize())
+
     def fullScreen(self) -> None:
         self.fullScreenWindow = self.FullScreenWindow(self.timeClock, self.backToWindow)
         self.fullScreenWindow.show()
@@ -349,18 +352,20 @@ class CounterPage(QWidget):
         self._dict = _dict
 
     def updateData(self, seconds: int, breakTime: int = 0) -> None:
+        """Record a finished session in the journal, totals are updated when it is compacted"""
         if self._dict is None:
             logger.error("No data")
             return
-        res = round(seconds / 3600 + self._dict.get("hours", 0.0), 2)
-        self._dict["hours"] = res
-        logger.info(f"name: {self._dict['name']}, hours: {self._dict['hours']}")
-        breakTime = round(breakTime / 3600 + self._dict.get("breakTime", 0.0), 2)
-        self._dict["breakTime"] = breakTime
-        logger.info(f"name: {self._dict['name']}, breakTime: {self._dict['breakTime']}")
+        end = time.time()
+        start = self._sessionStart if self._sessionStart is not None else end - seconds - breakTime
+        self._sessionStart = None
+        sessionJournal.append(self._dict["uid"], start, end, seconds, breakTime)
+        logger.info(f"name: {self._dict['name']}, seconds: {seconds}, breakTime: {breakTime}")
 
     def _onStart(self) -> None:
         self.__earlyStop = False
+        if self._sessionStart is None:
+            self._sessionStart = time.time()
         self._setControllerState(1)
         self._setBottomState(0)
         pomodoro = self.pomodoroTime
@@ -507,6 +512,7 @@ class CounterPage(QWidget):
         self.timeClock.finished.connect(self._onFinished)
 
         self.pomodoroTime.enableChanged.connect(self._onPomodoroTimeEnableChanged)
+        dataStorage.clockBackgroundImage.valueChanged.connect(self.prefetchBackgroundImage)
         self.pomodoroTime.onePomodoroTimeChanged.connect(self._onOnePomodoroTimeChanged)
 
     def __initWidget(self) -> None:
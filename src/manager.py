@@ -1,13 +1,22 @@
-import json
 import os
-from typing import Union
+import time
+from functools import partial
+from typing import Union, Optional
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, QTimer
 
 import config as cfg
 from log import logger
 from src.py_qobject import PyQList, PyQDict
 from src.source_data import SourceData
+from src.utils.database import Database, SqliteDataStorage, migrateJsonDirectory
+from src.utils.executor import ioExecutor
+from src.utils.file import BulkLoader
+from src.utils.incremental import IncrementalLoader
+from src.utils.journal import sessionJournal
+from src.utils.node_index import NodeIndex, IndexEntry
+from src.utils.search_index import SearchIndex
+from src.utils.snapshot import SnapshotCache
 from src.utils.type_cast import pyQDictToDict
 
 
@@ -16,6 +25,21 @@ class SourceDataManager(QObject):
         super().__init__(parent)
         logger.debug("---SourceDataManager initializing---")
         self.datas = PyQList(self)
+        self.index = NodeIndex(self.totalsChanged.emit)
+        self.searchIndex = SearchIndex()
+        self._searchLoader = IncrementalLoader(self.__indexForSearch, parent=self)
+        self.database: Optional[Database] = None
+        self.snapshot = SnapshotCache(cfg.snapshotPath)
+        self._loader: Optional[BulkLoader] = None
+        self._compactTimer = QTimer(self)
+        self._compactTimer.timeout.connect(self.compactSessions)
+        self.dataLoaded.connect(self.__onDataLoaded)
+        sessionJournal.pendingChanged.connect(self.__onPendingChanged)
+        for uid in sessionJournal.pendingUids():
+            self.index.setPending(uid, sessionJournal.pendingHours(uid))
+        if cfg.cfgDS.dataBackend.value == "sqlite":
+            self.database = Database(cfg.databasePath)
+            migrateJsonDirectory(cfg.dataPath, self.database)
         self.loadDatas()
         logger.debug("---SourceDataManager initialized---")
 
@@ -26,29 +50,83 @@ class SourceDataManager(QObject):
             defaultData["name"] = name
             defaultData["icon"] = icon
             defaultData = pyQDictToDict(defaultData)
-            with open(os.path.join(cfg.dataPath, f"{uid}.json"), "w") as f:
-                json.dump(defaultData, f, indent=4)
-            data = SourceData(os.path.join(cfg.dataPath, f"{uid}.json"))
+            data = self._createData(uid, load=False)
+            data.storage.create(defaultData)
             self.datas.append(data)
             self.dataAdded.emit(data)
         except Exception as e:
             logger.error(f"{e}")
 
+    def _createData(self, uid: str, load=True) -> SourceData:
+        if self.database is not None:
+            data = SourceData(self.database.path, load=False, storage=SqliteDataStorage(self.database, uid))
+        else:
+            data = SourceData(os.path.join(cfg.dataPath, f"{uid}.json"), load=False)
+        storage = data.storage
+        storage.loaded.connect(partial(self.__onStorageLoaded, data))
+        storage.changed.connect(self.index.applyChange)
+        storage.changed.connect(self.changed)
+        storage.nodeMaterialized.connect(self.index.setNode)
+        if load:
+            storage.load()
+        return data
+
+    def compactSessions(self):
+        """Fold the session journal into the project totals"""
+        if not sessionJournal.hasPending():
+            return
+        uids = [uid for uid in sessionJournal.pendingUids() if uid in self.index]
+        storages = {self.findData(uid).storage for uid in uids}
+        sessionJournal.compact([self.index.node(uid) for uid in uids], storages)
+
     def findData(self, uid: str) -> Union[SourceData, None]:
-        for data in self.datas:
-            if data.storage.dict["uid"] == uid:
-                return data
-        return None
+        """SourceData of the project holding uid, uid may also be a sub item"""
+        entry = self.index.entry(uid)
+        return None if entry is None else entry.data
+
+    def findNode(self, uid: str) -> Optional[PyQDict]:
+        return self.index.node(uid)
+
+    def search(self, query: str, limit: int = 200, fuzzy: bool = True) -> list[str]:
+        """Uids of the projects and sub items whose name or icon matches query"""
+        self._searchLoader.flush()
+        return self.searchIndex.search(query, limit, fuzzy)
+
+    def isLoaded(self) -> bool:
+        return self._loader is None or self._loader.isFinished()
 
     def loadDatas(self):
+        """Load every project file in parallel, dataLoaded is emitted once all are ready"""
         logger.debug("---Loading datas---")
+        start = time.time()
         self.datas.blockSignals(True)
-        filenames = os.listdir(cfg.dataPath)
-        for filename in filenames:
-            data = SourceData(os.path.join(cfg.dataPath, filename))
-            self.datas.append(data)
+        if self.database is not None:
+            uids = self.database.rootUids()
+        else:
+            # a project whose file is missing after a crash is restored from its backup
+            uids = list(dict.fromkeys(filename.split(".")[0] for filename in os.listdir(cfg.dataPath)
+                                      if filename.endswith(".json") or filename.endswith(".json.bak")))
+        for uid in uids:
+            self.datas.append(self._createData(uid, load=False))
         self.datas.blockSignals(False)
-        logger.debug("---Data loaded---")
+        if self.database is None and self.snapshot.load():
+            hits = 0
+            for data in self.datas:
+                raw = self.snapshot.lookup(data.storage)
+                if raw is not None:
+                    data.storage.prime(raw)
+                    hits += 1
+            logger.debug(f"Snapshot hits: {hits}/{len(self.datas)}")
+
+        def onFinished():
+            logger.info(f"Loaded {len(self.datas)} data(s) in {time.time() - start}")
+            logger.debug(f"IO executor: {ioExecutor.metrics()}")
+            logger.debug("---Data loaded---")
+            self.dataLoaded.emit()
+
+        self._loader = BulkLoader([data.storage for data in self.datas], parent=self)
+        self._loader.finished.connect(onFinished)
+        self._loader.start()
 
     def removeData(self, data: Union[SourceData, PyQDict]):
         if isinstance(data, PyQDict):
@@ -56,13 +134,46 @@ class SourceDataManager(QObject):
         if data is None:
             logger.warning("removeData: Data not found")
             return
-        os.remove(data.path)
+        self.index.removeTree(data.storage.dict)
+        data.storage.remove()
         self.datas.remove(data)
         self.dataRemoved.emit(data)
         data.deleteLater()
 
+    def saveSnapshot(self):
+        """Write the snapshot cache used by the next start, call after the pending dumps are flushed"""
+        if self.database is not None or not self.isLoaded():
+            return
+        try:
+            self.snapshot.save(data.storage for data in self.datas)
+        except Exception as e:
+            logger.error(f"Failed to save snapshot: {e}")
+
+    def __onPendingChanged(self, uid: str):
+        self.index.setPending(uid, sessionJournal.pendingHours(uid))
+
+    def __onStorageLoaded(self, data: SourceData):
+        if data.isLoaded():
+            self.index.addTree(data.storage.dict, None, data)
+
+    def __indexForSearch(self, entries: list[IndexEntry]):
+        for entry in entries:
+            if self.index.entry(entry.uid) is entry:
+                self.searchIndex.entryAdded(entry)
+
+    def __onDataLoaded(self):
+        self.compactSessions()
+        self._compactTimer.start(cfg.cfgDS.journalCompactInterval.value * 60 * 1000)
+        # the search index follows the uid index from now on, the nodes loaded so far are added in the background
+        self.index.addObserver(self.searchIndex)
+        entries = self.index.entries()
+        self._searchLoader.add(entries[i:i + 256] for i in range(0, len(entries), 256))
+
+    dataLoaded = Signal()
     dataAdded = Signal(SourceData)
     dataRemoved = Signal(SourceData)
+    changed = Signal(object)  # Change of any project
+    totalsChanged = Signal(str)  # uid whose rollups in the index changed
 
 
 SDManager = SourceDataManager()
@@ -1,20 +1,19 @@
 import time
-from collections import deque
-from typing import Optional, Union, Callable
+from typing import Optional
 
-from PySide6.QtCore import Qt, QThread, Signal, QPoint, QObject
+from PySide6.QtCore import Qt, QPoint, QTimer
 from PySide6.QtGui import QMouseEvent
-from PySide6.QtWidgets import QWidget, QTreeWidgetItem, QVBoxLayout, QHBoxLayout
-from qfluentwidgets import (TreeWidget, TitleLabel, RoundMenu, Action, FluentIcon,
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QStackedWidget, QListWidgetItem, QTreeView
+from qfluentwidgets import (TreeView, TitleLabel, SearchLineEdit, ListWidget, RoundMenu, Action, FluentIcon,
                             MessageBoxBase, SubtitleLabel, LineEdit,
                             MessageBox, StrongBodyLabel, PushButton)
 
 import config as cfg
 from log import logger
 from src.manager import SDManager
-from src.py_qobject import PyQDict, PyQList
-from src.source_data import SourceData
-from src.utils import JsonDataStorage, getLabelBoundingRect, addSubItem, removeSubItem
+from src.manager_interface.project_tree_model import ProjectTreeModel
+from src.py_qobject import PyQDict
+from src.utils import getLabelBoundingRect, addSubItem, removeSubItem
 from src.widgets import IconPicker, OMThingIcon
 
 
@@ -82,118 +81,54 @@ class EditDataDialog(MessageBoxBase):
         self.curIcon = icon.serialization()
 
 
-class TreeWidgetItem(QTreeWidgetItem):
-    def __init__(self, _dict: PyQDict, parent: Union[None, "TreeWidgetItem"]):
-        super().__init__()
-        self.__parent = parent
-        self.dict = _dict
-        self.map: dict[PyQDict, "TreeWidgetItem"] = {}
-        self.setText(0, self.dict["name"])
-        icon = OMThingIcon.deSerialization(self.dict["icon"])
-        if icon:
-            self.setIcon(0, icon.qicon())
-
-        # set font pixel size
-        font = self.font(0)
-        font.setPixelSize(20)
-        self.setFont(0, font)
-
-        # connect signal to slot
-        try:
-            _list: PyQList = self.dict["subItems"]
-        except KeyError:
-            _list = PyQList()
-            _list.valueChanged.connect(self.dict.valueChanged, Qt.ConnectionType.UniqueConnection)
-            self.dict["subItems"] = _list
-        _list.elementAppended.connect(self.addChild)
-        _list.elementRemoved.connect(self.removeChild)
-        self.dict.valueChanged.connect(self.updateUI)
-
-    def addChild(self, _dict: PyQDict) -> "TreeWidgetItem":
-        child = TreeWidgetItem(_dict, self)
-        self.map[_dict] = child
-        super().addChild(child)
-        return child
-
-    def removeChild(self, _dict: PyQDict):
-        child = self.map.pop(_dict)
-        super().removeChild(child)
-        del child
-
-    def updateUI(self):
-        self.setText(0, self.dict["name"])
-        icon = OMThingIcon.deSerialization(self.dict["icon"])
-        if icon:
-            self.setIcon(0, icon.qicon())
-
-    def parent(self) -> Union["TreeWidgetItem", None]:
-        return self.__parent
-
-
-def createTreeWidgetItem(_dict: PyQDict, parent: Union[None, TreeWidgetItem] = None) -> TreeWidgetItem:
-    root = TreeWidgetItem(_dict, parent)
-    q = deque([root])
-    while q:
-        parent = q.popleft()
-        for child in parent.dict["subItems"]:
-            _next = parent.addChild(child)
-            q.append(_next)
-    return root
-
-
-class LazyTreeWidget(TreeWidget):
+class ProjectTreeView(TreeView):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.currentItem: Optional[TreeWidgetItem] = None
+        self.currentUid: Optional[str] = None
         self.menu = RoundMenu(parent=self)
-        self.map: dict[PyQDict, TreeWidgetItem] = {}
-        self.sourceDatas = SDManager.datas
+        self.projectModel: Optional[ProjectTreeModel] = None
         self.setBorderVisible(True)
         self.setBorderRadius(5)
         self.setIndentation(40)
+        self.setUniformRowHeights(True)
 
-        SDManager.dataAdded.connect(self.__onSourceDataAppended)
-        SDManager.dataRemoved.connect(self.__onSourceDataRemoved)
         self.__initMenu()
-        self.addItemSignal.connect(self.__onAddTreeItem)
-        self.updateUI()
+        if SDManager.isLoaded():
+            self.updateUI()
+        else:
+            SDManager.dataLoaded.connect(self.updateUI)
+
+    def currentDict(self) -> Optional[PyQDict]:
+        return None if self.currentUid is None else SDManager.findNode(self.currentUid)
 
-    def addTopLevelItem(self, item: TreeWidgetItem) -> None:
-        self.map[item.dict] = item
-        super().addTopLevelItem(item)
+    def reveal(self, uid: str) -> None:
+        """Expand the tree down to uid and select it"""
+        index = self.projectModel.ensureIndex(uid) if self.projectModel else None
+        if index is None or not index.isValid():
+            return
+        parent = index.parent()
+        while parent.isValid():
+            self.expand(parent)
+            parent = parent.parent()
+        self.setCurrentIndex(index)
+        self.scrollTo(index, QTreeView.ScrollHint.PositionAtCenter)
 
     def mousePressEvent(self, e: QMouseEvent) -> None:
         if e.button() == Qt.MouseButton.RightButton:
-            self.currentItem = self.itemAt(e.pos())
+            self.currentUid = self.projectModel.uidOf(self.indexAt(e.pos())) if self.projectModel else None
             self.showMenu(self.mapToGlobal(e.pos()))
             return
         super().mousePressEvent(e)
 
     def updateUI(self):
-        if len(self.sourceDatas) <= 100:
-            for data in self.sourceDatas:
-                item = createTreeWidgetItem(data.storage.dict)
-                self.addTopLevelItem(item)
-        else:
-            class Worker(QThread):
-                def __init__(self, datas, signal):
-                    super().__init__(None)
-                    self.datas = datas
-                    self.signal = signal
-
-                def run(self) -> None:
-                    for _data in self.datas:
-                        self.signal.emit(_data.storage)
-                        time.sleep(0.05)
-                    self.finished.emit()
-
-            self.worker = Worker(self.sourceDatas, self.addItemSignal)
-            self.worker.finished.connect(self.worker.deleteLater)
-            self.worker.start()
+        if self.projectModel is not None:
+            return
+        self.projectModel = ProjectTreeModel(self)
+        self.setModel(self.projectModel)
 
     def showMenu(self, pos: QPoint):
         self.menu.move(pos)
-        if self.currentItem is None:
+        if self.currentUid is None:
             for action in self.menu.actions():
                 action.setEnabled(action.text() not in ("Add", "Delete", "Edit"))
         else:
@@ -201,10 +136,6 @@ class LazyTreeWidget(TreeWidget):
                 action.setEnabled(True)
         self.menu.show()
 
-    def __onAddTreeItem(self, storage: JsonDataStorage):
-        item = createTreeWidgetItem(storage.dict)
-        self.addTopLevelItem(item)
-
     def __onAddSubItem(self):
         dialog = AddDataDialog(
             title="Add sub item",
@@ -215,18 +146,19 @@ class LazyTreeWidget(TreeWidget):
 
         def onConfirm():
             default["name"] = dialog.nameEdit.text()
-            addSubItem(self.currentItem.dict, default)
+            addSubItem(self.currentDict(), default)
 
         dialog.yesButton.clicked.connect(onConfirm)
         dialog.exec()
 
     def __onEdit(self):
-        _dict = self.currentItem.dict
+        _dict = self.currentDict()
         dialog = EditDataDialog(_dict, self.window())
 
         def onConfirm():
-            _dict["name"] = dialog.nameEdit.text()
-            _dict["icon"] = dialog.curIcon
+            with _dict.batch():
+                _dict["name"] = dialog.nameEdit.text()
+                _dict["icon"] = dialog.curIcon
 
         dialog.yesButton.clicked.connect(onConfirm)
         dialog.yesButton.setText("Confirm")
@@ -242,8 +174,8 @@ class LazyTreeWidget(TreeWidget):
         )
 
         def onConfirm():
-            parent = self.currentItem.parent()
-            removeSubItem(parent.dict, self.currentItem.dict)
+            parent = SDManager.findNode(SDManager.index.parentUid(self.currentUid))
+            removeSubItem(parent, self.currentDict())
 
         dialog.yesSignal.connect(onConfirm)
         dialog.exec()
@@ -273,7 +205,7 @@ class LazyTreeWidget(TreeWidget):
         )
 
         def onConfirm():
-            SDManager.removeData(self.currentItem.dict)
+            SDManager.removeData(SDManager.findData(self.currentUid))
 
         dialog.yesSignal.connect(onConfirm)
         dialog.yesButton.setText("Confirm")
@@ -281,21 +213,12 @@ class LazyTreeWidget(TreeWidget):
         dialog.exec()
 
     def __onDeleteItem(self):
-        isRoot = self.currentItem.parent() is None
+        isRoot = SDManager.index.parentUid(self.currentUid) is None
         if isRoot:
             self.__onDeleteSourceData()
         else:
             self.__onRemoveSubItem()
 
-    def __onSourceDataAppended(self, data: SourceData):
-        self.__onAddTreeItem(data.storage)
-
-    def __onSourceDataRemoved(self, data: SourceData):
-        _dict = data.storage.dict
-        item = self.map.pop(_dict)
-        self.takeTopLevelItem(self.indexOfTopLevelItem(item))
-        del item
-
     def __initMenu(self):
         add = Action(FluentIcon.ADD, "Add")
         add.triggered.connect(self.__onAddSubItem)
@@ -312,8 +235,6 @@ class LazyTreeWidget(TreeWidget):
             addRoot,
         ])
 
-    addItemSignal = Signal(JsonDataStorage)
-
 
 class ManagerInterface(QWidget):
     def __init__(self, parent=None):
@@ -321,21 +242,62 @@ class ManagerInterface(QWidget):
         start = time.time()
         logger.debug("---ManagerInterface initializing---")
         self.label = TitleLabel("Manage", self)
-        self.treeWidget = LazyTreeWidget(self)
+        self.searchEdit = SearchLineEdit(self)
+        self.treeView = ProjectTreeView(self)
+        self.resultList = ListWidget(self)
+        self.stack = QStackedWidget(self)
+        self.searchTimer = QTimer(self)
         self.vLayout = QVBoxLayout(self)
         self.__initWidget()
         logger.info(f"ManagerInterface Initialization time: {time.time() - start}")
         logger.debug("---ManagerInterface initialized---")
 
+    def search(self, text: str):
+        if not text.strip():
+            self.stack.setCurrentWidget(self.treeView)
+            return
+        self.resultList.clear()
+        for uid in SDManager.search(text):
+            entry = SDManager.index.entry(uid)
+            path = " / ".join(e.node["name"] for e in SDManager.index.ancestors(uid))
+            icon = OMThingIcon.deSerialization(entry.node["icon"])
+            item = QListWidgetItem(f"{entry.node['name']}    {path}" if path else entry.node["name"])
+            if icon:
+                item.setIcon(icon.qicon())
+            item.setData(Qt.ItemDataRole.UserRole, uid)
+            self.resultList.addItem(item)
+        self.stack.setCurrentWidget(self.resultList)
+
+    def __onResultClicked(self, item: QListWidgetItem):
+        uid = item.data(Qt.ItemDataRole.UserRole)
+        self.searchEdit.clear()
+        self.stack.setCurrentWidget(self.treeView)
+        self.treeView.reveal(uid)
+
+    def __connectSignalToSlot(self):
+        self.searchEdit.textChanged.connect(lambda: self.searchTimer.start())
+        self.searchEdit.searchSignal.connect(self.search)
+        self.searchTimer.timeout.connect(lambda: self.search(self.searchEdit.text()))
+        self.resultList.itemClicked.connect(self.__onResultClicked)
+
     def __initWidget(self):
-        self.treeWidget.setHeaderHidden(True)
+        self.treeView.setHeaderHidden(True)
         rect = getLabelBoundingRect(self.label)
         self.label.setFixedSize(rect.width() + 5, rect.height())
+        self.searchEdit.setPlaceholderText("Search projects")
+        self.searchEdit.setFixedWidth(300)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(150)
+        self.stack.addWidget(self.treeView)
+        self.stack.addWidget(self.resultList)
         self.setObjectName("ManagerInterface")
         self.__initLayout()
+        self.__connectSignalToSlot()
 
     def __initLayout(self):
         self.label.move(36, 30)
-        self.vLayout.addWidget(self.treeWidget)
+        self.vLayout.addWidget(self.searchEdit, 0, Qt.AlignmentFlag.AlignLeft)
+        self.vLayout.addWidget(self.stack)
+        self.vLayout.setSpacing(10)
         self.vLayout.setContentsMargins(36, 90, 36, 10)
         self.vLayout.setAlignment(Qt.AlignmentFlag.AlignCenter)
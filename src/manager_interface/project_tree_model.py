@@ -0,0 +1,236 @@
+from typing import Any, Optional
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PySide6.QtGui import QFont, QIcon
+
+from src.manager import SDManager
+from src.py_qobject import PyQDict, PyQList, Change
+from src.source_data import SourceData
+from src.utils.utils import peekSubItems
+from src.widgets import OMThingIcon
+
+FETCH_CHUNK = 256  # rows added per fetchMore
+
+
+class TreeNode:
+    """Row of the model, created only once its parent fetched it"""
+    __slots__ = ("uid", "parent", "row", "children")
+
+    def __init__(self, uid: Optional[str], parent: Optional["TreeNode"], row: int):
+        self.uid = uid
+        self.parent = parent
+        self.row = row
+        self.children: list[TreeNode] = []
+
+
+class ProjectTreeModel(QAbstractItemModel):
+    """ Tree model over every project of SDManager
+
+    Rows are created on demand through ``canFetchMore``/``fetchMore``, names and
+    icons are read from the uid index, so lazy sub items stay unconverted until
+    they are edited.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = TreeNode(None, None, 0)
+        self._nodes: dict[str, TreeNode] = {}
+        self._font = QFont()
+        self._font.setPixelSize(20)
+        self._icons: dict[str, Optional[QIcon]] = {}
+        SDManager.changed.connect(self.__onChanged)
+        SDManager.dataAdded.connect(self.__onDataAdded)
+        SDManager.dataRemoved.connect(self.__onDataRemoved)
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        node = self._nodeOf(parent)
+        if column != 0 or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not index.isValid():
+            return QModelIndex()
+        parent = index.internalPointer().parent
+        if parent is None or parent is self._root:
+            return QModelIndex()
+        return self.createIndex(parent.row, 0, parent)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        return len(self._nodeOf(parent).children)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        node = self._nodeOf(parent)
+        return bool(node.children) or self._childCount(node) > 0
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        node = self._nodeOf(parent)
+        return len(node.children) < self._childCount(node)
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        node = self._nodeOf(parent)
+        start = len(node.children)
+        end = min(self._childCount(node), start + FETCH_CHUNK)
+        if start >= end:
+            return
+        self.beginInsertRows(parent, start, end - 1)
+        for row in range(start, end):
+            self._addNode(self._childUid(node, row), node, row)
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        uid = index.internalPointer().uid
+        if role == Qt.ItemDataRole.UserRole:
+            return uid
+        if role == Qt.ItemDataRole.FontRole:
+            return self._font
+        entry = SDManager.index.entry(uid)
+        if entry is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry.node["name"]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.icon(entry.node["icon"])
+        return None
+
+    def icon(self, name: str) -> Optional[QIcon]:
+        if name not in self._icons:
+            icon = OMThingIcon.deSerialization(name)
+            self._icons[name] = icon.qicon() if icon else None
+        return self._icons[name]
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def uidOf(self, index: QModelIndex) -> Optional[str]:
+        return index.internalPointer().uid if index.isValid() else None
+
+    def nodeOf(self, index: QModelIndex) -> Optional[PyQDict]:
+        """PyQDict shown at index, it is converted if it is still lazy"""
+        uid = self.uidOf(index)
+        return None if uid is None else SDManager.findNode(uid)
+
+    def ensureIndex(self, uid: str) -> QModelIndex:
+        """Index of uid, the rows down to it are fetched if needed"""
+        parent = self._root
+        for u in [entry.uid for entry in SDManager.index.ancestors(uid)] + [uid]:
+            while u not in self._nodes and len(parent.children) < self._childCount(parent):
+                self.fetchMore(self._parentIndex(parent))
+            if u not in self._nodes:
+                return QModelIndex()
+            parent = self._nodes[u]
+        return self.createIndex(parent.row, 0, parent)
+
+    def indexOf(self, uid: str) -> QModelIndex:
+        node = self._nodes.get(uid)
+        return QModelIndex() if node is None else self.createIndex(node.row, 0, node)
+
+    def _nodeOf(self, index: QModelIndex) -> TreeNode:
+        return index.internalPointer() if index.isValid() else self._root
+
+    def _childCount(self, node: TreeNode) -> int:
+        if node is self._root:
+            return len(SDManager.datas)
+        entry = SDManager.index.entry(node.uid)
+        return 0 if entry is None else len(peekSubItems(entry.node))
+
+    def _childUid(self, node: TreeNode, row: int) -> str:
+        if node is self._root:
+            return SDManager.datas.list[row].storage.dict["uid"]
+        return peekSubItems(SDManager.index.entry(node.uid).node)[row]["uid"]
+
+    def _addNode(self, uid: str, parent: TreeNode, row: int) -> TreeNode:
+        node = TreeNode(uid, parent, row)
+        parent.children.insert(row, node)
+        self._nodes[uid] = node
+        return node
+
+    def _dropNode(self, node: TreeNode) -> None:
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            self._nodes.pop(node.uid, None)
+            stack.extend(node.children)
+
+    def _renumber(self, parent: TreeNode, start: int) -> None:
+        for row in range(start, len(parent.children)):
+            parent.children[row].row = row
+
+    def _parentIndex(self, node: TreeNode) -> QModelIndex:
+        return QModelIndex() if node is self._root else self.createIndex(node.row, 0, node)
+
+    def _insertRow(self, parent: TreeNode, row: int, uid: str) -> None:
+        # rows past the fetched ones are left to fetchMore
+        if row > len(parent.children):
+            return
+        self.beginInsertRows(self._parentIndex(parent), row, row)
+        self._addNode(uid, parent, row)
+        self._renumber(parent, row + 1)
+        self.endInsertRows()
+
+    def _removeRow(self, parent: TreeNode, row: int) -> None:
+        if row >= len(parent.children):
+            return
+        self.beginRemoveRows(self._parentIndex(parent), row, row)
+        self._dropNode(parent.children.pop(row))
+        self._renumber(parent, row)
+        self.endRemoveRows()
+
+    def _resetChildren(self, parent: TreeNode) -> None:
+        """Forget the fetched children of parent, they are fetched again on demand"""
+        if parent.children:
+            self.beginRemoveRows(self._parentIndex(parent), 0, len(parent.children) - 1)
+            for child in parent.children:
+                self._dropNode(child)
+            parent.children = []
+            self.endRemoveRows()
+
+    def __onChanged(self, change: Change):
+        # rows of a batch are not tracked one by one, the touched lists are fetched again
+        inBatch = change.op == "batch"
+        for c in (change.new if inBatch else (change,)):
+            source = c.source
+            if isinstance(source, PyQList):
+                owner = source.owner()
+                if not isinstance(owner, PyQDict) or owner.get("subItems") is not source:
+                    continue
+                parent = self._nodes.get(owner.get("uid"))
+                if parent is None:
+                    continue
+                key = c.path.rsplit("/", 1)[-1]
+                if inBatch:
+                    self._resetChildren(parent)
+                elif c.op == "add":
+                    self._insertRow(parent, len(source) - 1 if key == "-" else int(key), c.new["uid"])
+                elif c.op == "remove" and key.isdigit():
+                    self._removeRow(parent, int(key))
+                else:
+                    self._resetChildren(parent)
+            elif isinstance(source, PyQDict) and "uid" in source:
+                node = self._nodes.get(source["uid"])
+                if node is None:
+                    continue
+                key = c.path.rsplit("/", 1)[-1]
+                replaced = c.new is source  # the whole dict was replaced
+                if key == "subItems" or replaced:
+                    self._resetChildren(node)
+                if key in ("name", "icon") or replaced:
+                    index = self.createIndex(node.row, 0, node)
+                    self.dataChanged.emit(index, index)
+
+    def __onDataAdded(self, data: SourceData):
+        self._insertRow(self._root, len(SDManager.datas) - 1, data.storage.dict["uid"])
+
+    def __onDataRemoved(self, data: SourceData):
+        node = self._nodes.get(data.storage.dict["uid"])
+        if node is not None and node.parent is self._root:
+            self._removeRow(self._root, node.row)
@@ -1,4 +1,4 @@
-from .base import PyQObjectBase
+from .base import PyQObjectBase, PySignal, BoundSignal, Change, escapePointer
 from .dict_qobject import PyQDict
 from .list_qobject import PyQList
 from .set_qobject import PyQSet
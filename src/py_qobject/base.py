@@ -1,5 +1,289 @@
-from PySide6.QtCore import QObject, Signal
+import sys
+import weakref
+from contextlib import contextmanager
+from functools import partial
+from inspect import ismethod
+from typing import Callable, Iterator, NamedTuple, Optional, Union
 
+from PySide6.QtCore import Qt, QTimer
 
-class PyQObjectBase(QObject):
-    valueChanged = Signal()
+SUPPORTED_CONNECTIONS = (Qt.ConnectionType.AutoConnection, Qt.ConnectionType.DirectConnection,
+                         Qt.ConnectionType.UniqueConnection, Qt.ConnectionType.QueuedConnection)
+
+
+def escapePointer(key: Union[str, int]) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+class Change(NamedTuple):
+    """ One change of a container tree
+
+    ``path`` is a JSON pointer relative to the container the change is reported
+    to, ``source`` is the container that was mutated. A batch is reported as op
+    ``"batch"`` with the list of its changes, relative to the batching
+    container, as ``new``.
+    """
+    op: str  # add, remove, replace or batch
+    path: str
+    old: object = None
+    new: object = None
+    source: object = None
+
+    def paths(self) -> list[str]:
+        """Paths touched by the change, the changes of a batch are expanded"""
+        if self.op == "batch":
+            return [self.path + c.path for c in self.new]
+        return [self.path]
+
+
+class BoundSignal:
+    """ Callback list of one container, the counterpart of a Qt SignalInstance
+
+    Bound methods are held weakly and dropped once their object is gone or its
+    C++ part was deleted. Slots are called directly, slots connected with
+    ``Qt.QueuedConnection`` are called from the event loop of the emitting thread.
+    """
+    __slots__ = ("_owner", "_slots", "_held", "_pending")
+
+    def __init__(self, owner: "PyQObjectBase"):
+        self._owner = owner
+        self._slots: list[tuple[object, bool]] = []  # (slot or weak method, queued)
+        self._held = 0
+        self._pending = False
+
+    def connect(self, slot: Callable, type: Qt.ConnectionType = Qt.ConnectionType.AutoConnection) -> bool:
+        """Connect slot, a signal may be given as the slot"""
+        if type not in SUPPORTED_CONNECTIONS:
+            raise ValueError(f"{type.name} is not supported by container signals")
+        if hasattr(slot, "emit"):
+            # signals are held strongly, like Qt keeps signal to signal connections
+            slot = slot.emit
+            ref = slot
+        else:
+            ref = weakref.WeakMethod(slot) if ismethod(slot) else slot
+        if type == Qt.ConnectionType.UniqueConnection and self._find(slot) is not None:
+            return False
+        self._slots.append((ref, type == Qt.ConnectionType.QueuedConnection))
+        return True
+
+    def disconnect(self, slot: Callable = None) -> bool:
+        """Disconnect slot, or every slot when it is None"""
+        if slot is None:
+            self._slots.clear()
+            return True
+        if hasattr(slot, "emit"):
+            slot = slot.emit
+        i = self._find(slot)
+        if i is None:
+            return False
+        del self._slots[i]
+        return True
+
+    def hold(self) -> None:
+        """Defer emits until the matching release, they are merged into one"""
+        self._held += 1
+
+    def release(self) -> None:
+        self._held -= 1
+        if self._held == 0 and self._pending:
+            self._pending = False
+            self.emit()
+
+    def emit(self, *args) -> None:
+        if self._owner._blocked or not self._slots:
+            return
+        if self._held:
+            self._pending = True
+            return
+        for connection in tuple(self._slots):
+            ref, queued = connection
+            if queued:
+                QTimer.singleShot(0, partial(self._call, connection, args))
+            else:
+                self._call(connection, args)
+
+    def _call(self, connection: tuple[object, bool], args: tuple) -> None:
+        ref = connection[0]
+        slot = ref() if isinstance(ref, weakref.WeakMethod) else ref
+        try:
+            if slot is not None:
+                slot(*args)
+                return
+        except RuntimeError:
+            # receiver's C++ object has been deleted
+            pass
+        except Exception:
+            # like Qt, a failing slot doesn't stop the others
+            sys.excepthook(*sys.exc_info())
+            return
+        if connection in self._slots:
+            self._slots.remove(connection)
+
+    def _find(self, slot: Callable) -> Optional[int]:
+        for i, (ref, _) in enumerate(self._slots):
+            if (ref() if isinstance(ref, weakref.WeakMethod) else ref) == slot:
+                return i
+        return None
+
+
+class PySignal:
+    """ Signal declaration of a container class, used like ``Signal``
+
+    The bound signal is created on first access and stored in the ``_<name>``
+    slot of the instance.
+    """
+
+    def __init__(self, *types):
+        self.types = types
+        self._attr = ""
+
+    def __set_name__(self, owner, name: str):
+        self._attr = "_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        bound = getattr(obj, self._attr, None)
+        if bound is None:
+            bound = BoundSignal(obj)
+            setattr(obj, self._attr, bound)
+        return bound
+
+
+class PyQObjectBase:
+    """ Base of the observable containers
+
+    Plain Python objects with ``__slots__`` and callback signals, the data
+    storage bridges the changes of a whole tree to a Qt signal. A container
+    knows the container holding it (its owner) and its key there, so a change
+    finds its path in O(depth). Mutations are reported as JSON-Patch style
+    records to the recorder of the nearest root.
+    """
+    __slots__ = ("_owner", "_key", "_recorder", "_blocked", "_batch", "_valueChanged", "_changed", "__weakref__")
+
+    def __init__(self, parent=None):
+        # parent is accepted for compatibility, containers are owned by their holder
+        self._owner: Optional[PyQObjectBase] = None
+        self._key: Union[str, int, None] = None  # key in the owner, checked before use
+        self._recorder: Optional[Callable[[str, str, object], None]] = None
+        self._blocked = False
+        self._batch: Optional[list[Change]] = None
+
+    @contextmanager
+    def batch(self) -> Iterator[list[Change]]:
+        """ Group the changes made below this container
+
+        Inside the block ``valueChanged`` of this container is emitted at most
+        once, at the end, and ``changed`` is emitted once with every change
+        made in the block. Batches may be nested, each one collects every
+        change below it.
+        """
+        outer = self._batch is not None
+        if not outer:
+            self._batch = []
+        self.valueChanged.hold()
+        try:
+            yield self._batch
+        finally:
+            diff = None
+            if not outer:
+                diff, self._batch = self._batch, None
+            self.valueChanged.release()
+            if diff:
+                self._notify("batch", None, None, diff)
+
+    def blockSignals(self, b: bool) -> bool:
+        old, self._blocked = self._blocked, b
+        return old
+
+    def deleteLater(self) -> None:
+        """Disconnect every signal, the container is freed once unreferenced"""
+        for name in dir(type(self)):
+            if isinstance(getattr(type(self), name, None), PySignal):
+                bound = getattr(self, "_" + name, None)
+                if bound is not None:
+                    bound.disconnect()
+
+    def owner(self) -> Optional["PyQObjectBase"]:
+        return self._owner
+
+    def parent(self) -> Optional["PyQObjectBase"]:
+        return self._owner
+
+    def path(self) -> Optional[str]:
+        """JSON pointer of this container from its root, None if it is detached"""
+        parts = []
+        node = self
+        while node._recorder is None:
+            owner = node._owner
+            if owner is None:
+                return None
+            key = owner._keyOf(node)
+            if key is None:
+                return None
+            parts.append(escapePointer(key))
+            node = owner
+        return "".join("/" + part for part in reversed(parts))
+
+    def setParent(self, parent) -> None:
+        pass
+
+    def setRecorder(self, recorder: Optional[Callable[[str, str, object], None]]) -> None:
+        """Make this container a root, recorder(op, path, value) receives every change below it"""
+        self._recorder = recorder
+
+    def signalsBlocked(self) -> bool:
+        return self._blocked
+
+    def _adopt(self, value, key) -> None:
+        if isinstance(value, PyQObjectBase):
+            value._owner = self
+            value._key = key
+
+    def _release(self, value) -> None:
+        if isinstance(value, PyQObjectBase) and value._owner is self:
+            value._owner = None
+            value._key = None
+
+    def _keyOf(self, child: "PyQObjectBase"):
+        return None
+
+    def _notify(self, op: str, key=None, old=None, new=None) -> None:
+        """ Report a change of self[key], or of the container itself when key is None
+
+        ``changed`` is emitted on this container and its owners up to the first
+        one inside a batch, which collects the change instead. The root records it.
+        """
+        if self._blocked:
+            return
+        chain = [self]
+        node = self
+        while node._recorder is None and node._owner is not None:
+            node = node._owner
+            chain.append(node)
+        root = node
+        if root._recorder is None and not any(n._batch is not None or getattr(n, "_changed", None) is not None
+                                              for n in chain):
+            return
+        path = "" if key is None else "/" + escapePointer(key)
+        emitting = True
+        for i, node in enumerate(chain):
+            if i:
+                k = node._keyOf(chain[i - 1])
+                if k is None:
+                    # detached on the way up
+                    return
+                path = "/" + escapePointer(k) + path
+            if node._batch is not None:
+                if op != "batch":
+                    node._batch.append(Change(op, path, old, new, self))
+                emitting = False
+            elif emitting:
+                signal = getattr(node, "_changed", None)
+                if signal is not None:
+                    signal.emit(Change(op, path, old, new, self))
+        if root._recorder is not None and op != "batch":
+            root._recorder(op, path, new)
+
+    valueChanged = PySignal()
+    changed = PySignal(object)  # Change
@@ -2,9 +2,13 @@ from .base import PyQObjectBase
 
 
 class PyQDict(PyQObjectBase):
+    __slots__ = ("_dict",)
+
     def __init__(self, parent=None, **kwargs):
         super().__init__(parent)
         self._dict = dict(**kwargs)
+        for k, v in self._dict.items():
+            self._adopt(v, k)
 
     @property
     def dict(self):
@@ -21,16 +25,34 @@ class PyQDict(PyQObjectBase):
 
     def pop(self, key):
         res = self._dict.pop(key)
+        self._release(res)
+        self._notify("remove", key, res)
         self.valueChanged.emit()
         return res
 
     def replaceDict(self, _dict: dict) -> None:
+        old = self._dict
+        for v in old.values():
+            self._release(v)
         self._dict = _dict
+        for k, v in self._dict.items():
+            self._adopt(v, k)
+        self._notify("replace", None, old, self)
         self.valueChanged.emit()
 
     def values(self):
         return self._dict.values()
 
+    def _keyOf(self, child):
+        k = child._key
+        if k in self._dict and self._dict[k] is child:
+            return k
+        for k, v in self._dict.items():
+            if v is child:
+                child._key = k
+                return k
+        return None
+
     def __contains__(self, item):
         return self._dict.__contains__(item)
 
@@ -41,12 +63,20 @@ class PyQDict(PyQObjectBase):
         return f"PyQDict({self._dict})"
 
     def __setitem__(self, key, value):
+        op = "replace" if key in self._dict else "add"
+        old = self._dict.get(key)
+        self._release(old)
         self._dict.__setitem__(key, value)
+        self._adopt(value, key)
+        self._notify(op, key, old, value)
         self.valueChanged.emit()
 
     def __getitem__(self, key):
         return self._dict.__getitem__(key)
 
     def __delitem__(self, key):
+        old = self._dict[key]
+        self._release(old)
         self._dict.__delitem__(key)
+        self._notify("remove", key, old)
         self.valueChanged.emit()
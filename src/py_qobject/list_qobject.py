@@ -1,20 +1,34 @@
-from PySide6.QtCore import Signal
-
-from .base import PyQObjectBase
+from .base import PyQObjectBase, PySignal
 
 
 class PyQList(PyQObjectBase):
+    """ Observable list
+
+    With a factory set, plain dict and list elements are kept as they are and
+    converted by ``factory(element, owner)`` the first time they are accessed.
+    ``list`` returns the elements without converting them.
+    ``elementAboutToBeRemoved(i)`` is emitted while element i is still there.
+    """
+    __slots__ = ("_list", "_factory", "_elementAppended", "_elementAboutToBeRemoved", "_elementRemoved")
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._list = list()
+        self._factory = None
 
     def append(self, obj):
         self._list.append(obj)
+        self._adopt(obj, len(self._list) - 1)
+        self._notify("add", "-", None, obj)
         self.valueChanged.emit()
         self.elementAppended.emit(obj)
 
     def clear(self):
+        old = list(self._list)
+        for v in old:
+            self._release(v)
         self._list.clear()
+        self._notify("replace", None, old, self)
         self.valueChanged.emit()
 
     @property
@@ -24,34 +38,96 @@ class PyQList(PyQObjectBase):
     def index(self, obj):
         return self._list.index(obj)
 
+    def setFactory(self, factory) -> None:
+        self._factory = factory
+
     def pop(self):
+        if self._list:
+            self._materialize(-1)
+            self.elementAboutToBeRemoved.emit(len(self._list) - 1)
         res = self._list.pop()
+        self._release(res)
+        self._notify("remove", len(self._list), res)
         self.valueChanged.emit()
         self.elementRemoved.emit(res)
 
     def remove(self, obj):
-        self._list.remove(obj)
+        i = self._list.index(obj)
+        self.elementAboutToBeRemoved.emit(i)
+        del self._list[i]
+        self._release(obj)
+        self._shiftKeys(i, -1)
+        self._notify("remove", i, obj)
         self.valueChanged.emit()
         self.elementRemoved.emit(obj)
 
-    def replaceList(self, _list: list) -> None:
+    def replaceList(self, _list: list, adopt: bool = True) -> None:
+        """Replace every element, without adopt the elements stay owned by their holders"""
+        old = self._list
+        if adopt:
+            for v in old:
+                self._release(v)
         self._list = _list
+        if adopt:
+            for i, v in enumerate(self._list):
+                self._adopt(v, i)
+        self._notify("replace", None, old, self)
         self.valueChanged.emit()
 
+    def _materialize(self, i: int):
+        v = self._list[i]
+        if self._factory is not None and type(v) in (dict, list):
+            v = self._factory(v, self)
+            self._list[i] = v
+            v._key = i if i >= 0 else i + len(self._list)
+        return v
+
+    def _iterate(self):
+        i = 0
+        while i < len(self._list):
+            yield self._materialize(i)
+            i += 1
+
+    def _keyOf(self, child):
+        i = child._key
+        if type(i) is int and i < len(self._list) and self._list[i] is child:
+            return i
+        for i, v in enumerate(self._list):
+            if v is child:
+                child._key = i
+                return i
+        return None
+
+    def _shiftKeys(self, start: int, delta: int) -> None:
+        """Move the cached keys of the elements from start on by delta"""
+        for v in self._list[start:]:
+            if isinstance(v, PyQObjectBase) and v._owner is self and type(v._key) is int:
+                v._key += delta
+
     def __contains__(self, item):
         return self._list.__contains__(item)
 
     def __getitem__(self, item):
-        return self._list.__getitem__(item)
+        if self._factory is None:
+            return self._list.__getitem__(item)
+        if isinstance(item, slice):
+            return [self._materialize(i) for i in range(*item.indices(len(self._list)))]
+        return self._materialize(item)
 
     def __len__(self):
         return self._list.__len__()
 
     def __iter__(self):
-        return self._list.__iter__()
+        if self._factory is None:
+            return self._list.__iter__()
+        return self._iterate()
 
     def __setitem__(self, key, value):
+        old = self._list[key]
+        self._release(old)
         self._list.__setitem__(key, value)
+        self._adopt(value, key if type(key) is not int or key >= 0 else key + len(self._list))
+        self._notify("replace", key, old, value)
         self.valueChanged.emit()
 
     def __str__(self):
@@ -60,5 +136,6 @@ class PyQList(PyQObjectBase):
     def __repr__(self):
         return self._list.__repr__()
 
-    elementAppended = Signal(object)
-    elementRemoved = Signal(object)
+    elementAppended = PySignal(object)
+    elementAboutToBeRemoved = PySignal(int)  # index
+    elementRemoved = PySignal(object)
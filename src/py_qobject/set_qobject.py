@@ -1,9 +1,9 @@
-from PySide6.QtCore import Signal
-
-from .base import PyQObjectBase
+from .base import PyQObjectBase, PySignal
 
 
 class PyQSet(PyQObjectBase):
+    __slots__ = ("_set", "_elementAdded", "_elementRemoved")
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self._set = set()
@@ -31,5 +31,5 @@ class PyQSet(PyQObjectBase):
     def __repr__(self):
         return self._set.__repr__()
 
-    elementAdded = Signal(object)
-    elementRemoved = Signal(object)
+    elementAdded = PySignal(object)
+    elementRemoved = PySignal(object)
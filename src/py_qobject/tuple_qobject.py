@@ -2,6 +2,8 @@ from .base import PyQObjectBase
 
 
 class PyQTuple(PyQObjectBase):
+    __slots__ = ("_tuple",)
+
     def __init__(self, *elements, parent=None):
         super().__init__(parent)
         self._tuple = elements
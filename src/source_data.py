@@ -4,23 +4,24 @@ from PySide6.QtCore import Signal, QObject
 from PySide6.QtWidgets import QApplication
 
 from log import logger
-from src.utils.file import JsonDataStorage
+from src.utils.file import DataStorage, JsonDataStorage
 
 
 class SourceData(QObject):
-    def __init__(self, path: str, parent=None):
+    def __init__(self, path: str, parent=None, load=True, storage: DataStorage = None):
         super().__init__(parent)
         self.path = path
-        self._storage = JsonDataStorage(path)
+        self._storage = JsonDataStorage(path) if storage is None else storage
         self._storage.dumped.connect(self.dumped)
         self._storage.loaded.connect(self.loaded)
-        self._storage.load()
+        if load:
+            self._storage.load()
 
     def isLoaded(self) -> bool:
         return self._storage.isLoaded()
 
     @property
-    def storage(self) -> JsonDataStorage:
+    def storage(self) -> DataStorage:
         return self._storage
 
     dumped = Signal()
@@ -1,4 +1,4 @@
 from .type_cast import isFluentIconStr, strToFluentIcon, fluentIconToStr
 from .screen import getRealScreenSize, getScreenScale, getScreenSize
-from .file import JsonDataStorage
-from .utils import getLabelBoundingRect, addSubItem, removeSubItem
+from .file import DataStorage, JsonDataStorage, BulkLoader
+from .utils import getLabelBoundingRect, addSubItem, removeSubItem, peekSubItems
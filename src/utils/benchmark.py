@@ -0,0 +1,71 @@
+"""
+Micro-benchmark of the on-disk formats, run from the project root:
+
+    python -m src.utils.benchmark [nodes]
+"""
+import json
+import sys
+import time
+import uuid
+from typing import Callable
+
+from src.utils.serializer import SERIALIZERS
+
+
+def makeTree(nodes: int, width: int = 8) -> dict:
+    """A project tree shaped like the real data with about nodes items"""
+    def node(i: int) -> dict:
+        return {
+            "name": f"item {i}",
+            "icon": "F-ADD",
+            "hours": i * 0.25,
+            "uid": uuid.uuid4().hex,
+            "breakTime": i * 0.05,
+            "subItems": []
+        }
+
+    root = node(0)
+    queue = [root]
+    count = 1
+    while count < nodes:
+        parent = queue.pop(0)
+        for _ in range(min(width, nodes - count)):
+            child = node(count)
+            parent["subItems"].append(child)
+            queue.append(child)
+            count += 1
+    return root
+
+
+def timeit(fn: Callable, repeat: int = 5) -> float:
+    """Best time of fn in ms"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(nodes: int) -> None:
+    tree = makeTree(nodes)
+    formats = {"json indent=4 (old)": (lambda obj: json.dumps(obj, indent=4).encode(), json.loads)}
+    for name, cls in SERIALIZERS.items():
+        serializer = cls()
+        formats[f"{name} compact"] = (serializer.dumps, serializer.loads)
+
+    print(f"{nodes} nodes")
+    print(f"{'format':<24}{'size KiB':>10}{'dump ms':>10}{'parse ms':>10}")
+    baseline = None
+    for name, (dumps, loads) in formats.items():
+        data = dumps(tree)
+        dumpTime = timeit(lambda: dumps(tree))
+        parseTime = timeit(lambda: loads(data))
+        if baseline is None:
+            baseline = (dumpTime, parseTime)
+        print(f"{name:<24}{len(data) / 1024:>10.0f}{dumpTime:>10.1f}{parseTime:>10.1f}"
+              f"   x{baseline[0] / dumpTime:.1f} / x{baseline[1] / parseTime:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,117 @@
+import math
+import time
+
+from PySide6.QtCore import QObject, QTimer, Qt, Signal
+
+MAX_SECONDS = 24 * 60 * 60 - 1  # 23:59:59, the most a time picker shows
+
+
+def splitSeconds(seconds: int) -> tuple[int, int, int]:
+    """(hours, minutes, seconds) of seconds"""
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return hours, minutes, seconds
+
+
+class ClockEngine(QObject):
+    """ Stopwatch and countdown without any widget
+
+    Time is taken from ``time.monotonic()`` timestamps, so it doesn't drift
+    with late or lost timer ticks. The timer only wakes up at the next whole
+    second to emit ``ticked`` with the seconds to show: the elapsed seconds
+    when counting up, the remaining ones when counting down.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._countDown = False
+        self._duration = 0
+        self._elapsed = 0.0  # seconds run before the current start
+        self._startedAt = None
+        self._lastShown = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._onTimeout)
+
+    def isCountDown(self) -> bool:
+        return self._countDown
+
+    def isRunning(self) -> bool:
+        return self._startedAt is not None
+
+    def isStarted(self) -> bool:
+        """Running or paused"""
+        return self.isRunning() or self._elapsed > 0
+
+    def setCountDown(self, countDown: bool, duration: int = 0) -> None:
+        """Count down from duration seconds, or count up, the clock is reset"""
+        self.reset()
+        self._countDown = countDown
+        self._duration = min(duration, MAX_SECONDS) if countDown else 0
+
+    def setRemaining(self, seconds: int) -> None:
+        """Count down seconds from now on, the seconds already run are kept"""
+        self._duration = min(self.elapsed() + seconds, MAX_SECONDS)
+
+    def elapsed(self) -> float:
+        elapsed = self._elapsed
+        if self._startedAt is not None:
+            elapsed += time.monotonic() - self._startedAt
+        return min(elapsed, self._end())
+
+    def remaining(self) -> float:
+        return self._end() - self.elapsed()
+
+    def shownSeconds(self) -> int:
+        if self._countDown:
+            return math.ceil(self.remaining())
+        return math.floor(self.elapsed())
+
+    def start(self) -> None:
+        """Start, or resume after pause"""
+        if self.isRunning():
+            return
+        self._startedAt = time.monotonic()
+        self._schedule()
+
+    def pause(self) -> None:
+        if not self.isRunning():
+            return
+        self._elapsed = self.elapsed()
+        self._startedAt = None
+        self._timer.stop()
+
+    def stop(self) -> int:
+        """Stop and reset, returns the whole seconds run"""
+        seconds = int(self.elapsed())
+        self.reset()
+        return seconds
+
+    def reset(self) -> None:
+        self._timer.stop()
+        self._startedAt = None
+        self._elapsed = 0.0
+        self._lastShown = None
+
+    def _end(self) -> float:
+        return self._duration if self._countDown else MAX_SECONDS
+
+    def _schedule(self) -> None:
+        # wake up just after the next whole second
+        elapsed = self.elapsed()
+        boundary = min(math.floor(elapsed) + 1, self._end())
+        self._timer.start(max(0, math.ceil((boundary - elapsed) * 1000)) + 1)
+
+    def _onTimeout(self) -> None:
+        shown = self.shownSeconds()
+        if shown != self._lastShown:
+            self._lastShown = shown
+            self.ticked.emit(shown)
+        if self.elapsed() >= self._end():
+            self.finished.emit(self.stop())
+            return
+        self._schedule()
+
+    ticked = Signal(int)  # seconds to show
+    finished = Signal(int)  # seconds run, emitted when the countdown or the stopwatch reaches its end
@@ -0,0 +1,275 @@
+import os
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from threading import Lock
+from typing import Optional, Iterator
+
+from log import logger
+from src.py_qobject import PyQDict, Change
+from src.utils.executor import ioExecutor
+from src.utils.file import DataStorage, readJson
+from src.utils.serializer import serializer
+from src.utils.type_cast import toPlainCopy
+from src.utils.utils import peekSubItems
+
+COLUMNS = ("name", "icon", "hours", "breakTime")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    uid TEXT PRIMARY KEY,
+    parent TEXT,
+    root TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    name TEXT,
+    icon TEXT,
+    hours REAL,
+    breakTime REAL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS items_root ON items (root);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def rowOf(_dict) -> tuple:
+    """(name, icon, hours, breakTime, extra) of a dict or PyQDict node"""
+    extra = {k: toPlainCopy(v) for k, v in _dict.items() if k not in COLUMNS and k not in ("uid", "subItems")}
+    return (_dict.get("name"), _dict.get("icon"), _dict.get("hours", 0.0), _dict.get("breakTime", 0.0),
+            serializer.dumps(extra).decode() if extra else None)
+
+
+class Database:
+    """ Single-file SQLite store of every project tree
+
+    Each project or sub item is one row of ``items``. The connection may be used
+    from any thread, statements are serialized by an internal lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def getMeta(self, key: str, default: str = None) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def setMeta(self, key: str, value: str) -> None:
+        with self.transaction() as cursor:
+            cursor.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def rootUids(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT uid FROM items WHERE parent IS NULL ORDER BY rowid").fetchall()
+        return [row[0] for row in rows]
+
+    def loadTree(self, root: str) -> Optional[dict]:
+        """Rebuild the nested dict of root project"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT uid, parent, name, icon, hours, breakTime, extra FROM items "
+                "WHERE root = ? ORDER BY position", (root,)
+            ).fetchall()
+        nodes: dict[str, dict] = {}
+        children: dict[str, list[dict]] = {}
+        for uid, parent, name, icon, hours, breakTime, extra in rows:
+            node = {"name": name, "icon": icon, "hours": hours, "uid": uid, "breakTime": breakTime}
+            if extra:
+                node.update(serializer.loads(extra))
+            node["subItems"] = children.setdefault(uid, [])
+            nodes[uid] = node
+            if parent is not None:
+                children.setdefault(parent, []).append(node)
+        return nodes.get(root)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            else:
+                cursor.execute("COMMIT")
+
+    def execute(self, statements: list[tuple[str, tuple]]) -> None:
+        """Run statements as one transaction"""
+        with self.transaction() as cursor:
+            for sql, params in statements:
+                cursor.execute(sql, params)
+
+
+def insertStatements(_dict, parent: Optional[str], root: str, position: int) -> list[tuple[str, tuple]]:
+    """Statements inserting the subtree of _dict, nodes without uid get one"""
+    statements = []
+    stack = [(_dict, parent, position)]
+    while stack:
+        node, parent, position = stack.pop()
+        if "uid" not in node:
+            node["uid"] = uuid.uuid4().hex
+        uid = node["uid"]
+        statements.append((
+            "INSERT OR REPLACE INTO items (uid, parent, root, position, name, icon, hours, breakTime, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (uid, parent, root, position, *rowOf(node))
+        ))
+        for i, child in enumerate(peekSubItems(node)):
+            stack.append((child, uid, i))
+    return statements
+
+
+def migrateJsonDirectory(dataPath: str, database: Database) -> int:
+    """Copy every json project of dataPath into database once, returns the number of projects"""
+    if database.getMeta("migrated") is not None:
+        return 0
+    count = 0
+    statements = []
+    for filename in os.listdir(dataPath):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            _dict = readJson(os.path.join(dataPath, filename))
+        except Exception as e:
+            logger.error(f"Skip migrating {filename}: {e}")
+            continue
+        statements += insertStatements(_dict, None, _dict.setdefault("uid", uuid.uuid4().hex), 0)
+        count += 1
+    statements.append(("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", ("migrated", dataPath)))
+    database.execute(statements)
+    logger.info(f"Migrated {count} project(s) from {dataPath} to {database.path}")
+    return count
+
+
+class SqliteDataStorage(DataStorage):
+    """ Stores one root project as rows of the shared database
+
+    Change events of the tree mark the nodes to diff, a dump only compares those
+    nodes with the rows written last time and updates the columns that changed.
+    """
+
+    def __init__(self, database: Database, uid: str, parent=None):
+        super().__init__(database.path, parent)
+        self.database = database
+        self.uid = uid
+        self._rows: dict[str, tuple] = {}  # uid -> (parent, position, *rowOf)
+        self._children: dict[str, list[str]] = {}  # uid -> child uids
+        self._dirty: dict[str, PyQDict] = {}
+
+    @property
+    def name(self) -> str:
+        return self.uid
+
+    def _ioKey(self):
+        # one writer at a time for the whole database file
+        return self.database.path
+
+    def _read(self) -> dict:
+        _dict = self.database.loadTree(self.uid)
+        if _dict is None:
+            raise KeyError(f"Project {self.uid} not in database")
+        return _dict
+
+    def _snapshot(self) -> list[tuple[str, tuple]]:
+        statements = []
+        removed: list[tuple[str, str]] = []  # (uid, parent it left)
+        dirty, self._dirty = self._dirty, {}
+        for uid, node in dirty.items():
+            if uid in self._rows:
+                statements += self._diffNode(node, removed)
+        # rows are deleted once every node is diffed, a child that moved to another parent is kept
+        for uid, parent in removed:
+            statements += self._removeRows(uid, parent)
+        return statements
+
+    def _write(self, snapshot: list[tuple[str, tuple]]) -> None:
+        if snapshot:
+            self.database.execute(snapshot)
+
+    def _delete(self) -> None:
+        self.database.execute([("DELETE FROM items WHERE root = ?", (self.uid,))])
+
+    def create(self, _dict: dict) -> None:
+        statements = insertStatements(_dict, None, self.uid, 0)
+        self._raw = _dict
+        self._loadEvent.set()
+        self._materialize()
+        self._dumpFuture = ioExecutor.submit(self._ioKey(), self._dump, statements)
+        self._dumpFuture.exception()
+
+    def _onMaterialized(self) -> None:
+        self._dict.changed.connect(self._onChanged)
+        self._cacheRows(self._dict, None, 0)
+
+    def _cacheRows(self, node, parent: Optional[str], position: int) -> None:
+        uid = node["uid"]
+        self._rows[uid] = (parent, position, *rowOf(node))
+        children = peekSubItems(node)
+        self._children[uid] = [child["uid"] for child in children]
+        for i, child in enumerate(children):
+            self._cacheRows(child, uid, i)
+
+    def _diffNode(self, node: PyQDict, removed: list[tuple[str, str]]) -> list[tuple[str, tuple]]:
+        statements = []
+        uid = node["uid"]
+        parent, position, *old = self._rows[uid]
+        new = rowOf(node)
+        changed = [(column, value) for column, value, before in zip(COLUMNS + ("extra",), new, old)
+                   if value != before]
+        if changed:
+            sets = ", ".join(f"{column} = ?" for column, _ in changed)
+            statements.append((f"UPDATE items SET {sets} WHERE uid = ?", (*[v for _, v in changed], uid)))
+            self._rows[uid] = (parent, position, *new)
+
+        children = list(peekSubItems(node))
+        childUids = [child["uid"] if "uid" in child else None for child in children]
+        oldUids = self._children.get(uid, [])
+        removed += [(childUid, uid) for childUid in set(oldUids) - set(childUids)]
+        for i, child in enumerate(children):
+            childUid = childUids[i]
+            if childUid is None or childUid not in self._rows:
+                statements += insertStatements(child, uid, self.uid, i)
+                self._cacheRows(child, uid, i)
+            elif self._rows[childUid][:2] != (uid, i):
+                # moved within node or from another parent
+                statements.append(("UPDATE items SET parent = ?, position = ? WHERE uid = ?", (uid, i, childUid)))
+                self._rows[childUid] = (uid, i, *self._rows[childUid][2:])
+        self._children[uid] = [child["uid"] for child in children]
+        return statements
+
+    def _removeRows(self, uid: str, parent: str) -> list[tuple[str, tuple]]:
+        """Delete the subtree of uid removed from parent, nodes now under another parent are skipped"""
+        statements = []
+        stack = [(uid, parent)]
+        while stack:
+            cur, parent = stack.pop()
+            row = self._rows.get(cur)
+            if row is None or row[0] != parent:
+                continue
+            del self._rows[cur]
+            stack += [(child, cur) for child in self._children.pop(cur, [])]
+            # scoped by root, another project may already hold the node
+            statements.append(("DELETE FROM items WHERE uid = ? AND root = ?", (cur, self.uid)))
+        return statements
+
+    def _onChanged(self, change: Change) -> None:
+        # the item row to update is the nearest node around the mutated container
+        for c in (change.new if change.op == "batch" else (change,)):
+            node = c.source
+            while node is not None and not (isinstance(node, PyQDict) and "uid" in node):
+                node = node.owner()
+            if node is not None:
+                self._dirty[node["uid"]] = node
@@ -0,0 +1,103 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Callable, Hashable
+
+from log import logger
+
+MAX_QUEUED = 256
+
+
+class IOExecutor:
+    """ Bounded thread pool shared by the storage layer
+
+    Tasks submitted with the same key (usually a file path) run one at a time in
+    submission order. ``submit`` blocks once ``maxQueued`` tasks are waiting,
+    which keeps a burst of loads from piling up unbounded work.
+    """
+
+    def __init__(self, maxWorkers: int = None, maxQueued: int = MAX_QUEUED):
+        if maxWorkers is None:
+            maxWorkers = min(32, (os.cpu_count() or 1) + 4)
+        self._maxWorkers = maxWorkers
+        self._pool = ThreadPoolExecutor(maxWorkers, thread_name_prefix="io")
+        self._slots = BoundedSemaphore(maxQueued)
+        self._lock = Lock()
+        self._queues: dict[Hashable, deque] = {}  # key -> waiting tasks, present while a task of key runs
+        self._pending = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._maxDepth = 0
+
+    @property
+    def maxWorkers(self) -> int:
+        return self._maxWorkers
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._maxWorkers,
+                "pending": self._pending,
+                "running": self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "maxDepth": self._maxDepth,
+            }
+
+    def queueDepth(self) -> int:
+        with self._lock:
+            return self._pending + self._running
+
+    def shutdown(self, wait=True) -> None:
+        self._pool.shutdown(wait=wait)
+        logger.debug(f"IO executor shutdown: {self.metrics()}")
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs) -> Future:
+        """Run fn(*args, **kwargs) after every earlier task of the same key"""
+        self._slots.acquire()
+        future = Future()
+        task = (future, fn, args, kwargs)
+        with self._lock:
+            self._submitted += 1
+            self._pending += 1
+            self._maxDepth = max(self._maxDepth, self._pending + self._running)
+            if key in self._queues:
+                self._queues[key].append(task)
+                return future
+            self._queues[key] = deque()
+        self._pool.submit(self._run, key, task)
+        return future
+
+    def _run(self, key: Hashable, task: tuple) -> None:
+        # drain the tasks of key on this worker so they keep their submission order
+        while task is not None:
+            future, fn, args, kwargs = task
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+            failed = False
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    failed = True
+                    logger.error(f"IO task {key} failed: {e}")
+                    future.set_exception(e)
+            with self._lock:
+                self._running -= 1
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                queue = self._queues[key]
+                task = queue.popleft() if queue else None
+                if task is None:
+                    del self._queues[key]
+            self._slots.release()
+
+
+ioExecutor = IOExecutor()
@@ -0,0 +1,15 @@
+"""
+Export data files as indented plain json for humans, run from the project root:
+
+    python -m src.utils.export data/<uid>.json <dest>
+"""
+import argparse
+
+from src.utils.file import exportJson
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a data file as indented plain json")
+    parser.add_argument("source")
+    parser.add_argument("dest")
+    args = parser.parse_args()
+    exportJson(args.source, args.dest)
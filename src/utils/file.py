@@ -1,56 +1,280 @@
+import hashlib
 import json
+import math
 import os.path
 import sys
+from concurrent.futures import Future
 from threading import Event
+from typing import Optional
 
-from PySide6.QtCore import QObject, Signal, QThread, Qt
+from PySide6.QtCore import QObject, Signal
 from PySide6.QtWidgets import QApplication
 
+from config import cfgDS
 from log import logger
 from src.py_qobject import PyQDict, PyQList, PyQObjectBase
-from src.utils.type_cast import pyQDictToDictCopy
+from src.utils.executor import ioExecutor
+from src.utils.incremental import IncrementalLoader
+from src.utils.scheduler import dumpScheduler
+from src.utils.serializer import serializer
+from src.utils.type_cast import pyQDictToDictCopy, toPlainCopy
 
+PATCH_SUFFIX = ".patch"
+BACKUP_SUFFIX = ".bak"
+TEMP_SUFFIX = ".tmp"
+MERGE_THRESHOLD = 256  # patch records kept in a sidecar before it is merged into the base file
+ENVELOPE_HEAD = b'{"checksum": "'
+ENVELOPE_DATA = b'", "data": '
 
-class WorkerThread(QThread):
-    def __init__(self, _callable):
-        super().__init__()
-        self._callable = _callable
 
-    def run(self):
-        self._callable()
+class ChecksumError(ValueError):
+    pass
 
 
 def getFilename(path: str) -> str:
     return os.path.basename(path)
 
 
+def fileStamp(path: str) -> list:
+    """[size, mtime] of path, changes whenever the file is rewritten"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def fileGeneration(path: str) -> str:
+    """sha256 of the data of path, read from the envelope when it has one
+
+    Unlike ``fileStamp`` it survives copying or restoring the file.
+    """
+    with open(path, "rb") as f:
+        head = f.read(len(ENVELOPE_HEAD) + 64)
+        if head.startswith(ENVELOPE_HEAD):
+            return head[len(ENVELOPE_HEAD):].decode()
+        return hashlib.sha256((head + f.read()).rstrip()).hexdigest()
+
+
+def _fsyncDir(path: str) -> None:
+    if os.name == "nt":
+        # directories can't be opened on Windows, NTFS journals the rename
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def encodeChecked(doc) -> bytes:
+    """Serialize doc inside an envelope carrying the sha256 of the data"""
+    body = serializer.dumps(doc)
+    return ENVELOPE_HEAD + hashlib.sha256(body).hexdigest().encode() + ENVELOPE_DATA + body + b"}\n"
+
+
+def decodeChecked(raw: bytes):
+    """Parse data written by encodeChecked, plain json files are accepted as is"""
+    raw = raw.rstrip()
+    if not raw.startswith(ENVELOPE_HEAD):
+        return serializer.loads(raw)
+    start = len(ENVELOPE_HEAD)
+    checksum = raw[start:start + 64].decode()
+    body = raw[start + 64 + len(ENVELOPE_DATA):-1]
+    if hashlib.sha256(body).hexdigest() != checksum:
+        raise ChecksumError("checksum mismatch")
+    return serializer.loads(body)
+
+
+def writeAtomic(path: str, data: bytes) -> None:
+    """ Replace path with data so that a crash leaves either generation intact
+
+    data goes to a temp file which is fsynced and then renamed over path, the
+    previous content is kept as ``path.bak``.
+    """
+    tmp = path + TEMP_SUFFIX
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    if os.path.exists(path):
+        os.replace(path, path + BACKUP_SUFFIX)
+    os.replace(tmp, path)
+    _fsyncDir(os.path.dirname(os.path.abspath(path)))
+
+
+def readChecked(path: str) -> tuple[object, bool]:
+    """Read a file written by writeAtomic, returns (doc, fromBackup)
+
+    A missing, truncated or corrupted file falls back to the last good generation.
+    """
+    try:
+        with open(path, "rb") as f:
+            return decodeChecked(f.read()), False
+    except (OSError, ValueError) as e:
+        backup = path + BACKUP_SUFFIX
+        if not os.path.exists(backup):
+            raise
+        logger.warning(f"{os.path.basename(path)} is damaged ({e}), fall back to the last good generation")
+    with open(backup, "rb") as f:
+        return decodeChecked(f.read()), True
+
+
+def applyPatch(doc, record: dict):
+    """Apply one add, remove or replace record to doc, returns the new doc"""
+    op, path = record["op"], record["path"]
+    if path == "":
+        return record["value"]
+    *parents, last = [p.replace("~1", "/").replace("~0", "~") for p in path.split("/")[1:]]
+    target = doc
+    for p in parents:
+        target = target[int(p)] if isinstance(target, list) else target[p]
+    if isinstance(target, list):
+        if op == "add":
+            if last == "-":
+                target.append(record["value"])
+            else:
+                target.insert(int(last), record["value"])
+        elif op == "replace":
+            target[int(last)] = record["value"]
+        else:
+            del target[int(last)]
+    elif op == "remove":
+        del target[last]
+    else:
+        target[last] = record["value"]
+    return doc
+
+
+def readPatchLog(path: str, basePath: str = None) -> Optional[list[dict]]:
+    """ Records of the sidecar of the json file path, None if there is none or it belongs to another base
+
+    The header names the generation of the base the records apply to, basePath
+    is the file to check it against, path by default.
+    """
+    patchPath = path + PATCH_SUFFIX
+    if not os.path.exists(patchPath):
+        return None
+    basePath = basePath or path
+    records = []
+    with open(patchPath, "rb") as f:
+        header = f.readline()
+        try:
+            base = serializer.loads(header).get("base")
+        except json.JSONDecodeError:
+            logger.warning(f"Discard {os.path.basename(patchPath)}, its header is broken")
+            return None
+        # sidecars written before generations were used carry a file stamp
+        current = fileStamp(basePath) if isinstance(base, list) else fileGeneration(basePath)
+        if base != current:
+            logger.warning(f"Discard {os.path.basename(patchPath)}, it belongs to another generation")
+            return None
+        for line in f:
+            try:
+                records.append(serializer.loads(line))
+            except json.JSONDecodeError:
+                # torn tail of a crashed append
+                logger.warning(f"Skip broken patch record in {os.path.basename(patchPath)}")
+                break
+    return records
+
+
+def exportJson(path: str, dest: str) -> None:
+    """Write the data file path as indented plain json for humans"""
+    with open(dest, "wb") as f:
+        f.write(serializer.dumps(readJson(path), pretty=True))
+
+
+def readPatched(path: str) -> tuple[object, Optional[list[dict]], bool]:
+    """ Read a json data file with its patch log applied, returns (doc, records, fromBackup)
+
+    records is None when no sidecar was applied. Records address list items by
+    index, so when the backup is used they are only replayed if the sidecar
+    was written against the backup's generation, e.g. by an interrupted merge.
+    """
+    doc, fromBackup = readChecked(path)
+    records = readPatchLog(path, path + BACKUP_SUFFIX if fromBackup else path)
+    for record in records or ():
+        doc = applyPatch(doc, record)
+    if fromBackup and records:
+        logger.warning(f"Replayed {len(records)} patch record(s) of {os.path.basename(path)} on the backup")
+    return doc, records, fromBackup
+
+
+def readJson(path: str) -> dict:
+    """Read a json data file with its patch log applied"""
+    return readPatched(path)[0]
+
+
 class FileBase(QObject):
     def __init__(self, parent=None):
         super().__init__(parent)
 
 
-class JsonDataStorage(PyQObjectBase):
+class DataStorage(QObject):
+    """ Base of the project data storages
+
+    Subclasses implement ``_read``, ``_write`` and ``_delete``, which run on the
+    I/O executor, and may override ``_snapshot`` which runs on the owner thread.
+    The storage is the Qt bridge of its tree, ``valueChanged`` is emitted for
+    every change below the root and ``changed`` forwards the change events of
+    the root.
+    """
+
     def __init__(self, path: str, parent=None):
         super().__init__(parent)
         self._loaded = False
         self._loadEvent = Event()
-        self._workerThread = None
+        self._dumpFuture: Optional[Future] = None
+        self._raw: Optional[dict] = None  # parsed by an I/O worker, not yet converted
         self._dict = PyQDict()
+        self._lazy = cfgDS.lazyLoad.value  # convert sub items on first access
         self.path = path
         self.valueChanged.connect(self.dump)
-        # self.loaded.connect(self.__initSignal)
+        self._parsed.connect(self._onParsed)
 
     @property
     def dict(self) -> PyQDict:
         self._loadEvent.wait()
+        self._materialize()
         return self._dict
 
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    def batch(self):
+        """``with storage.batch():`` groups changes into one change event and one dump request"""
+        return self.dict.batch()
+
+    def create(self, _dict: dict) -> None:
+        """Initialize a new storage with _dict and write it synchronously"""
+        self._raw = _dict
+        self._loadEvent.set()
+        self._materialize()
+        self.dumpNow(wait=True)
+
     def dump(self):
-        if self._workerThread is not None and self._workerThread.isRunning():
-            logger.debug("wait for last dump thread to finish")
-            self._workerThread.wait()
-        self._workerThread = WorkerThread(self._dump)
-        self._workerThread.start()
+        """Schedule a write-behind dump, bursts of calls are merged into one write"""
+        dumpScheduler.schedule(self)
+
+    def dumpNow(self, wait=False) -> Optional[Future]:
+        """Snapshot the data on the calling thread and write it out, returns the future of the write"""
+        if not self._loaded:
+            logger.warning(f"Skip dumping unloaded data {self.name}")
+            return None
+        snapshot = self._snapshot()
+        # writes of the same storage are serialized by the executor
+        self._dumpFuture = ioExecutor.submit(self._ioKey(), self._dump, snapshot)
+        if wait:
+            self._dumpFuture.exception()
+        return self._dumpFuture
+
+    def close(self):
+        """Drop pending dumps and wait for the running one"""
+        dumpScheduler.cancel(self)
+        if self._dumpFuture is not None:
+            self._dumpFuture.exception()
+
+    def isDumping(self) -> bool:
+        return self._dumpFuture is not None and not self._dumpFuture.done()
 
     def isLoaded(self) -> bool:
         return self._loaded
@@ -60,77 +284,287 @@ class JsonDataStorage(PyQObjectBase):
             logger.warning("Don't reload data")
             return
         self._loadEvent.clear()
-        self._workerThread = WorkerThread(self._load)
-        self._workerThread.finished.connect(self.__initSignal)
-        self._workerThread.start()
-
-    def _dump(self) -> None:
-        _dict = pyQDictToDictCopy(self._dict)
-        with open(self.path, 'w') as f:
-            json.dump(_dict, f, indent=4)
-        logger.debug(f"Dumped data to {os.path.basename(self.path)}")
-        self.dumped.emit()
+        ioExecutor.submit(self._ioKey(), self._load)
 
-    def _load(self) -> None:
+    def materialize(self) -> None:
+        """Build the PyQDict tree from parsed data, must run on the owner thread"""
+        self._materialize()
+        if not self._loaded:
+            logger.error(f"Failed to load data from {self.name}")
+            self.loaded.emit()
+
+    def parse(self) -> None:
+        """Read and parse the data on the calling thread without building the tree"""
+        if self._raw is not None:
+            # primed from the snapshot cache
+            self._loadEvent.set()
+            return
         try:
-            with open(self.path, "r") as f:
-                _dict = json.load(f)
-            self._dict = self._dictToPyQDict(_dict)
-            self._loaded = True
-            logger.debug(f"Loaded data from {os.path.basename(self.path)}")
+            self._raw = self._read()
+            logger.debug(f"Parsed data from {self.name}")
+        except Exception as e:
+            logger.error(f"Failed to parse {self.name}: {e}")
         finally:
             self._loadEvent.set()
-            self.loaded.emit()
+
+    def prime(self, raw: dict) -> None:
+        """Use already parsed data, the next load skips reading"""
+        self._raw = raw
+
+    def remove(self) -> None:
+        """Delete the stored data, pending dumps are dropped"""
+        self.close()
+        ioExecutor.submit(self._ioKey(), self._delete).exception()
+
+    def _ioKey(self):
+        return self.path
+
+    def _read(self) -> dict:
+        raise NotImplementedError
+
+    def _snapshot(self):
+        return pyQDictToDictCopy(self._dict)
+
+    def _write(self, snapshot) -> None:
+        raise NotImplementedError
+
+    def _delete(self) -> None:
+        raise NotImplementedError
+
+    def _dump(self, snapshot) -> None:
+        self._write(snapshot)
+        logger.debug(f"Dumped data to {self.name}")
+        self.dumped.emit()
+
+    def _load(self) -> None:
+        """Parse on an I/O worker, QObjects are created on the owner thread"""
+        self.parse()
+        self._parsed.emit()
+
+    def _materialize(self) -> None:
+        if self._loaded or self._raw is None:
+            return
+        self._dict = self._dictToPyQDict(self._raw)
+        self._raw = None
+        self._loaded = True
+        # the root records its own changes, so a list holding it doesn't see them
+        self._dict.setRecorder(self._record)
+        self.__initSignal()
+        self._onMaterialized()
+        logger.debug(f"Loaded data from {self.name}")
+        self.loaded.emit()
+
+    def _onMaterialized(self) -> None:
+        pass
+
+    def _record(self, op: str, path: str, value) -> None:
+        """Receives every change below the root as a JSON-Patch style record"""
+        pass
+
+    def _onNodeMaterialized(self, node: PyQObjectBase) -> None:
+        pass
+
+    def _onParsed(self) -> None:
+        self.materialize()
+
+    def _buildNode(self, raw, owner: PyQList) -> PyQObjectBase:
+        """Convert a lazy element of owner once it is accessed"""
+        node = self._dictToPyQDict(raw) if isinstance(raw, dict) else self._listToPyQList(raw)
+        node._owner = owner
+        self._connectTree(owner, node)
+        self._onNodeMaterialized(node)
+        self.nodeMaterialized.emit(node)
+        return node
 
     def _listToPyQList(self, _list: list) -> PyQList:
+        # fill the containers directly, a fresh tree has nobody to notify
         res = PyQList()
-        res.blockSignals(True)
-        res.replaceList(_list)
-        i = 0
-        while i < len(res):
-            cur = res[i]
-            if isinstance(cur, dict):
-                res[i] = self._dictToPyQDict(cur)
-            elif isinstance(cur, list):
-                res[i] = self._listToPyQList(cur)
-            i += 1
-        res.blockSignals(False)
+        items = res.list
+        if self._lazy:
+            items.extend(_list)
+            res.setFactory(self._buildNode)
+            return res
+        for i, v in enumerate(_list):
+            if isinstance(v, dict):
+                v = self._dictToPyQDict(v)
+                v._owner, v._key = res, i
+            elif isinstance(v, list):
+                v = self._listToPyQList(v)
+                v._owner, v._key = res, i
+            items.append(v)
         return res
 
     def _dictToPyQDict(self, _dict: dict) -> PyQDict:
         res = PyQDict()
-        res.blockSignals(True)
+        items = res.dict
         for k, v in _dict.items():
             if isinstance(v, dict):
-                res[k] = self._dictToPyQDict(v)
+                v = self._dictToPyQDict(v)
+                v._owner, v._key = res, k
             elif isinstance(v, list):
-                res[k] = self._listToPyQList(v)
-            else:
-                res[k] = v
-        res.blockSignals(False)
+                v = self._listToPyQList(v)
+                v._owner, v._key = res, k
+            items[k] = v
         return res
 
+    def _connectTree(self, parent, child: PyQObjectBase) -> None:
+        child.valueChanged.connect(parent.valueChanged)
+
+        if isinstance(child, PyQDict):
+            values = child.values()
+        elif isinstance(child, PyQList):
+            values = child.list
+        else:
+            return
+        for v in values:
+            if isinstance(v, PyQObjectBase):
+                self._connectTree(child, v)
+
     def __initSignal(self):
-        def DFSConnect(parent: PyQObjectBase, child: PyQObjectBase):
-            child.valueChanged.connect(parent.valueChanged.emit, Qt.ConnectionType.QueuedConnection)
-            if parent is not self:
-                child.setParent(parent)
-
-            if isinstance(child, PyQDict):
-                for v in child.values():
-                    if isinstance(v, PyQObjectBase):
-                        DFSConnect(child, v)
-            elif isinstance(child, PyQList):
-                for v in child:
-                    if isinstance(v, PyQObjectBase):
-                        DFSConnect(child, v)
-
-        DFSConnect(self, self._dict)
+        self._connectTree(self, self._dict)
+        self._dict.changed.connect(self.changed)
 
+    _parsed = Signal()
+    valueChanged = Signal()
+    changed = Signal(object)  # Change
+    nodeMaterialized = Signal(object)  # PyQDict or PyQList of a lazy sub item
     loaded = Signal()
     dumped = Signal()
 
 
+class JsonDataStorage(DataStorage):
+    """ Stores one root project as a json file
+
+    Changes are appended as JSON-Patch records to a ``.patch`` sidecar. The base
+    file is only rewritten on create, once the sidecar holds ``MERGE_THRESHOLD``
+    records, or when ``merge`` is called. The sidecar header names the generation,
+    the sha256 of the base it applies to, so a sidecar left over from an
+    interrupted merge is ignored while a copied data folder keeps its sidecars.
+    Base files are replaced atomically and carry a checksum, a damaged one is
+    restored from the previous generation.
+    """
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(path, parent)
+        self._patches: list[dict] = []  # recorded since the last dump
+        self._patchCount = 0  # records in the sidecar
+        self._rewrite = False
+        self._sidecarValid = False  # only touched by the I/O worker
+
+    @property
+    def patchPath(self) -> str:
+        return self.path + PATCH_SUFFIX
+
+    def create(self, _dict: dict) -> None:
+        self._rewrite = True
+        super().create(_dict)
+
+    def hasSidecar(self) -> bool:
+        return os.path.exists(self.patchPath)
+
+    def merge(self, wait=False) -> None:
+        """Fold the sidecar into the base file"""
+        self._rewrite = True
+        self.dumpNow(wait)
+
+    def _read(self) -> dict:
+        doc, records, fromBackup = readPatched(self.path)
+        self._sidecarValid = records is not None and not fromBackup
+        self._patchCount = len(records or ())
+        # merge a loaded sidecar on the first dump, a torn tail must not be appended to,
+        # a restored backup is written back as the current generation
+        self._rewrite = records is not None or fromBackup
+        return doc
+
+    def _snapshot(self):
+        if self._rewrite or self._patchCount + len(self._patches) > MERGE_THRESHOLD:
+            self._rewrite = False
+            self._patches = []
+            self._patchCount = 0
+            return "base", pyQDictToDictCopy(self._dict)
+        patches, self._patches = self._patches, []
+        self._patchCount += len(patches)
+        return "patch", patches
+
+    def _write(self, snapshot) -> None:
+        kind, body = snapshot
+        if kind == "base":
+            writeAtomic(self.path, encodeChecked(body))
+            if os.path.exists(self.patchPath):
+                os.remove(self.patchPath)
+            self._sidecarValid = False
+        elif body:
+            lines = b"".join(serializer.dumps(record) + b"\n" for record in body)
+            if not self._sidecarValid:
+                lines = serializer.dumps({"base": fileGeneration(self.path)}) + b"\n" + lines
+            with open(self.patchPath, "ab" if self._sidecarValid else "wb") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._sidecarValid = True
+
+    def _delete(self) -> None:
+        os.remove(self.path)
+        for path in (self.patchPath, self.path + BACKUP_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _record(self, op: str, path: str, value) -> None:
+        record = {"op": op, "path": path}
+        if op != "remove":
+            record["value"] = toPlainCopy(value)
+        self._patches.append(record)
+
+
+class BulkLoader(QObject):
+    """ Load many storages at once
+
+    Files are read and parsed in chunks spread over the I/O executor. Parsed
+    storages are then turned into PyQDict trees on the owner thread by an
+    IncrementalLoader, in batches that each fit in ``timeBudget`` ms, so the
+    event loop keeps running.
+    """
+
+    def __init__(self, storages: list[DataStorage], timeBudget: int = 10, parent=None):
+        super().__init__(parent)
+        self._storages = storages
+        self._done = 0
+        self._builder = IncrementalLoader(self._build, timeBudget, self)
+        self._chunkParsed.connect(self._builder.add)
+
+    def cancel(self) -> None:
+        self._builder.cancel()
+
+    def isFinished(self) -> bool:
+        return self._done == len(self._storages)
+
+    def start(self) -> None:
+        total = len(self._storages)
+        if total == 0:
+            self.finished.emit()
+            return
+        chunkSize = max(1, min(256, math.ceil(total / (ioExecutor.maxWorkers * 4))))
+        for i in range(0, total, chunkSize):
+            ioExecutor.submit((id(self), i), self._parseChunk, self._storages[i:i + chunkSize])
+        logger.debug(f"Bulk loading {total} file(s) in chunks of {chunkSize}")
+
+    def _build(self, storage: DataStorage) -> None:
+        storage.materialize()
+        self._done += 1
+        self.progress.emit(self._done, len(self._storages))
+        if self.isFinished():
+            self.finished.emit()
+
+    def _parseChunk(self, chunk: list[DataStorage]) -> None:
+        for storage in chunk:
+            storage.parse()
+        self._chunkParsed.emit(chunk)
+
+    _chunkParsed = Signal(object)
+    progress = Signal(int, int)  # done, total
+    finished = Signal()
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     _path = r"F:\one-more-thing\data\0b97bc434c154140b04d46f6ecf15d6f.json"
@@ -0,0 +1,96 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional
+
+from PySide6.QtCore import QObject, QSize, Signal
+from PySide6.QtGui import QGuiApplication, QImage, QImageReader, QScreen
+
+from log import logger
+from src.utils.executor import ioExecutor
+
+MAX_IMAGES = 4
+
+
+def screenImageSize(screen: QScreen = None) -> QSize:
+    """Device pixels of the available area of screen, the primary one by default"""
+    screen = screen or QGuiApplication.primaryScreen()
+    return screen.availableSize() * screen.devicePixelRatio()
+
+
+class ImageLoader(QObject):
+    """ Decode images on the I/O executor
+
+    Decoded images are kept in a small LRU cache keyed by path, modification
+    time and target size, so an edited file is decoded again. ``load`` returns
+    a cached image at once, otherwise it returns None and ``loaded`` is emitted
+    on the GUI thread with the cache key once the image is decoded. Callers
+    waiting for an image keep the ``key`` they loaded.
+    """
+
+    def __init__(self, maxImages: int = MAX_IMAGES, parent=None):
+        super().__init__(parent)
+        self._maxImages = maxImages
+        self._cache: OrderedDict[tuple, QImage] = OrderedDict()
+        self._pending: dict[tuple, Future] = {}
+        self._decoded.connect(self.__onDecoded)
+
+    def load(self, path: str, size: QSize = None) -> Optional[QImage]:
+        """Image of path scaled to size, None while it is decoded"""
+        key = self.key(path, size)
+        return None if key is None else self.loadKey(key)
+
+    def loadKey(self, key: tuple) -> Optional[QImage]:
+        """Image of a key returned by ``key``, None while it is decoded"""
+        image = self._cache.get(key)
+        if image is not None:
+            self._cache.move_to_end(key)
+            return image
+        if key not in self._pending:
+            self._pending[key] = ioExecutor.submit(key[0], self._decode, key)
+        return None
+
+    def prefetch(self, path: str, size: QSize = None) -> None:
+        """Decode path in the background so a later ``load`` finds it cached"""
+        self.load(path, size)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @staticmethod
+    def key(path: str, size: QSize = None) -> Optional[tuple]:
+        """Cache key (path, mtime, size) of path, None if the file can't be read"""
+        path = os.path.abspath(path)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError as e:
+            logger.error(f"Can't load image {path}: {e}")
+            return None
+        return path, mtime, None if size is None else (size.width(), size.height())
+
+    def _decode(self, key: tuple) -> None:
+        path, _, size = key
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        if size is not None:
+            reader.setScaledSize(QSize(*size))
+        image = reader.read()
+        if image.isNull():
+            logger.error(f"Can't decode image {path}: {reader.errorString()}")
+        self._decoded.emit(key, image)
+
+    def __onDecoded(self, key: tuple, image: QImage):
+        self._pending.pop(key, None)
+        if image.isNull():
+            return
+        self._cache[key] = image
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._maxImages:
+            self._cache.popitem(last=False)
+        self.loaded.emit(key, image)
+
+    _decoded = Signal(object, QImage)  # emitted on an I/O thread
+    loaded = Signal(object, QImage)  # cache key, image
+
+
+imageLoader = ImageLoader()
@@ -0,0 +1,71 @@
+import time
+from collections import deque
+from typing import Callable, Iterable
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class IncrementalLoader(QObject):
+    """ Work through a queue of items on the GUI thread
+
+    ``process(item)`` is called for as many items as fit in ``timeBudget`` ms,
+    then the event loop gets the rest of the frame.
+    """
+
+    def __init__(self, process: Callable[[object], None], timeBudget: int = 10, parent=None):
+        super().__init__(parent)
+        self._process = process
+        self._timeBudget = timeBudget / 1000
+        self._queue: deque = deque()
+        self._done = 0
+        self._total = 0
+        self._cancelled = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._runBatch)
+
+    def add(self, items: Iterable) -> None:
+        """Queue items and start processing them"""
+        if self._cancelled:
+            return
+        items = list(items)
+        self._queue.extend(items)
+        self._total += len(items)
+        if self._queue and not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self) -> None:
+        """Drop every queued item, a cancelled loader takes no new ones"""
+        self._cancelled = True
+        self._queue.clear()
+        self._timer.stop()
+
+    def flush(self) -> None:
+        """Process every queued item now"""
+        while self._queue:
+            self._process(self._queue.popleft())
+            self._done += 1
+        self._runBatch()
+
+    def isCancelled(self) -> bool:
+        return self._cancelled
+
+    def isFinished(self) -> bool:
+        return not self._queue and not self._cancelled
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def _runBatch(self) -> None:
+        deadline = time.perf_counter() + self._timeBudget
+        while self._queue and time.perf_counter() < deadline:
+            self._process(self._queue.popleft())
+            self._done += 1
+        self.progress.emit(self._done, self._total)
+        if not self._queue:
+            self._timer.stop()
+            if not self._cancelled:
+                self.finished.emit()
+
+    progress = Signal(int, int)  # done, total
+    finished = Signal()
@@ -0,0 +1,235 @@
+import json
+import os
+from concurrent.futures import Future
+from typing import Iterable, Optional
+
+from PySide6.QtCore import QObject, Signal, QTimer
+
+import config as cfg
+from log import logger
+from src.py_qobject import PyQDict
+from src.utils.executor import ioExecutor
+from src.utils.scheduler import dumpScheduler
+from src.utils.serializer import serializer
+
+FLUSH_INTERVAL = 1000  # ms
+FLUSH_SIZE = 32  # entries
+HISTORY_SUFFIX = ".history.jsonl"
+
+
+class SessionJournal(QObject):
+    """ Append-only log of time tracking sessions
+
+    Every stop of the counter appends one entry, lines are written in batches
+    and fsynced. ``compact`` folds the entries into the ``hours`` and
+    ``breakTime`` totals of the project tree, writes the storages holding them,
+    and only once those writes are done moves the entries to the history file
+    and rewrites the journal without them. Each node remembers the last folded
+    entry in ``journalSeq``, so compacting twice, or again after a crash before
+    the truncation, never counts twice. Entries of projects that aren't loaded
+    stay in the journal. The journal is read on the I/O executor.
+    """
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.historyPath = os.path.splitext(path)[0] + HISTORY_SUFFIX
+        self._seq = 0
+        self._pending: dict[str, list[dict]] = {}  # uid -> entries not folded into the tree
+        self._buffer: list[bytes] = []
+        self._flushFuture: Optional[Future] = None
+        self._compactFuture: Optional[Future] = None
+        self._tornTail = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.flush)
+        self._loaded = False
+        self._readDone.connect(self.waitForLoaded)
+        self._readFuture = ioExecutor.submit(self.path, self._read)
+        self._readFuture.add_done_callback(lambda _: self._readDone.emit())
+
+    def append(self, uid: str, start: float, end: float, duration: float, breakTime: float = 0) -> dict:
+        """Record a session, times are timestamps and durations are seconds"""
+        self.waitForLoaded()
+        self._seq += 1
+        entry = {
+            "seq": self._seq,
+            "uid": uid,
+            "start": start,
+            "end": end,
+            "duration": duration,
+            "breakTime": breakTime
+        }
+        self._pending.setdefault(uid, []).append(entry)
+        self._buffer.append(serializer.dumps(entry))
+        if len(self._buffer) >= FLUSH_SIZE:
+            self.flush()
+        elif not self._timer.isActive():
+            self._timer.start(FLUSH_INTERVAL)
+        self.pendingChanged.emit(uid)
+        self.appended.emit(uid)
+        return entry
+
+    def compact(self, nodes: Iterable[PyQDict], storages: Iterable = ()) -> int:
+        """ Fold pending entries into the totals of nodes, returns the number of entries folded
+
+        storages are the data storages holding nodes, the folded entries are
+        removed from the journal only after they are written.
+        """
+        self.waitForLoaded()
+        self.flush(wait=True)
+        count = 0
+        done: list[dict] = []
+        for node in nodes:
+            entries = self._pending.pop(node.get("uid"), None)
+            if not entries:
+                continue
+            done += entries
+            self.pendingChanged.emit(node["uid"])
+            entries = [e for e in entries if e["seq"] > node.get("journalSeq", 0)]
+            if not entries:
+                continue
+            with node.batch():
+                node["hours"] = node.get("hours", 0.0) + sum(e["duration"] for e in entries) / 3600
+                node["breakTime"] = node.get("breakTime", 0.0) + sum(e["breakTime"] for e in entries) / 3600
+                node["journalSeq"] = entries[-1]["seq"]
+            count += len(entries)
+        if self._pending:
+            logger.info(f"Keep journal entries of {len(self._pending)} project(s) not loaded")
+        if done:
+            dumps = []
+            for storage in storages:
+                dumpScheduler.cancel(storage)
+                future = storage.dumpNow()
+                if future is not None:
+                    dumps.append(future)
+            self._compactFuture = Future()
+            self._truncateAfter(dumps, done, self._seq, self._compactFuture)
+        logger.debug(f"Compacted {count} session(s)")
+        self.compacted.emit()
+        return count
+
+    def flush(self, wait=False) -> None:
+        """Write buffered entries and fsync them, waiting also waits for the last compaction"""
+        self._timer.stop()
+        if self._buffer:
+            lines, self._buffer = self._buffer, []
+            self._flushFuture = ioExecutor.submit(self.path, self._write, lines)
+        if wait:
+            for future in (self._compactFuture, self._flushFuture):
+                if future is not None:
+                    future.exception()
+
+    def hasPending(self) -> bool:
+        self.waitForLoaded()
+        return bool(self._pending)
+
+    def pendingUids(self) -> list[str]:
+        return list(self._pending.keys())
+
+    def pendingHours(self, uid: str) -> float:
+        """Hours of uid recorded since the last compaction"""
+        return sum(e["duration"] for e in self._pending.get(uid, ())) / 3600
+
+    def isLoaded(self) -> bool:
+        return self._loaded
+
+    def sessions(self, uid: str = None) -> list[dict]:
+        """Session history, of every project when uid is None, the history file is read on the calling thread"""
+        self.flush(wait=True)
+        entries = self._readLines(self.historyPath)[0]
+        entries += sorted((e for es in self._pending.values() for e in es), key=lambda e: e["seq"])
+        if uid is None:
+            return entries
+        return [e for e in entries if e["uid"] == uid]
+
+    def waitForLoaded(self) -> None:
+        """Block until the journal is read, usually it already is"""
+        if self._loaded:
+            return
+        try:
+            entries, seq = self._readFuture.result()
+        except Exception as e:
+            logger.error(f"Failed to read {self.path}: {e}")
+            entries, seq = [], 0
+        self.__apply(entries, seq)
+
+    @staticmethod
+    def _readLines(path: str) -> tuple[list[dict], bool]:
+        """Entries of a journal file and whether its last line is torn"""
+        entries = []
+        if not os.path.exists(path):
+            return entries, False
+        line = b""
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(serializer.loads(line))
+                except json.JSONDecodeError:
+                    # torn tail of a crashed write
+                    logger.warning(f"Skip broken journal line: {line!r}")
+        return entries, bool(line) and not line.endswith(b"\n")
+
+    def _read(self) -> tuple[list[dict], int]:
+        entries, self._tornTail = self._readLines(self.path)
+        seq = max((e["seq"] for e in entries), default=0)
+        # lines without uid only keep the seq of folded entries
+        return [e for e in entries if "uid" in e], seq
+
+    def _truncateAfter(self, dumps: list[Future], entries: list[dict], seq: int, result: Future, i: int = 0) -> None:
+        """Submit the truncation once every dump is done, result is set when it is written"""
+        if i < len(dumps):
+            dumps[i].add_done_callback(lambda _: self._truncateAfter(dumps, entries, seq, result, i + 1))
+            return
+        if any(future.exception() is not None for future in dumps):
+            # the entries are folded again on the next start
+            logger.error(f"Keep {len(entries)} folded journal entries, their projects weren't written")
+            result.set_result(None)
+            return
+        future = ioExecutor.submit(self.path, self._truncate, entries, seq)
+        future.add_done_callback(lambda f: result.set_result(None))
+
+    def _truncate(self, entries: list[dict], seq: int) -> None:
+        """Move folded entries to the history file, the journal keeps the other entries and the last seq"""
+        with open(self.historyPath, "ab") as f:
+            f.write(b"".join(serializer.dumps(e) + b"\n" for e in sorted(entries, key=lambda e: e["seq"])))
+            f.flush()
+            os.fsync(f.fileno())
+        # entries written since the compaction are kept
+        folded = {e["seq"] for e in entries}
+        kept = [e for e in self._readLines(self.path)[0] if "uid" in e and e["seq"] not in folded]
+        tempPath = self.path + ".tmp"
+        with open(tempPath, "wb") as f:
+            f.write(b"".join(serializer.dumps(e) + b"\n" for e in [{"seq": seq}] + kept))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tempPath, self.path)
+        self._tornTail = False
+
+    def _write(self, lines: list[bytes]) -> None:
+        with open(self.path, "ab") as f:
+            if self._tornTail:
+                f.write(b"\n")
+                self._tornTail = False
+            f.write(b"\n".join(lines) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __apply(self, entries: list[dict], seq: int) -> None:
+        self._loaded = True
+        self._seq = max(self._seq, seq)
+        for entry in entries:
+            self._pending.setdefault(entry["uid"], []).append(entry)
+        logger.debug(f"Read {len(entries)} session(s) from {os.path.basename(self.path)}")
+        for uid in self._pending:
+            self.pendingChanged.emit(uid)
+
+    _readDone = Signal()  # emitted on an I/O thread
+    appended = Signal(str)  # uid
+    pendingChanged = Signal(str)  # uid
+    compacted = Signal()
+
+
+sessionJournal = SessionJournal(cfg.journalPath)
@@ -0,0 +1,257 @@
+from typing import Callable, Optional
+
+from src.py_qobject import PyQDict, PyQList, Change
+from src.utils.utils import peekSubItems
+
+
+class IndexEntry:
+    """ Index record of one project or sub item
+
+    Besides the links, an entry keeps the rollups of its subtree: total hours
+    (pending journal hours included), total break time and the number of
+    descendants.
+    """
+    __slots__ = ("uid", "node", "parent", "data", "pending", "totalHours", "totalBreakTime", "descendants")
+
+    def __init__(self, uid: str, node, parent: Optional["IndexEntry"], data, pending: float = 0.0):
+        self.uid = uid
+        self.node = node  # PyQDict, or the plain dict of a lazy sub item
+        self.parent = parent
+        self.data = data  # SourceData of the root project
+        self.pending = pending  # journal hours not folded into the node yet
+        self.totalHours = (node.get("hours") or 0.0) + pending
+        self.totalBreakTime = node.get("breakTime") or 0.0
+        self.descendants = 0
+
+
+class NodeIndex:
+    """ uid -> node index over every project tree
+
+    Entries link to their parent entry. The index follows the trees through
+    their change events, lazy sub items are replaced by their PyQDict once the
+    storage converts them. A change of hours or break time updates the rollups
+    along the ancestors only, ``onTotalsChanged(uid)`` is called once for every
+    entry whose rollups changed. Observers get ``entryAdded``, ``entryRemoved``
+    and ``entryChanged`` (name or icon) calls with the entry.
+
+    ``move`` relinks an entry and moves its rollups from the old ancestors to
+    the new ones without touching the subtree. A sub item removed from one list
+    and added to another within one change event, e.g. a batch, is moved the
+    same way.
+    """
+
+    def __init__(self, onTotalsChanged: Callable[[str], None] = None):
+        self._entries: dict[str, IndexEntry] = {}
+        self._pending: dict[str, float] = {}
+        self._touched: set[str] = set()
+        self._onTotalsChanged = onTotalsChanged
+        self._observers: list = []
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def addObserver(self, observer) -> None:
+        """observer is told about every later change, see entries for the current ones"""
+        self._observers.append(observer)
+
+    def ancestors(self, uid: str) -> list[IndexEntry]:
+        """Entries from the root down to the parent of uid"""
+        entry = self._entries.get(uid)
+        res = []
+        while entry is not None and entry.parent is not None:
+            entry = entry.parent
+            res.append(entry)
+        return res[::-1]
+
+    def entry(self, uid: str) -> Optional[IndexEntry]:
+        return self._entries.get(uid)
+
+    def entries(self) -> list[IndexEntry]:
+        return list(self._entries.values())
+
+    def node(self, uid: str) -> Optional[PyQDict]:
+        """PyQDict of uid, a lazy sub item and its ancestors are converted on the way"""
+        entry = self._entries.get(uid)
+        if entry is None:
+            return None
+        if not isinstance(entry.node, PyQDict):
+            parent = self.node(entry.parent.uid)
+            subItems = parent["subItems"]
+            for i, child in enumerate(subItems.list):
+                if child is entry.node:
+                    entry.node = subItems[i]
+                    break
+        return entry.node
+
+    def parentUid(self, uid: str) -> Optional[str]:
+        entry = self._entries.get(uid)
+        if entry is None or entry.parent is None:
+            return None
+        return entry.parent.uid
+
+    def totalHours(self, uid: str) -> float:
+        entry = self._entries.get(uid)
+        return 0.0 if entry is None else entry.totalHours
+
+    def addTree(self, node, parentUid: Optional[str], data) -> None:
+        """Index node and everything below it"""
+        parent = self._entries.get(parentUid) if parentUid is not None else None
+        added = []
+        stack = [(node, parent)]
+        while stack:
+            node, parent = stack.pop()
+            uid = node.get("uid")
+            if uid is None:
+                continue
+            entry = IndexEntry(uid, node, parent, data, self._pending.get(uid, 0.0))
+            self._entries[uid] = entry
+            added.append(entry)
+            for observer in self._observers:
+                observer.entryAdded(entry)
+            for child in peekSubItems(node):
+                stack.append((child, entry))
+        if not added:
+            return
+        # children were added after their parent, fold the subtree bottom-up
+        top = added[0]
+        for entry in reversed(added[1:]):
+            entry.parent.totalHours += entry.totalHours
+            entry.parent.totalBreakTime += entry.totalBreakTime
+            entry.parent.descendants += entry.descendants + 1
+        self._propagate(top.parent, top.totalHours, top.totalBreakTime, top.descendants + 1)
+
+    def move(self, uid: str, newParentUid: str) -> bool:
+        """Put uid and its subtree under newParentUid, returns False if either is unknown"""
+        entry = self._entries.get(uid)
+        newParent = self._entries.get(newParentUid)
+        if entry is None or newParent is None:
+            return False
+        self._relink(entry, newParent)
+        self._emitTouched()
+        return True
+
+    def removeTree(self, node) -> None:
+        """Drop node and everything below it"""
+        top = self._entries.get(node.get("uid"))
+        if top is not None:
+            self._propagate(top.parent, -top.totalHours, -top.totalBreakTime, -top.descendants - 1)
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            entry = self._entries.pop(node.get("uid"), None)
+            if entry is not None:
+                for observer in self._observers:
+                    observer.entryRemoved(entry)
+            stack.extend(peekSubItems(node))
+
+    def setNode(self, node) -> None:
+        """Point the entry of node at node, called once a lazy sub item was converted"""
+        if not isinstance(node, PyQDict):
+            return
+        entry = self._entries.get(node.get("uid"))
+        if entry is not None:
+            entry.node = node
+
+    def setPending(self, uid: str, hours: float) -> None:
+        """Journal hours of uid not folded into the node yet"""
+        old = self._pending.pop(uid, 0.0)
+        if hours:
+            self._pending[uid] = hours
+        entry = self._entries.get(uid)
+        if entry is not None and hours != old:
+            entry.pending = hours
+            self._propagate(entry, hours - old, 0.0, 0)
+        self._emitTouched()
+
+    def applyChange(self, change: Change) -> None:
+        """Follow a change event of a root project"""
+        # removals wait for the adds of the event, a sub item added elsewhere was moved
+        removed: list[tuple[object, IndexEntry]] = []
+        for c in (change.new if change.op == "batch" else (change,)):
+            source = c.source
+            if isinstance(source, PyQList):
+                owner = source.owner()
+                if not isinstance(owner, PyQDict) or owner.get("subItems") is not source:
+                    continue
+                entry = self._entries.get(owner.get("uid"))
+                if entry is None:
+                    continue
+                if c.op in ("remove", "replace") and c.old is not None:
+                    for old in (c.old if isinstance(c.old, list) else (c.old,)):
+                        removed.append((old, entry))
+                if c.op == "add":
+                    self._addOrMove(c.new, entry)
+                elif c.op == "replace":
+                    for new in (peekSubItems(owner) if c.new is source else (c.new,)):
+                        self._addOrMove(new, entry)
+            elif isinstance(source, PyQDict) and "uid" in source:
+                key = c.path.rsplit("/", 1)[-1]
+                entry = self._entries.get(source["uid"])
+                if entry is None:
+                    continue
+                if key == "subItems":
+                    # the whole sub item list was replaced
+                    for old in (c.old.list if isinstance(c.old, PyQList) else c.old or ()):
+                        removed.append((old, entry))
+                    for new in peekSubItems(source):
+                        self._addOrMove(new, entry)
+                elif key in ("name", "icon") or c.new is source:
+                    for observer in self._observers:
+                        observer.entryChanged(entry)
+                elif key in ("hours", "breakTime"):
+                    delta = (0.0 if c.op == "remove" else c.new or 0.0) - (c.old or 0.0)
+                    if key == "hours":
+                        self._propagate(entry, delta, 0.0, 0)
+                    else:
+                        self._propagate(entry, 0.0, delta, 0)
+        for old, parent in removed:
+            top = self._entries.get(old.get("uid"))
+            if top is not None and top.parent is parent:
+                self.removeTree(old)
+        self._emitTouched()
+
+    def _addOrMove(self, node, parent: IndexEntry) -> None:
+        entry = self._entries.get(node.get("uid"))
+        if entry is None:
+            self.addTree(node, parent.uid, parent.data)
+        else:
+            if isinstance(node, PyQDict):
+                entry.node = node
+            if entry.parent is not parent:
+                self._relink(entry, parent)
+
+    def _relink(self, entry: IndexEntry, parent: IndexEntry) -> None:
+        ancestor = parent
+        while ancestor is not None:
+            if ancestor is entry:
+                raise ValueError(f"Can't move {entry.uid} below itself")
+            ancestor = ancestor.parent
+        self._propagate(entry.parent, -entry.totalHours, -entry.totalBreakTime, -entry.descendants - 1)
+        entry.parent = parent
+        self._propagate(parent, entry.totalHours, entry.totalBreakTime, entry.descendants + 1)
+        if entry.data is not parent.data:
+            # moved to another project, only then the subtree is walked
+            stack = [entry.node]
+            while stack:
+                node = stack.pop()
+                e = self._entries.get(node.get("uid"))
+                if e is not None:
+                    e.data = parent.data
+                stack.extend(peekSubItems(node))
+
+    def _propagate(self, entry: Optional[IndexEntry], hours: float, breakTime: float, descendants: int) -> None:
+        while entry is not None:
+            entry.totalHours += hours
+            entry.totalBreakTime += breakTime
+            entry.descendants += descendants
+            self._touched.add(entry.uid)
+            entry = entry.parent
+
+    def _emitTouched(self) -> None:
+        touched, self._touched = self._touched, set()
+        if self._onTotalsChanged is not None:
+            for uid in touched:
+                self._onTotalsChanged(uid)
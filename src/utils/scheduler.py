@@ -0,0 +1,94 @@
+import math
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal, QCoreApplication
+
+from config import cfgDS
+from log import logger
+
+RETRY_INTERVAL = 50  # ms, how long a due storage waits for its previous write
+
+
+class DumpScheduler(QObject):
+    """ Write-behind scheduler for data storages
+
+    Bursts of dump requests are merged into a single write per storage. A storage
+    is written once no request arrived for ``dumpDebounce`` ms, but never later
+    than ``dumpMaxLatency`` ms after its first pending request.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pending: dict[QObject, list[float]] = {}  # storage -> [first request, last request]
+        self._timer: QTimer | None = None
+        self.requested.connect(self._schedule)
+
+    def cancel(self, storage) -> None:
+        """Drop the pending request of storage without writing it"""
+        self._pending.pop(storage, None)
+
+    def flush(self, storage=None) -> None:
+        """Write pending storages synchronously, used on shutdown"""
+        # deliver change notifications still queued in the event loop
+        QCoreApplication.sendPostedEvents()
+        if storage is None:
+            storages = list(self._pending.keys())
+        else:
+            storages = [storage] if storage in self._pending else []
+        for s in storages:
+            del self._pending[s]
+            s.dumpNow(wait=True)
+        logger.debug(f"Flushed {len(storages)} pending dump(s)")
+
+    def isPending(self, storage) -> bool:
+        return storage in self._pending
+
+    def schedule(self, storage) -> None:
+        """Request a dump of storage, safe to call from any thread"""
+        self.requested.emit(storage)
+
+    def _deadline(self, entry: list[float]) -> float:
+        debounce = cfgDS.dumpDebounce.value / 1000
+        maxLatency = cfgDS.dumpMaxLatency.value / 1000
+        return min(entry[1] + debounce, entry[0] + maxLatency)
+
+    def _restartTimer(self, minDelay: int = 0) -> None:
+        if not self._pending:
+            if self._timer is not None:
+                self._timer.stop()
+            return
+        if self._timer is None:
+            self._timer = QTimer(self)
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self._onTimeout)
+        deadline = min(self._deadline(entry) for entry in self._pending.values())
+        # rounded up, a timer firing before the deadline would otherwise restart with 0 ms and spin
+        delay = max(math.ceil((deadline - time.monotonic()) * 1000), minDelay, 1)
+        self._timer.start(delay)
+
+    def _schedule(self, storage) -> None:
+        now = time.monotonic()
+        entry = self._pending.get(storage)
+        if entry is None:
+            self._pending[storage] = [now, now]
+        else:
+            entry[1] = now
+        self._restartTimer()
+
+    def _onTimeout(self) -> None:
+        now = time.monotonic()
+        busy = False
+        for storage, entry in list(self._pending.items()):
+            if self._deadline(entry) > now:
+                continue
+            if storage.isDumping():
+                busy = True
+                continue
+            del self._pending[storage]
+            storage.dumpNow()
+        self._restartTimer(RETRY_INTERVAL if busy else 0)
+
+    requested = Signal(QObject)
+
+
+dumpScheduler = DumpScheduler()
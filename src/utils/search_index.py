@@ -0,0 +1,111 @@
+import heapq
+from typing import Optional
+
+from src.utils.node_index import IndexEntry
+
+
+def iconTag(icon: str) -> str:
+    """Searchable tag of an icon name, "OMT-go_to_work" -> "go to work\""""
+    return icon.rsplit("-", 1)[-1].replace("_", " ") if icon else ""
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """ Name and icon search over every node of a NodeIndex
+
+    Texts are indexed by trigram, and the one and two letter prefixes of their
+    words are indexed for short queries. As an observer of a NodeIndex it
+    follows added, removed and renamed nodes, nodes indexed before are added
+    with ``entryAdded``.
+    """
+
+    def __init__(self):
+        self._texts: dict[str, str] = {}
+        self._grams: dict[str, set[str]] = {}
+        self._prefixes: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, uid: str, name: str, icon: str) -> None:
+        self.remove(uid)
+        text = f"{name} {iconTag(icon)}".lower()
+        self._texts[uid] = text
+        for gram in trigrams(text):
+            self._grams.setdefault(gram, set()).add(uid)
+        for prefix in self._prefixesOf(text):
+            self._prefixes.setdefault(prefix, set()).add(uid)
+
+    def remove(self, uid: str) -> None:
+        text = self._texts.pop(uid, None)
+        if text is None:
+            return
+        for gram in trigrams(text):
+            self._discard(self._grams, gram, uid)
+        for prefix in self._prefixesOf(text):
+            self._discard(self._prefixes, prefix, uid)
+
+    def search(self, query: str, limit: int = 200, fuzzy: bool = False) -> list[str]:
+        """ Uids of the nodes matching query, best matches first
+
+        A query matches a name or icon containing it, queries shorter than
+        three letters match the start of a word. With fuzzy, texts sharing at
+        least half of the trigrams of query match too.
+        """
+        query = " ".join(query.lower().split())
+        if not query:
+            return []
+        if len(query) < 3:
+            uids = self._prefixes.get(query, ())
+            return self._rank(query, uids, limit)
+        grams = trigrams(query)
+        sets = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+        candidates = set.intersection(*sets) if sets[0] else set()
+        matches = [uid for uid in candidates if query in self._texts[uid]]
+        if fuzzy and len(matches) < limit:
+            scores: dict[str, int] = {}
+            for s in sets:
+                for uid in s:
+                    scores[uid] = scores.get(uid, 0) + 1
+            found = set(matches)
+            need = max(1, (len(grams) + 1) // 2)
+            similar = sorted((uid for uid, score in scores.items() if score >= need and uid not in found),
+                             key=lambda uid: (-scores[uid], len(self._texts[uid])))
+            return self._rank(query, matches, limit) + similar[:limit - len(matches)]
+        return self._rank(query, matches, limit)
+
+    def entryAdded(self, entry: IndexEntry) -> None:
+        self.add(entry.uid, entry.node.get("name") or "", entry.node.get("icon") or "")
+
+    def entryRemoved(self, entry: IndexEntry) -> None:
+        self.remove(entry.uid)
+
+    entryChanged = entryAdded
+
+    def _rank(self, query: str, uids, limit: int) -> list[str]:
+        def key(uid: str):
+            text = self._texts[uid]
+            if text.startswith(query):
+                rank = 0
+            elif f" {query}" in text:
+                rank = 1
+            else:
+                rank = 2
+            return rank, len(text), text
+
+        return heapq.nsmallest(limit, uids, key=key)
+
+    @staticmethod
+    def _prefixesOf(text: str) -> set[str]:
+        return {word[:n] for word in text.split() for n in (1, 2)}
+
+    @staticmethod
+    def _discard(postings: dict[str, set[str]], key: str, uid: str) -> None:
+        uids: Optional[set[str]] = postings.get(key)
+        if uids is not None:
+            uids.discard(uid)
+            if not uids:
+                del postings[key]
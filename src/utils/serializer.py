@@ -0,0 +1,55 @@
+import json
+from typing import Any
+
+from config import cfgDS
+from log import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonSerializer:
+    """Serializer on top of the standard json module"""
+    name = "json"
+
+    def dumps(self, obj: Any, pretty=False) -> bytes:
+        if pretty:
+            # the indent orjson supports, exported files look the same with either backend
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """Serializer on top of orjson, several times faster than json"""
+    name = "orjson"
+
+    def dumps(self, obj: Any, pretty=False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    def loads(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+SERIALIZERS = {"json": JsonSerializer}
+if orjson is not None:
+    SERIALIZERS["orjson"] = OrjsonSerializer
+
+
+def getSerializer(name: str = "auto") -> JsonSerializer:
+    """The serializer called name, "auto" picks the fastest one installed"""
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+        if orjson is None:
+            logger.info("orjson is not installed, use json")
+    if name not in SERIALIZERS:
+        logger.warning(f"Serializer {name} is not available, use json")
+        name = "json"
+    return SERIALIZERS[name]()
+
+
+serializer = getSerializer(cfgDS.serializer.value)
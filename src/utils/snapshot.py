@@ -0,0 +1,85 @@
+import os
+import pickle
+import time
+from typing import Iterable, Optional
+
+from log import logger
+from src.utils.file import JsonDataStorage, fileStamp, writeAtomic
+from src.utils.type_cast import pyQDictToDictCopy
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotCache:
+    """ Pickled copy of every json project for a fast cold start
+
+    The whole cache is read at once. An entry is only used while the stamp of
+    its file is unchanged and the file has no patch sidecar, other files are
+    parsed as usual.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: dict[str, tuple[list, dict]] = {}  # filename -> (stamp, data)
+
+    def load(self) -> int:
+        """Read the cache file, returns the number of entries"""
+        if not os.path.exists(self.path):
+            return 0
+        start = time.perf_counter()
+        try:
+            with open(self.path, "rb") as f:
+                snapshot = pickle.load(f)
+            if snapshot.get("version") == SNAPSHOT_VERSION:
+                self._entries = snapshot["entries"]
+        except Exception as e:
+            logger.warning(f"Ignore broken snapshot {self.path}: {e}")
+            self._entries = {}
+        logger.debug(f"Read {len(self._entries)} snapshot entries in {time.perf_counter() - start}")
+        return len(self._entries)
+
+    def lookup(self, storage: JsonDataStorage) -> Optional[dict]:
+        """Cached data of storage, None if it changed since the snapshot was written"""
+        entry = self._entries.get(os.path.basename(storage.path))
+        if entry is None or storage.hasSidecar():
+            return None
+        try:
+            if fileStamp(storage.path) != entry[0]:
+                return None
+        except OSError:
+            return None
+        return entry[1]
+
+    def save(self, storages: Iterable[JsonDataStorage]) -> bool:
+        """ Write loaded storages, their pending dumps must have been flushed
+
+        Only storages whose file stamp changed since the last snapshot are
+        copied again, nothing is written when none did. Returns whether the
+        snapshot was written.
+        """
+        entries = {}
+        changed = 0
+        for storage in storages:
+            if not storage.isLoaded():
+                continue
+            if storage.hasSidecar():
+                storage.merge(wait=True)
+            name = os.path.basename(storage.path)
+            try:
+                stamp = fileStamp(storage.path)
+            except OSError as e:
+                logger.warning(f"Skip snapshot of {storage.name}: {e}")
+                continue
+            entry = self._entries.get(name)
+            if entry is None or entry[0] != stamp:
+                entry = (stamp, pyQDictToDictCopy(storage.dict))
+                changed += 1
+            entries[name] = entry
+        if not changed and entries.keys() == self._entries.keys():
+            logger.debug("Snapshot is up to date")
+            return False
+        writeAtomic(self.path, pickle.dumps({"version": SNAPSHOT_VERSION, "entries": entries},
+                                            protocol=pickle.HIGHEST_PROTOCOL))
+        self._entries = entries
+        logger.debug(f"Saved snapshot of {len(entries)} data(s), {changed} changed")
+        return True
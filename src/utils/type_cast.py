@@ -51,6 +51,15 @@ def pyQDictToDictCopy(_dict: PyQDict) -> dict:
     return res
 
 
+def toPlainCopy(value):
+    """Plain copy of a PyQDict or PyQList, other values are returned as is"""
+    if isinstance(value, PyQDict):
+        return pyQDictToDictCopy(value)
+    elif isinstance(value, PyQList):
+        return pyQListToListCopy(value)
+    return value
+
+
 def pyQListToList(_list: PyQList) -> list:
     res = _list.list
     i = 0
@@ -67,8 +76,9 @@ def pyQListToList(_list: PyQList) -> list:
 
 
 def pyQListToListCopy(_list: PyQList) -> list:
+    # lazy elements are still plain and never mutated, they are shared
     res = list()
-    for v in _list:
+    for v in _list.list:
         if isinstance(v, PyQDict):
             v = pyQDictToDictCopy(v)
             res.append(v)
@@ -1,3 +1,4 @@
+
 from PySide6.QtCore import QRect, Qt
 from PySide6.QtWidgets import QLabel
 
@@ -13,7 +14,7 @@ def addSubItem(_dict: PyQDict, item: PyQDict) -> bool:
     try:
         _list: PyQList = _dict["subItems"]
         _list.append(item)
-        item.valueChanged.connect(_list.valueChanged.emit, Qt.ConnectionType.UniqueConnection)
+        item.valueChanged.connect(_list.valueChanged, Qt.ConnectionType.UniqueConnection)
         return True
     except Exception as e:
         logger.error(f"{e}")
@@ -29,3 +30,9 @@ def removeSubItem(_dict: PyQDict, item: PyQDict) -> bool:
     except Exception as e:
         logger.error(f"{e}")
         return False
+
+
+def peekSubItems(_dict) -> list:
+    """Sub items of a PyQDict or dict node, lazy ones are returned unconverted"""
+    subItems = _dict.get("subItems", [])
+    return subItems.list if isinstance(subItems, PyQList) else subItems
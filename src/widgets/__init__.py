@@ -1,4 +1,5 @@
 from .card_layout import CardLayout
+from .clock_face import ClockFace, isExposed
 from .time_picker import TimePicker, getNextHour, getNextMinute, getNextSecond
 from .timer_label import TimerLabel
 from .icon import OMThingIcon, ProjectIcon
@@ -0,0 +1,134 @@
+from PySide6.QtCore import Qt, QTimer, QRectF, QPointF, QEasingCurve
+from PySide6.QtGui import QPainter, QColor, QFont, QFontMetricsF, QStaticText, QPaintEvent, QTransform
+from PySide6.QtWidgets import QWidget
+from qfluentwidgets import qconfig, isDarkTheme
+
+from src.utils.clock import ClockEngine, splitSeconds
+
+FRAME_INTERVAL = 16  # ms
+ROLL_FRAMES = 6  # frames of a digit roll, about the picker's 80 ms float
+ROLL_CURVE = tuple(QEasingCurve(QEasingCurve.Type.InOutQuad).valueForProgress(i / ROLL_FRAMES)
+                   for i in range(ROLL_FRAMES + 1))
+
+
+def isExposed(widget: QWidget) -> bool:
+    """Whether widget can be seen, False when its window is hidden, minimized or occluded"""
+    if not widget.isVisible():
+        return False
+    window = widget.window()
+    if window.isMinimized():
+        return False
+    handle = window.windowHandle()
+    return handle is not None and handle.isExposed()
+
+
+class ClockFace(QWidget):
+    """ Painted "hh:mm:ss" of a ClockEngine
+
+    Digits are drawn from cached QStaticText, a changed unit rolls to its new
+    value along a precomputed curve and only its rect is repainted. Nothing is
+    animated or repainted while the window can't be seen, the latest time is
+    painted once it is exposed again.
+    """
+
+    def __init__(self, engine: ClockEngine, parent=None, seconds: int = 0):
+        super().__init__(parent)
+        self.engine = engine
+        self._shown = splitSeconds(seconds)
+        self._previous = self._shown
+        self._frame = ROLL_FRAMES
+        self._font = QFont("Segoe UI")
+        self._texts: dict[str, QStaticText] = {}
+        self._unitRects: list[QRectF] = []
+        self._colonPos: list[QPointF] = []
+        self._rollTimer = QTimer(self)
+        self._rollTimer.setInterval(FRAME_INTERVAL)
+        self._rollTimer.timeout.connect(self._nextFrame)
+
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.engine.ticked.connect(self.setSeconds)
+        qconfig.themeChangedFinished.connect(self.update)
+
+    def setSeconds(self, seconds: int) -> None:
+        shown = splitSeconds(seconds)
+        if shown == self._shown:
+            return
+        self._previous, self._shown = self._shown, shown
+        if not isExposed(self):
+            self._frame = ROLL_FRAMES
+            self._rollTimer.stop()
+            return
+        self._frame = 0
+        self._rollTimer.start()
+        self._updateRolling()
+
+    def resizeEvent(self, e) -> None:
+        super().resizeEvent(e)
+        self._layoutDigits()
+
+    def paintEvent(self, e: QPaintEvent) -> None:
+        if not self._unitRects:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setFont(self._font)
+        painter.setPen(QColor(255, 255, 255) if isDarkTheme() else QColor(0, 0, 0))
+        for pos in self._colonPos:
+            painter.drawStaticText(pos, self._staticText(":"))
+
+        progress = ROLL_CURVE[self._frame]
+        direction = -1 if self.engine.isCountDown() else 1  # new digits come from below when counting up
+        for rect, old, new in zip(self._unitRects, self._previous, self._shown):
+            if not e.rect().intersects(rect.toAlignedRect()):
+                continue
+            if old == new or progress >= 1:
+                painter.drawStaticText(rect.topLeft(), self._staticText(f"{new:02}"))
+                continue
+            offset = rect.height() * direction
+            painter.save()
+            painter.setClipRect(rect)
+            painter.setOpacity(1 - progress)
+            painter.drawStaticText(rect.topLeft() - QPointF(0, offset * progress), self._staticText(f"{old:02}"))
+            painter.setOpacity(progress)
+            painter.drawStaticText(rect.topLeft() + QPointF(0, offset * (1 - progress)), self._staticText(f"{new:02}"))
+            painter.restore()
+
+    def _nextFrame(self) -> None:
+        self._frame += 1
+        if self._frame >= ROLL_FRAMES or not isExposed(self):
+            self._frame = ROLL_FRAMES
+            self._rollTimer.stop()
+            self._previous = self._shown
+        self._updateRolling()
+
+    def _updateRolling(self) -> None:
+        for rect, old, new in zip(self._unitRects, self._previous, self._shown):
+            if old != new:
+                self.update(rect.toAlignedRect())
+
+    def _layoutDigits(self) -> None:
+        self._font.setPixelSize(max(1, int(min(self.height() * 0.4, self.width() / 5))))
+        self._texts.clear()
+        metrics = QFontMetricsF(self._font)
+        unitWidth = metrics.horizontalAdvance("00")
+        colonWidth = metrics.horizontalAdvance(":")
+        height = metrics.height()
+        x = (self.width() - 3 * unitWidth - 2 * colonWidth) / 2
+        y = (self.height() - height) / 2
+        self._unitRects = []
+        self._colonPos = []
+        for i in range(3):
+            self._unitRects.append(QRectF(x, y, unitWidth, height))
+            x += unitWidth
+            if i < 2:
+                self._colonPos.append(QPointF(x, y))
+                x += colonWidth
+
+    def _staticText(self, text: str) -> QStaticText:
+        staticText = self._texts.get(text)
+        if staticText is None:
+            staticText = QStaticText(text)
+            staticText.setPerformanceHint(QStaticText.PerformanceHint.AggressiveCaching)
+            staticText.prepare(QTransform(), self._font)
+            self._texts[text] = staticText
+        return staticText
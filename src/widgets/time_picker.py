@@ -1,37 +1,41 @@
 from collections import deque
-from typing import Callable, Deque
+from typing import Deque
 
-from PySide6.QtCore import (Property, Signal, QPropertyAnimation,
-                            QPoint, QEasingCurve, Qt, QSize)
-from PySide6.QtGui import QWheelEvent
-from PySide6.QtWidgets import QLabel, QWidget, QHBoxLayout
+from PySide6.QtCore import (Property, Signal, QPropertyAnimation, QParallelAnimationGroup,
+                            QPoint, QEasingCurve, Qt, QSize, QAbstractAnimation)
+from PySide6.QtGui import QWheelEvent, QFont, QFontMetrics, QPainter, QColor, QPaintEvent
+from PySide6.QtWidgets import QWidget, QHBoxLayout
 from qfluentwidgets import TitleLabel, qconfig, isDarkTheme
 
 
-class PickerItem(QLabel):
+class PickerItem(QWidget):
+    """Text of a Picker, its opacity and font size are painted instead of set through a style sheet"""
+
     def __init__(self, time: str, parent=None, opacity=1.0, fontSize=50):
         super().__init__(parent)
-        self.setText(time)
+        self._text = time
         self._textOpacity = opacity
+        self._font = QFont("Segoe UI")
+        self._font.setPointSize(fontSize)
         self.opacityAnimation = QPropertyAnimation(self, b"textOpacity")
         self.moveAnimation = QPropertyAnimation(self, b"pos")
         self.fontAnimation = QPropertyAnimation(self, b"fontSize")
 
-        font = self.font()
-        font.setPointSize(fontSize)
-        font.setFamily("Segoe UI")
-        self.setFont(font)
         self.setFixedSize(100, 100)
-        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        qconfig.themeChangedFinished.connect(self.update)
+
+    def text(self) -> str:
+        return self._text
 
-        self.updateUI()
-        qconfig.themeChangedFinished.connect(self.updateUI)
+    def setText(self, text: str) -> None:
+        self._text = text
+        self.update()
 
     def getMetricsHeight(self):
-        return self.fontMetrics().boundingRect(self.text()).height()
+        return QFontMetrics(self._font).boundingRect(self._text).height()
 
     def getMetricsWidth(self):
-        return self.fontMetrics().boundingRect(self.text()).width()
+        return QFontMetrics(self._font).boundingRect(self._text).width()
 
     @Property(float)
     def textOpacity(self) -> float:
@@ -40,56 +44,51 @@ class PickerItem(QLabel):
     @textOpacity.setter
     def textOpacity(self, value: float):
         self._textOpacity = value
-        self.updateUI()
-
-    def updateUI(self):
-        if isDarkTheme():
-            self.setStyleSheet(f"color: rgba(255, 255, 255, {self._textOpacity});")
-        else:
-            self.setStyleSheet(f"color: rgba(0, 0, 0, {self._textOpacity});")
+        self.update()
 
     @Property(int)
     def fontSize(self) -> int:
-        return self.font().pointSize()
+        return self._font.pointSize()
 
     @fontSize.setter
     def fontSize(self, value: int):
-        font = self.font()
-        font.setPointSize(value)
-        self.setFont(font)
+        self._font.setPointSize(value)
+        self.update()
 
-    def startAnimation(self, pos: QPoint, opacity: float, duration: int, easingCurve: QEasingCurve.Type,
-                       useOpacity=False, fontSize: int = None, onFinished: Callable = None):
+    def setAnimation(self, pos: QPoint, opacity: float, fontSize: int) -> None:
+        """Animate from the current state to the given one, the animations are started by their group"""
         self.moveAnimation.setStartValue(self.pos())
         self.moveAnimation.setEndValue(pos)
-        self.moveAnimation.setDuration(duration)
-        self.moveAnimation.setEasingCurve(easingCurve)
-
         self.opacityAnimation.setStartValue(self._textOpacity)
         self.opacityAnimation.setEndValue(opacity)
-        self.opacityAnimation.setDuration(duration)
-        self.opacityAnimation.setEasingCurve(easingCurve)
-
-        self.fontAnimation.setStartValue(self.font().pointSize())
+        self.fontAnimation.setStartValue(self._font.pointSize())
         self.fontAnimation.setEndValue(fontSize)
-        self.fontAnimation.setDuration(duration)
-        self.fontAnimation.setEasingCurve(easingCurve)
-
-        if onFinished:
-            self.moveAnimation.finished.connect(onFinished)
-
-        if useOpacity and fontSize:
-            self.moveAnimation.start()
-            self.opacityAnimation.start()
-            self.fontAnimation.start()
-        elif useOpacity:
-            self.moveAnimation.start()
-            self.opacityAnimation.start()
-        else:
-            self.moveAnimation.start()
+
+    def setState(self, pos: QPoint, opacity: float, fontSize: int) -> None:
+        self.move(pos)
+        self._textOpacity = opacity
+        self._font.setPointSize(fontSize)
+        self.update()
+
+    def paintEvent(self, e: QPaintEvent) -> None:
+        if self._textOpacity <= 0:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        painter.setOpacity(self._textOpacity)
+        painter.setFont(self._font)
+        painter.setPen(QColor(255, 255, 255) if isDarkTheme() else QColor(0, 0, 0))
+        painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, self._text)
 
 
 class Picker(QWidget):
+    """ Three numbers floating up or down
+
+    A ring of four items is allocated once: the three shown ones and a spare,
+    which floats in with the new text while the item on the other side floats
+    out and becomes the spare. One animation group moves them all.
+    """
+
     def __init__(self, defaultTexts: tuple[str, str, str], parent=None):
         super().__init__(parent)
         self._acceptWheelEvent = True
@@ -98,12 +97,15 @@ class Picker(QWidget):
         self._itemSize = QSize(100, 100)
         self._margin = (10, 10, 10, 10)  # left, top, right, bottom
         self._spacing = 10
-        self.deque: Deque[PickerItem] = deque(maxlen=3)
+        self.deque: Deque[PickerItem] = deque()  # top, center, bottom and the spare
+        self.animationGroup = QParallelAnimationGroup(self)
         self.itemPosMap = {
             "top": QPoint(self._margin[0], self._margin[1]),
             "center": QPoint(self._margin[0], self._margin[1] + self._itemSize.height() + self._spacing),
             "bottom": QPoint(self._margin[0], self._margin[1] + 2 * (self._itemSize.height() + self._spacing))
         }
+        self.itemPosMap["above"] = self.itemPosMap["top"] - QPoint(0, self._itemSize.height())
+        self.itemPosMap["below"] = self.itemPosMap["bottom"] + QPoint(0, self._itemSize.height())
         self.__initWidget()
 
     def setAcceptWheelEvent(self, accept: bool) -> None:
@@ -113,20 +115,20 @@ class Picker(QWidget):
         self.replaceItem(self._defaultTexts)
 
     def floatUp(self, text: str) -> None:
-        self._popLeftItem()
-        floatUpItem = PickerItem(text, self, 0.6, 40)
-        floatUpItem.move(self.itemPosMap["bottom"] + QPoint(0, self._itemSize.height()))
-        floatUpItem.show()
-        self.deque.append(floatUpItem)
-        self.resetPosAnimation()
+        self.animationGroup.stop()
+        spare = self.deque[3]
+        spare.setText(text)
+        spare.setState(self.itemPosMap["below"], 0.0, 40)
+        self.deque.rotate(-1)
+        self.resetPosAnimation("above")
 
     def floatDown(self, text: str) -> None:
-        self._popRightItem()
-        floatUpItem = PickerItem(text, self, 0.6, 40)
-        floatUpItem.move(self.itemPosMap["top"] - QPoint(0, self._itemSize.height()))
-        floatUpItem.show()
-        self.deque.appendleft(floatUpItem)
-        self.resetPosAnimation()
+        self.animationGroup.stop()
+        spare = self.deque[3]
+        spare.setText(text)
+        spare.setState(self.itemPosMap["above"], 0.0, 40)
+        self.deque.rotate(1)
+        self.resetPosAnimation("below")
 
     def getTopItemText(self) -> str:
         return self.deque[0].text()
@@ -140,34 +142,23 @@ class Picker(QWidget):
     def getCurrentSelected(self) -> str:
         return self.getCenterItemText()
 
-    def resetPosAnimation(self) -> None:
-        idxToStr = ["top", "center", "bottom"]
-        for i, item in enumerate(self.deque):
-            pos = self.itemPosMap[idxToStr[i]]
-            item.startAnimation(pos, 1.0 if i == 1 else 0.6, self._duration,
-                                QEasingCurve.Type.InOutQuad, True,
-                                fontSize=50 if i == 1 else 40)
+    def resetPosAnimation(self, leaveTo: str = "below") -> None:
+        """Float the shown items to their places and the spare out to leaveTo"""
+        for item, (pos, opacity, fontSize) in zip(self.deque, self._slots(leaveTo)):
+            item.setAnimation(pos, opacity, fontSize)
+        self.animationGroup.start()
 
     def replaceItem(self, texts: tuple[str, str, str]) -> None:
-        if len(self.deque):
-            for item in self.deque:
-                item.deleteLater()
-            self.deque.clear()
-        for i, text in enumerate(texts):
-            if i == 1:
-                item = PickerItem(text, self, 1.0, 50)
-            else:
-                item = PickerItem(text, self, 0.6, 40)
-            item.show()
-            self.deque.append(item)
-        self.deque[0].move(self.itemPosMap["top"])
-        self.deque[1].move(self.itemPosMap["center"])
-        self.deque[2].move(self.itemPosMap["bottom"])
+        self.animationGroup.stop()
+        for item, text in zip(self.deque, texts):
+            item.setText(text)
+        for item, state in zip(self.deque, self._slots("below")):
+            item.setState(*state)
 
     def wheelEvent(self, e: QWheelEvent) -> None:
         if not self._acceptWheelEvent:
             return
-        elif any(item.moveAnimation.state() == QPropertyAnimation.State.Running for item in self.deque):
+        elif self.animationGroup.state() == QAbstractAnimation.State.Running:
             return
 
         # 获取滚轮滚动的距离
@@ -180,19 +171,21 @@ class Picker(QWidget):
         e.accept()
         super().wheelEvent(e)
 
-    def _popLeftItem(self) -> None:
-        item = self.deque.popleft()
-        pos = QPoint(item.x(), 0 - item.height())
-        item.startAnimation(pos, 0.0, self._duration, QEasingCurve.Type.InOutQuad,
-                            True, onFinished=item.deleteLater)
-
-    def _popRightItem(self) -> None:
-        item = self.deque.pop()
-        pos = QPoint(item.x(), self.height() + item.height())
-        item.startAnimation(pos, 0.0, self._duration, QEasingCurve.Type.InOutQuad,
-                            True, onFinished=item.deleteLater)
+    def _slots(self, leaveTo: str):
+        """Position, opacity and font size of each item of the ring"""
+        return ((self.itemPosMap["top"], 0.6, 40),
+                (self.itemPosMap["center"], 1.0, 50),
+                (self.itemPosMap["bottom"], 0.6, 40),
+                (self.itemPosMap[leaveTo], 0.0, 40))
 
     def __initWidget(self) -> None:
+        for _ in range(4):
+            item = PickerItem("", self, 0.0, 40)
+            for animation in (item.moveAnimation, item.opacityAnimation, item.fontAnimation):
+                animation.setDuration(self._duration)
+                animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
+                self.animationGroup.addAnimation(animation)
+            self.deque.append(item)
         self.default()
         self.setFixedSize(self._itemSize.width() + self._margin[0] + self._margin[2],
                           3 * self._itemSize.height() + 2 * self._spacing)
@@ -0,0 +1,75 @@
+import importlib
+import os
+import sys
+import types
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+
+
+@pytest.fixture(scope="session")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+class FakeManager:
+    """Stand-in for SDManager over storages of a temporary database"""
+
+    def __init__(self, database):
+        from PySide6.QtCore import QObject, Signal
+
+        from src.py_qobject import PyQList
+        from src.utils.node_index import NodeIndex
+
+        class Signals(QObject):
+            changed = Signal(object)
+            dataAdded = Signal(object)
+            dataRemoved = Signal(object)
+            totalsChanged = Signal(str)
+
+        self._signals = Signals()
+        self.changed = self._signals.changed
+        self.dataAdded = self._signals.dataAdded
+        self.dataRemoved = self._signals.dataRemoved
+        self.totalsChanged = self._signals.totalsChanged
+        self.database = database
+        self.datas = PyQList()
+        self.index = NodeIndex(self.totalsChanged.emit)
+
+    def addTree(self, tree: dict):
+        from types import SimpleNamespace
+
+        from src.utils.database import SqliteDataStorage
+
+        storage = SqliteDataStorage(self.database, tree["uid"])
+        storage.create(tree)
+        storage.changed.connect(self.index.applyChange)
+        storage.changed.connect(self.changed)
+        storage.nodeMaterialized.connect(self.index.setNode)
+        data = SimpleNamespace(storage=storage)
+        self.index.addTree(storage.dict, None, data)
+        self.datas.append(data)
+        self.dataAdded.emit(data)
+        return storage.dict
+
+    def findNode(self, uid: str):
+        return self.index.node(uid)
+
+
+@pytest.fixture
+def manager(app, monkeypatch, tmp_path):
+    """FakeManager put in place of SDManager, views under test don't load the data folder"""
+    from src.utils.database import Database
+
+    fake = FakeManager(Database(str(tmp_path / "data.db")))
+    module = types.ModuleType("src.manager")
+    module.SDManager = fake
+    monkeypatch.setitem(sys.modules, "src.manager", module)
+    for name in ("src.manager_interface.project_tree_model", "src.do_thing_interface.choice_project_page"):
+        importlib.import_module(name)
+        monkeypatch.setattr(sys.modules[name], "SDManager", fake)
+    return fake
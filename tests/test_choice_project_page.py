@@ -0,0 +1,170 @@
+import pytest
+from PySide6.QtCore import QModelIndex, QRect, QSize, Qt
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtWidgets import QStyleOptionViewItem
+
+import config as cfg
+from src.py_qobject import PyQList
+
+
+def node(uid, hours, *children, icon=""):
+    return {"name": uid, "icon": icon, "hours": hours, "uid": uid, "breakTime": 0.0, "subItems": list(children)}
+
+
+@pytest.fixture
+def page(manager):
+    """choice_project_page module and a root list of three projects"""
+    from src.do_thing_interface import choice_project_page
+
+    roots = PyQList()
+    roots.replaceList([manager.addTree(node("r1", 1.0, node("a", 2.0), icon="OMT-ai")),
+                       manager.addTree(node("r2", 4.0)),
+                       manager.addTree(node("r3", 8.0))])
+    return choice_project_page, roots
+
+
+@pytest.fixture
+def listModel(page):
+    module, roots = page
+    model = module.ProjectListModel(roots)
+    events = []
+    model.rowsInserted.connect(lambda parent, first, last: events.append(("insert", first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(("remove", first, last)))
+    model.dataChanged.connect(lambda first, last: events.append(("data", first.row())))
+    model.modelEvents = events
+    return model
+
+
+def test_rows_are_revealed_on_demand(listModel):
+    assert listModel.rowCount() == 0
+    listModel.revealRows(2)
+    assert listModel.rowCount() == 2
+    listModel.revealRows(10)
+    assert listModel.rowCount() == 3
+    assert listModel.modelEvents == [("insert", 0, 1), ("insert", 2, 2)]
+
+
+def test_roles(manager, listModel):
+    listModel.revealRows(3)
+    index = listModel.index(0)
+    assert listModel.data(index) == "r1"
+    assert listModel.data(index, Qt.ItemDataRole.UserRole) == "r1"
+    assert listModel.data(index, listModel.TimeRole) == 3.0
+    assert not listModel.data(index, Qt.ItemDataRole.DecorationRole).isNull()
+    assert listModel.data(listModel.index(1), Qt.ItemDataRole.DecorationRole).isNull()
+    listModel.modelEvents.clear()
+    manager.findNode("a")["hours"] = 5.0
+    assert listModel.data(index, listModel.TimeRole) == 6.0
+    manager.findNode("r2")["name"] = "renamed"
+    assert listModel.modelEvents == [("data", 0), ("data", 1)]
+
+
+def test_rows_follow_removes_and_appends(manager, page, listModel):
+    _, roots = page
+    listModel.revealRows(3)
+    listModel.modelEvents.clear()
+    roots.remove(roots.list[1])
+    assert listModel.rowCount() == 2
+    assert listModel.rowOf("r3") == 1 and listModel.rowOf("r2") is None
+    roots.append(manager.addTree(node("r4", 0.0)))
+    assert listModel.rowCount() == 3
+    assert listModel.modelEvents == [("remove", 1, 1), ("insert", 2, 2)]
+
+
+def test_unrevealed_rows_are_left_to_reveal_rows(manager, page, listModel):
+    _, roots = page
+    listModel.revealRows(1)
+    roots.append(manager.addTree(node("r4", 0.0)))
+    roots.remove(roots.list[2])
+    assert listModel.rowCount() == 1
+    assert listModel.modelEvents == [("insert", 0, 0)]
+
+
+def test_card_geometry_and_paint(app, page, listModel):
+    module, _ = page
+    delegate = module.ProjectCardDelegate()
+    option = QStyleOptionViewItem()
+    listModel.revealRows(3)
+    index = listModel.index(0)
+    assert delegate.sizeHint(option, index) == QSize(module.CARD_WIDTH, module.CARD_HEIGHT)
+    rect = QRect(0, 0, module.CARD_WIDTH, module.CARD_HEIGHT)
+    assert delegate.cardRect(rect).contains(delegate.timeRect(rect))
+
+    option.rect = rect
+    image = QImage(rect.size(), QImage.Format.Format_ARGB32)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    delegate.paint(painter, option, index)
+    delegate.paint(painter, option, listModel.index(1))
+    painter.end()
+    assert len(delegate._backgrounds) == 1 and len(delegate._icons) == 1
+
+
+class FakePage:
+    def __init__(self, _list=None, memory=0):
+        self.list = PyQList() if _list is None else _list
+        self.memory = memory
+        self.dropped = False
+
+        class Loader:
+            cancelled = False
+
+            def cancel(self):
+                self.cancelled = True
+
+        self.loader = Loader()
+
+    def estimatedMemory(self):
+        return self.memory
+
+    def deleteLater(self):
+        self.dropped = True
+
+
+@pytest.fixture
+def cacheLimits(page):
+    """Set the page cache limits, (pages, MB), for one test"""
+    oldSize, oldMemory = cfg.cfgDS.pageCacheSize.value, cfg.cfgDS.pageCacheMemory.value
+
+    def setLimits(size, memory):
+        cfg.cfgDS.set(cfg.cfgDS.pageCacheSize, size, save=False)
+        cfg.cfgDS.set(cfg.cfgDS.pageCacheMemory, memory, save=False)
+
+    yield setLimits
+    setLimits(oldSize, oldMemory)
+
+
+def test_page_cache_evicts_least_recently_used(page, cacheLimits):
+    module, _ = page
+    cacheLimits(2, 16)
+    cache = module.ProjectPageCache()
+    pages = [FakePage() for _ in range(3)]
+    cache.put("a", pages[0])
+    cache.put("b", pages[1])
+    cache.put("a", cache.take("a", pages[0].list))
+    cache.put("c", pages[2])
+    assert "b" not in cache and len(cache) == 2
+    assert pages[1].dropped and pages[1].loader.cancelled
+    assert not pages[0].dropped
+
+
+def test_page_cache_is_bounded_by_memory(page, cacheLimits):
+    module, _ = page
+    cacheLimits(8, 1)
+    cache = module.ProjectPageCache()
+    big = FakePage(memory=768 * 1024)
+    cache.put("a", big)
+    cache.put("b", FakePage(memory=512 * 1024))
+    assert "a" not in cache and big.dropped
+    assert cache.memory() == 512 * 1024
+
+
+def test_page_cache_drops_pages_of_replaced_lists(page, cacheLimits):
+    module, _ = page
+    cacheLimits(8, 16)
+    cache = module.ProjectPageCache()
+    cached = FakePage()
+    cache.put("a", cached)
+    assert cache.take("a", PyQList()) is None
+    assert cached.dropped and "a" not in cache
+    assert cache.take("missing", PyQList()) is None
@@ -0,0 +1,81 @@
+import pytest
+
+from src.utils import clock
+from src.utils.clock import MAX_SECONDS, ClockEngine, splitSeconds
+
+
+@pytest.fixture
+def now(monkeypatch):
+    """Settable time.monotonic of the clock module"""
+    value = [1000.0]
+    monkeypatch.setattr(clock.time, "monotonic", lambda: value[0])
+    return value
+
+
+def test_split_seconds():
+    assert splitSeconds(3725) == (1, 2, 5)
+    assert splitSeconds(MAX_SECONDS) == (23, 59, 59)
+
+
+def test_count_up_with_pause(app, now):
+    engine = ClockEngine()
+    engine.start()
+    now[0] += 1.7
+    assert engine.shownSeconds() == 1
+    engine.pause()
+    now[0] += 100
+    assert engine.elapsed() == pytest.approx(1.7)
+    assert engine.isStarted() and not engine.isRunning()
+    engine.start()
+    now[0] += 0.5
+    assert engine.stop() == 2
+    assert not engine.isStarted()
+
+
+def test_count_down_rounds_up_and_ends(app, now):
+    engine = ClockEngine()
+    engine.setCountDown(True, 10)
+    engine.start()
+    now[0] += 0.2
+    assert engine.shownSeconds() == 10
+    now[0] += 3.0
+    assert engine.shownSeconds() == 7
+    now[0] += 60
+    assert engine.remaining() == 0
+    assert engine.elapsed() == 10
+
+
+def test_set_remaining_keeps_the_elapsed_seconds(app, now):
+    engine = ClockEngine()
+    engine.setCountDown(True, 10)
+    engine.start()
+    now[0] += 4
+    engine.setRemaining(20)
+    assert engine.remaining() == pytest.approx(20)
+    assert engine.elapsed() == pytest.approx(4)
+
+
+def test_timeout_ticks_once_per_shown_second_and_finishes(app, now):
+    engine = ClockEngine()
+    engine.setCountDown(True, 2)
+    ticks, finished = [], []
+    engine.ticked.connect(ticks.append)
+    engine.finished.connect(finished.append)
+    engine.start()
+    now[0] += 1.001
+    engine._onTimeout()
+    engine._onTimeout()
+    assert ticks == [1]
+    now[0] += 1.0
+    engine._onTimeout()
+    assert ticks == [1, 0]
+    assert finished == [2]
+    assert not engine.isRunning()
+
+
+def test_schedule_wakes_after_the_next_whole_second(app, now):
+    engine = ClockEngine()
+    engine.start()
+    now[0] += 0.25
+    engine._schedule()
+    assert engine._timer.interval() == 751
@@ -0,0 +1,95 @@
+import pytest
+
+from src.py_qobject import PyQList
+from src.utils.database import Database, SqliteDataStorage
+
+
+def node(uid, name, *children):
+    return {"name": name, "icon": "", "hours": 0.0, "breakTime": 0.0, "uid": uid, "subItems": list(children)}
+
+
+def tree():
+    return node("root", "root",
+                node("a", "a", node("x", "x", node("y", "y"))),
+                node("b", "b"))
+
+
+def makeStorage(tmp_path):
+    database = Database(str(tmp_path / "data.db"))
+    storage = SqliteDataStorage(database, "root")
+    storage.create(tree())
+    return database, storage
+
+
+def names(_dict):
+    return [child["name"] for child in _dict["subItems"]]
+
+
+def test_columns_diff(app, tmp_path):
+    database, storage = makeStorage(tmp_path)
+    root = storage.dict
+    root["subItems"][0]["hours"] = 2.5
+    root["name"] = "renamed"
+    snapshot = storage._snapshot()
+    assert all(sql.startswith("UPDATE") for sql, _ in snapshot)
+    storage._write(snapshot)
+    loaded = database.loadTree("root")
+    assert loaded["name"] == "renamed"
+    assert loaded["subItems"][0]["hours"] == 2.5
+
+
+def test_add_and_remove(app, tmp_path):
+    database, storage = makeStorage(tmp_path)
+    root = storage.dict
+    root["subItems"].append(node("c", "c"))
+    root["subItems"].remove(root["subItems"][0])
+    storage.dumpNow(wait=True)
+    loaded = database.loadTree("root")
+    assert names(loaded) == ["b", "c"]
+    rows = database._conn.execute("SELECT uid FROM items").fetchall()
+    assert sorted(uid for uid, in rows) == ["b", "c", "root"]
+
+
+@pytest.mark.parametrize("addFirst", [False, True])
+def test_move_to_another_parent(app, tmp_path, addFirst):
+    database, storage = makeStorage(tmp_path)
+    root = storage.dict
+    a, b = root["subItems"][0], root["subItems"][1]
+    x = a["subItems"][0]
+    if addFirst:
+        b["subItems"].append(x)
+        a["subItems"].remove(x)
+    else:
+        a["subItems"].remove(x)
+        b["subItems"].append(x)
+    storage.dumpNow(wait=True)
+    loaded = database.loadTree("root")
+    assert names(loaded["subItems"][0]) == []
+    assert names(loaded["subItems"][1]) == ["x"]
+    assert names(loaded["subItems"][1]["subItems"][0]) == ["y"]
+
+
+def test_root_is_not_rerouted_by_a_holding_list(app, tmp_path):
+    database, storage = makeStorage(tmp_path)
+    holder = PyQList()
+    holder.append(storage.dict)
+    seen = []
+    holder.changed.connect(seen.append)
+    storage.dict["name"] = "renamed"
+    assert seen == []
+    assert storage.dict.path() == ""
+
+
+@pytest.mark.parametrize("targetFirst", [False, True])
+def test_move_to_another_root(app, tmp_path, targetFirst):
+    database, storage = makeStorage(tmp_path)
+    other = SqliteDataStorage(database, "other")
+    other.create(node("other", "other"))
+    x = storage.dict["subItems"][0]["subItems"][0]
+    storage.dict["subItems"][0]["subItems"].remove(x)
+    other.dict["subItems"].append(x)
+    for s in ((other, storage) if targetFirst else (storage, other)):
+        s.dumpNow(wait=True)
+    assert names(database.loadTree("other")) == ["x"]
+    assert names(database.loadTree("other")["subItems"][0]) == ["y"]
+    assert names(database.loadTree("root")["subItems"][0]) == []
@@ -0,0 +1,126 @@
+import logging
+import os
+import shutil
+
+import pytest
+
+from src.utils.file import (BACKUP_SUFFIX, PATCH_SUFFIX, ChecksumError, JsonDataStorage, decodeChecked,
+                            encodeChecked, fileGeneration, fileStamp, readChecked, readJson, writeAtomic)
+from src.utils.serializer import serializer
+
+
+def writePatches(path, base, records):
+    with open(path + PATCH_SUFFIX, "wb") as f:
+        f.write(serializer.dumps({"base": fileGeneration(base)}) + b"\n")
+        for record in records:
+            f.write(serializer.dumps(record) + b"\n")
+
+
+def damage(path):
+    with open(path, "r+b") as f:
+        f.seek(-5, os.SEEK_END)
+        f.write(b"xxxx}")
+
+
+def test_checksum_round_trip():
+    doc = {"name": "a", "subItems": [1, 2]}
+    assert decodeChecked(encodeChecked(doc)) == doc
+    raw = encodeChecked(doc).replace(b'"a"', b'"b"')
+    with pytest.raises(ChecksumError):
+        decodeChecked(raw)
+
+
+def test_plain_json_is_accepted():
+    assert decodeChecked(b'{"name": "a"}\n') == {"name": "a"}
+
+
+def test_write_atomic_keeps_previous_generation(tmp_path):
+    path = str(tmp_path / "a.json")
+    writeAtomic(path, encodeChecked({"v": 1}))
+    writeAtomic(path, encodeChecked({"v": 2}))
+    assert readChecked(path) == ({"v": 2}, False)
+    assert not os.path.exists(path + ".tmp")
+    with open(path + BACKUP_SUFFIX, "rb") as f:
+        assert decodeChecked(f.read()) == {"v": 1}
+
+
+def test_damaged_file_falls_back_to_backup(tmp_path):
+    path = str(tmp_path / "a.json")
+    writeAtomic(path, encodeChecked({"v": 1}))
+    writeAtomic(path, encodeChecked({"v": 2}))
+    damage(path)
+    assert readChecked(path) == ({"v": 1}, True)
+
+
+def test_patch_log_replay(tmp_path):
+    path = str(tmp_path / "a.json")
+    writeAtomic(path, encodeChecked({"name": "a", "subItems": []}))
+    writePatches(path, path, [
+        {"op": "replace", "path": "/name", "value": "b"},
+        {"op": "add", "path": "/subItems/-", "value": {"name": "c/d~e"}},
+        {"op": "replace", "path": "/subItems/0/name", "value": "c"},
+        {"op": "add", "path": "/subItems/0", "value": {"name": "first"}},
+        {"op": "remove", "path": "/subItems/1"},
+    ])
+    assert readJson(path) == {"name": "b", "subItems": [{"name": "first"}]}
+
+
+def test_sidecar_of_another_generation_is_discarded_with_a_warning(tmp_path, caplog):
+    path = str(tmp_path / "a.json")
+    other = str(tmp_path / "other.json")
+    writeAtomic(other, b"{}")
+    writeAtomic(path, encodeChecked({"name": "a"}))
+    writePatches(path, other, [{"op": "replace", "path": "/name", "value": "b"}])
+    with caplog.at_level(logging.WARNING):
+        assert readJson(path) == {"name": "a"}
+    assert "another generation" in caplog.text
+
+
+def test_legacy_stamp_header_is_still_accepted(tmp_path):
+    path = str(tmp_path / "a.json")
+    writeAtomic(path, encodeChecked({"name": "a"}))
+    with open(path + PATCH_SUFFIX, "wb") as f:
+        f.write(serializer.dumps({"base": fileStamp(path)}) + b"\n")
+        f.write(serializer.dumps({"op": "replace", "path": "/name", "value": "b"}) + b"\n")
+    assert readJson(path) == {"name": "b"}
+
+
+def test_sidecar_of_the_backup_generation_is_replayed(tmp_path, caplog):
+    path = str(tmp_path / "a.json")
+    writeAtomic(path, encodeChecked({"name": "a", "subItems": []}))
+    # a merge was interrupted after replacing the base, then the new base got damaged
+    writePatches(path, path, [{"op": "replace", "path": "/name", "value": "b"}])
+    writeAtomic(path, encodeChecked({"name": "b", "subItems": []}))
+    damage(path)
+    with caplog.at_level(logging.WARNING):
+        assert readJson(path) == {"name": "b", "subItems": []}
+    assert "Replayed 1 patch record" in caplog.text
+
+
+def test_sidecar_of_the_damaged_generation_is_not_replayed_on_the_backup(tmp_path, caplog):
+    # indices of the records are relative to the newer base, on the backup they hit other items
+    path = str(tmp_path / "a.json")
+    a, b, c = ({"name": name, "hours": 0.0} for name in "ABC")
+    writeAtomic(path, encodeChecked({"name": "root", "subItems": [a, b, c]}))
+    writeAtomic(path, encodeChecked({"name": "root", "subItems": [b, c]}))
+    writePatches(path, path, [{"op": "replace", "path": "/subItems/0/hours", "value": 5.0}])
+    damage(path)
+    with caplog.at_level(logging.WARNING):
+        assert readJson(path) == {"name": "root", "subItems": [a, b, c]}
+    assert "another generation" in caplog.text
+
+
+def test_sidecar_survives_copying_the_data_folder(app, tmp_path):
+    src, dest = tmp_path / "src", tmp_path / "dest"
+    src.mkdir()
+    path = str(src / "a.json")
+    storage = JsonDataStorage(path)
+    storage.create({"name": "a", "hours": 0.0, "subItems": []})
+    storage.dict["hours"] = 5.0
+    storage.dumpNow(wait=True)
+    assert storage.hasSidecar()
+    dest.mkdir()
+    for file in src.iterdir():
+        # a plain copy, the files get new modification times
+        shutil.copy(file, dest)
+    assert readJson(str(dest / "a.json"))["hours"] == 5.0
@@ -0,0 +1,24 @@
+import time
+
+from PySide6.QtCore import QCoreApplication, QSize
+from PySide6.QtGui import QImage
+
+from src.utils.image_loader import ImageLoader
+
+
+def test_loaded_is_emitted_with_the_cache_key(app, tmp_path):
+    path = str(tmp_path / "a.png")
+    image = QImage(40, 20, QImage.Format.Format_RGB32)
+    image.fill(0)
+    image.save(path)
+    loader = ImageLoader()
+    seen = []
+    loader.loaded.connect(lambda key, image: seen.append((key, image.size())))
+    key = loader.key(path, QSize(10, 10))
+    assert loader.loadKey(key) is None
+    deadline = time.monotonic() + 5
+    while not seen and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+    assert seen == [(key, QSize(10, 10))]
+    assert loader.load(path, QSize(10, 10)) is not None
+    assert loader.key(str(tmp_path / "missing.png")) is None
@@ -0,0 +1,107 @@
+import json
+from concurrent.futures import Future
+
+from src.py_qobject import PyQDict
+from src.utils.journal import SessionJournal
+
+
+def makeNode(uid, **values):
+    node = PyQDict()
+    node.dict.update({"uid": uid, "hours": 0.0, "breakTime": 0.0, **values})
+    return node
+
+
+def readLines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_compact_folds_and_truncates(app, tmp_path):
+    path = str(tmp_path / "sessions.jsonl")
+    journal = SessionJournal(path)
+    journal.append("a", 0, 3600, 3600, 60)
+    journal.append("a", 0, 1800, 1800)
+    journal.append("b", 0, 360, 360)
+    assert journal.pendingHours("a") == 1.5
+    a, b = makeNode("a"), makeNode("b")
+    assert journal.compact([a, b]) == 3
+    journal.flush(wait=True)
+    assert a["hours"] == 1.5 and a["breakTime"] == 60 / 3600 and a["journalSeq"] == 2
+    assert b["hours"] == 0.1
+    assert not journal.hasPending()
+    assert readLines(path) == [{"seq": 3}]
+    assert [e["seq"] for e in readLines(journal.historyPath)] == [1, 2, 3]
+    assert [e["seq"] for e in journal.sessions("a")] == [1, 2]
+
+
+def test_seq_survives_truncation(app, tmp_path):
+    path = str(tmp_path / "sessions.jsonl")
+    journal = SessionJournal(path)
+    journal.append("a", 0, 60, 60)
+    journal.compact([makeNode("a")])
+    journal.flush(wait=True)
+    reopened = SessionJournal(path)
+    reopened.waitForLoaded()
+    assert not reopened.hasPending()
+    assert reopened.append("a", 0, 60, 60)["seq"] == 2
+
+
+def test_folded_entries_are_not_counted_twice(app, tmp_path):
+    path = str(tmp_path / "sessions.jsonl")
+    # a crash between folding and truncating leaves folded entries in the journal
+    with open(path, "w") as f:
+        for seq in (1, 2, 3):
+            f.write(json.dumps({"seq": seq, "uid": "a", "start": 0, "end": 0, "duration": 3600, "breakTime": 0}) + "\n")
+        f.write('{"seq": 4, "uid": "a", "sta')
+    journal = SessionJournal(path)
+    node = makeNode("a", hours=2.0, journalSeq=2)
+    assert journal.compact([node]) == 1
+    assert node["hours"] == 3.0 and node["journalSeq"] == 3
+    assert journal.append("a", 0, 1, 1)["seq"] == 4
+    journal.flush(wait=True)
+    assert [e["seq"] for e in readLines(path)] == [3, 4]
+
+
+class FakeStorage:
+    def __init__(self):
+        self.future = Future()
+
+    def dumpNow(self):
+        return self.future
+
+
+def test_truncation_waits_for_the_dumps(app, tmp_path):
+    path = str(tmp_path / "sessions.jsonl")
+    journal = SessionJournal(path)
+    journal.append("a", 0, 60, 60)
+    storage = FakeStorage()
+    assert journal.compact([makeNode("a")], [storage]) == 1
+    assert [e["seq"] for e in readLines(path)] == [1]
+    storage.future.set_result(None)
+    journal.flush(wait=True)
+    assert readLines(path) == [{"seq": 1}]
+
+
+def test_failed_dump_keeps_the_entries(app, tmp_path):
+    path = str(tmp_path / "sessions.jsonl")
+    journal = SessionJournal(path)
+    journal.append("a", 0, 60, 60)
+    storage = FakeStorage()
+    journal.compact([makeNode("a")], [storage])
+    storage.future.set_exception(OSError("disk full"))
+    journal.flush(wait=True)
+    assert [e["seq"] for e in readLines(path)] == [1]
+
+
+def test_entries_of_unknown_projects_are_kept(app, tmp_path):
+    path = str(tmp_path / "sessions.jsonl")
+    journal = SessionJournal(path)
+    journal.append("a", 0, 60, 60)
+    journal.append("missing", 0, 60, 60)
+    journal.compact([makeNode("a")])
+    journal.flush(wait=True)
+    assert journal.pendingUids() == ["missing"]
+    assert [e.get("uid") for e in readLines(path)] == [None, "missing"]
+    reopened = SessionJournal(path)
+    reopened.waitForLoaded()
+    assert reopened.pendingUids() == ["missing"]
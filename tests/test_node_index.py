@@ -0,0 +1,119 @@
+import pytest
+
+from src.utils.database import Database, SqliteDataStorage
+from src.utils.node_index import NodeIndex
+
+
+def node(uid, hours, *children, breakTime=0.0):
+    return {"name": uid, "icon": "", "hours": hours, "uid": uid, "breakTime": breakTime,
+            "subItems": list(children)}
+
+
+class Observer:
+    def __init__(self):
+        self.events = []
+
+    def entryAdded(self, entry):
+        self.events.append(("add", entry.uid))
+
+    def entryRemoved(self, entry):
+        self.events.append(("remove", entry.uid))
+
+    def entryChanged(self, entry):
+        self.events.append(("change", entry.uid))
+
+
+@pytest.fixture
+def tree(app, tmp_path):
+    """(index, root PyQDict, uids whose totals changed, observer)"""
+    storage = SqliteDataStorage(Database(str(tmp_path / "data.db")), "root")
+    storage.create(node("root", 1.0,
+                        node("a", 2.0, node("x", 4.0, node("y", 8.0), breakTime=0.5)),
+                        node("b", 16.0)))
+    touched = []
+    index = NodeIndex(touched.append)
+    index.addTree(storage.dict, None, storage)
+    storage.dict.changed.connect(index.applyChange)
+    observer = Observer()
+    index.addObserver(observer)
+    touched.clear()
+    return index, storage.dict, touched, observer
+
+
+def totals(index, uid):
+    entry = index.entry(uid)
+    return entry.totalHours, entry.totalBreakTime, entry.descendants
+
+
+def test_rollups(tree):
+    index, root, touched, _ = tree
+    assert totals(index, "root") == (31.0, 0.5, 4)
+    assert totals(index, "a") == (14.0, 0.5, 2)
+    assert [entry.uid for entry in index.ancestors("y")] == ["root", "a", "x"]
+
+    root["subItems"][0]["subItems"][0]["hours"] = 5.0
+    assert totals(index, "root") == (32.0, 0.5, 4)
+    assert sorted(touched) == ["a", "root", "x"]
+
+    index.setPending("y", 0.25)
+    assert index.totalHours("y") == 8.25
+    assert index.totalHours("root") == 32.25
+
+
+def test_add_and_remove(tree):
+    index, root, _, observer = tree
+    root["subItems"][1]["subItems"].append(node("c", 1.0, node("d", 1.0)))
+    assert totals(index, "root") == (33.0, 0.5, 6)
+    assert index.parentUid("d") == "c"
+    root["subItems"].remove(root["subItems"][0])
+    assert totals(index, "root") == (19.0, 0.0, 3)
+    assert "x" not in index and "y" not in index
+    assert ("remove", "y") in observer.events
+
+
+@pytest.mark.parametrize("addFirst", [False, True])
+def test_move_in_one_change_event(tree, addFirst):
+    index, root, touched, observer = tree
+    a, b = root["subItems"][0], root["subItems"][1]
+    x = a["subItems"][0]
+    entry = index.entry("x")
+    with root.batch():
+        if addFirst:
+            b["subItems"].append(x)
+            a["subItems"].remove(x)
+        else:
+            a["subItems"].remove(x)
+            b["subItems"].append(x)
+    assert index.entry("x") is entry
+    assert index.parentUid("x") == "b"
+    assert totals(index, "a") == (2.0, 0.0, 0)
+    assert totals(index, "b") == (28.0, 0.5, 2)
+    assert totals(index, "root") == (31.0, 0.5, 4)
+    assert observer.events == []
+    assert "y" not in touched
+
+
+def test_move(tree):
+    index, _, touched, observer = tree
+    assert index.move("x", "b")
+    assert totals(index, "a") == (2.0, 0.0, 0)
+    assert totals(index, "b") == (28.0, 0.5, 2)
+    assert sorted(touched) == ["a", "b", "root"]
+    assert observer.events == []
+    assert not index.move("x", "missing")
+    with pytest.raises(ValueError):
+        index.move("b", "y")
+
+
+def test_batch_reports_each_total_once(tree):
+    index, root, touched, observer = tree
+    x = root["subItems"][0]["subItems"][0]
+    y = x["subItems"][0]
+    with root.batch():
+        x["breakTime"] = 1.0
+        y["hours"] = 9.0
+        y["hours"] = 10.0
+        y["name"] = "renamed"
+    assert totals(index, "root") == (33.0, 1.0, 4)
+    assert sorted(touched) == ["a", "root", "x", "y"]
+    assert observer.events == [("change", "y")]
@@ -0,0 +1,87 @@
+import pytest
+from PySide6.QtCore import QModelIndex, Qt
+
+from src.manager_interface import project_tree_model
+from src.manager_interface.project_tree_model import ProjectTreeModel
+
+
+def node(uid, *children, icon=""):
+    return {"name": uid, "icon": icon, "hours": 0.0, "uid": uid, "breakTime": 0.0, "subItems": list(children)}
+
+
+@pytest.fixture
+def model(manager, monkeypatch):
+    monkeypatch.setattr(project_tree_model, "FETCH_CHUNK", 2)
+    manager.addTree(node("r1", node("a"), node("b"), node("c"), icon="OMT-ai"))
+    manager.addTree(node("r2"))
+    model = ProjectTreeModel()
+    events = []
+    model.rowsInserted.connect(lambda parent, first, last: events.append(("insert", model.uidOf(parent), first)))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(("remove", model.uidOf(parent), first)))
+    model.modelEvents = events
+    return model
+
+
+def uids(model, parent=QModelIndex()):
+    return [model.uidOf(model.index(row, 0, parent)) for row in range(model.rowCount(parent))]
+
+
+def test_rows_are_fetched_in_chunks(model):
+    assert model.rowCount() == 0 and model.canFetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+    assert uids(model) == ["r1", "r2"]
+    r1 = model.index(0, 0)
+    assert model.hasChildren(r1) and not model.hasChildren(model.index(1, 0))
+    model.fetchMore(r1)
+    assert uids(model, r1) == ["a", "b"]
+    assert model.canFetchMore(r1)
+    model.fetchMore(r1)
+    assert uids(model, r1) == ["a", "b", "c"]
+    assert model.parent(model.index(2, 0, r1)) == r1
+    assert model.data(model.index(2, 0, r1)) == "c"
+
+
+def test_rows_follow_adds_and_removes(manager, model):
+    model.fetchMore(QModelIndex())
+    r1 = model.index(0, 0)
+    model.fetchMore(r1)
+    model.modelEvents.clear()
+    subItems = manager.findNode("r1")["subItems"]
+    subItems.remove(subItems[0])
+    assert uids(model, r1) == ["b"]
+    assert model.indexOf("a") == QModelIndex()
+    subItems.append(node("d"))
+    # c isn't fetched yet, d is left to fetchMore as well
+    assert uids(model, r1) == ["b"]
+    model.fetchMore(r1)
+    assert uids(model, r1) == ["b", "c", "d"]
+    assert model.modelEvents == [("remove", "r1", 0), ("insert", "r1", 1)]
+
+
+def test_batch_refetches_the_touched_list(manager, model):
+    model.fetchMore(QModelIndex())
+    r1 = model.index(0, 0)
+    model.fetchMore(r1)
+    root = manager.findNode("r1")
+    with root.batch():
+        root["subItems"].pop()
+        root["subItems"].pop()
+    assert model.rowCount(r1) == 0
+    model.fetchMore(r1)
+    assert uids(model, r1) == ["a"]
+
+
+def test_ensure_index_fetches_down_to_uid(manager, model):
+    manager.findNode("r1")["subItems"][2]["subItems"].append(node("deep"))
+    index = model.ensureIndex("deep")
+    assert model.uidOf(index) == "deep"
+    assert model.uidOf(index.parent()) == "c"
+
+
+def test_decoration_icon_is_cached(model):
+    model.fetchMore(QModelIndex())
+    r1, r2 = model.index(0, 0), model.index(1, 0)
+    icon = model.data(r1, Qt.ItemDataRole.DecorationRole)
+    assert icon is not None
+    assert model.data(r1, Qt.ItemDataRole.DecorationRole) is icon
+    assert model.data(r2, Qt.ItemDataRole.DecorationRole) is None
@@ -0,0 +1,185 @@
+import pytest
+from PySide6.QtCore import QCoreApplication, Qt
+
+from src.py_qobject import PyQDict, PyQList
+
+
+class Receiver:
+    def __init__(self):
+        self.calls = []
+
+    def slot(self, *args):
+        self.calls.append(args)
+
+
+def test_direct_connection(app):
+    d = PyQDict()
+    receiver = Receiver()
+    d.valueChanged.connect(receiver.slot)
+    d["a"] = 1
+    assert receiver.calls == [()]
+
+
+def test_queued_connection_is_delivered_by_the_event_loop(app):
+    d = PyQDict()
+    receiver = Receiver()
+    d.changed.connect(receiver.slot, Qt.ConnectionType.QueuedConnection)
+    d["a"] = 1
+    assert receiver.calls == []
+    QCoreApplication.processEvents()
+    assert [c[0].path for c in receiver.calls] == ["/a"]
+
+
+def test_unsupported_connection_type_raises(app):
+    d = PyQDict()
+    with pytest.raises(ValueError):
+        d.valueChanged.connect(Receiver().slot, Qt.ConnectionType.BlockingQueuedConnection)
+
+
+def test_unique_connection(app):
+    d = PyQDict()
+    receiver = Receiver()
+    assert d.valueChanged.connect(receiver.slot, Qt.ConnectionType.UniqueConnection)
+    assert not d.valueChanged.connect(receiver.slot, Qt.ConnectionType.UniqueConnection)
+    d["a"] = 1
+    assert len(receiver.calls) == 1
+
+
+def test_dead_receiver_is_dropped(app):
+    d = PyQDict()
+    receiver = Receiver()
+    d.valueChanged.connect(receiver.slot)
+    del receiver
+    d["a"] = 1
+    assert d.valueChanged._slots == []
+
+
+def test_batch_reports_one_change_with_paths(app):
+    root = PyQDict()
+    items = PyQList()
+    root["subItems"] = items
+    seen = []
+    root.changed.connect(seen.append)
+    with root.batch():
+        root["name"] = "a"
+        items.append(1)
+    assert len(seen) == 1 and seen[0].op == "batch"
+    assert seen[0].paths() == ["/name", "/subItems/-"]
+
+
+def test_about_to_be_removed_sees_the_element(app):
+    lst = PyQList()
+    lst.append("a")
+    lst.append("b")
+    seen = []
+    lst.elementAboutToBeRemoved.connect(lambda i: seen.append((i, list(lst.list))))
+    lst.remove("a")
+    lst.pop()
+    assert seen == [(0, ["a", "b"]), (0, ["b"])]
+
+
+def test_replace_list_without_adopting(app):
+    owner = PyQList()
+    d = PyQDict(name="a")
+    owner.append(d)
+    view = PyQList()
+    seen = []
+    view.changed.connect(seen.append)
+    view.replaceList([d], adopt=False)
+    assert d.owner() is owner
+    assert [c.op for c in seen] == ["replace"]
+    view.replaceList([], adopt=False)
+    assert d.owner() is owner
+
+
+def test_paths_follow_removals_and_moves(app):
+    root = PyQDict()
+    records = []
+    root.setRecorder(lambda op, path, value: records.append(path))
+    a, b = PyQList(), PyQList()
+    root["a"], root["b"] = a, b
+    x, y, z = PyQDict(), PyQDict(), PyQDict()
+    for d in (x, y, z):
+        a.append(d)
+    a.remove(x)
+    z["v"] = 1
+    b.append(y)
+    a.remove(y)
+    y["v"] = 2
+    a[0] = PyQDict()
+    a[-1]["v"] = 3
+    assert [r for r in records if r.endswith("/v")] == ["/a/1/v", "/b/0/v", "/a/0/v"]
+    assert z.path() is None and y.path() == "/b/0"
+
+
+def test_batch_emits_value_changed_once_and_nests(app):
+    root = PyQDict()
+    items = PyQList()
+    root["subItems"] = items
+    rootChanges, itemChanges, values = [], [], []
+    root.changed.connect(rootChanges.append)
+    items.changed.connect(itemChanges.append)
+    root.valueChanged.connect(lambda: values.append(1))
+    with root.batch():
+        root["name"] = "a"
+        with items.batch():
+            items.append(1)
+            items.append(2)
+        root["name"] = "b"
+    assert values == [1]
+    assert [c.op for c in itemChanges] == ["batch"]
+    assert itemChanges[0].paths() == ["/-", "/-"]
+    assert [c.op for c in rootChanges] == ["batch"]
+    assert rootChanges[0].paths() == ["/name", "/subItems/-", "/subItems/-", "/name"]
+
+
+def test_empty_batch_is_not_reported(app):
+    root = PyQDict()
+    seen = []
+    root.changed.connect(seen.append)
+    with root.batch():
+        pass
+    assert seen == []
+
+
+def test_changes_carry_old_and_new_values(app):
+    root = PyQDict()
+    items = PyQList()
+    root["subItems"] = items
+    seen = []
+    root.changed.connect(seen.append)
+    root["name"] = "a"
+    root["name"] = "b"
+    items.append("x")
+    items[0] = "y"
+    items.pop()
+    assert [(c.op, c.path, c.old, c.new) for c in seen] == [
+        ("add", "/name", None, "a"),
+        ("replace", "/name", "a", "b"),
+        ("add", "/subItems/-", None, "x"),
+        ("replace", "/subItems/0", "x", "y"),
+        ("remove", "/subItems/0", "y", None),
+    ]
+    assert all(c.source is items for c in seen[2:])
+
+
+def test_factory_converts_elements_on_first_access(app):
+    calls = []
+
+    def factory(raw, owner):
+        calls.append(raw["name"])
+        node = PyQDict(**raw)
+        node._owner = owner
+        return node
+
+    items = PyQList()
+    items.setFactory(factory)
+    items.replaceList([{"name": "a"}, {"name": "b"}])
+    assert all(type(v) is dict for v in items.list)
+    first = items[0]
+    assert isinstance(first, PyQDict) and items[0] is first
+    assert first.owner() is items and first._key == 0
+    assert calls == ["a"]
+    assert [v["name"] for v in items] == ["a", "b"]
+    assert calls == ["a", "b"]
+    assert all(isinstance(v, PyQDict) for v in items.list)
@@ -0,0 +1,27 @@
+from src.utils import scheduler as schedulerModule
+from src.utils.scheduler import DumpScheduler
+
+
+class Storage:
+    pass
+
+
+def test_delay_is_rounded_up(app, monkeypatch):
+    s = DumpScheduler()
+    s._pending[Storage()] = [0.0, 0.0]
+    monkeypatch.setattr(s, "_deadline", lambda entry: 10.0)
+    monkeypatch.setattr(schedulerModule.time, "monotonic", lambda: 10.0 - 0.0004)
+    s._restartTimer()
+    assert s._timer.interval() == 1
+    monkeypatch.setattr(schedulerModule.time, "monotonic", lambda: 10.0 - 0.0101)
+    s._restartTimer()
+    assert s._timer.interval() == 11
+
+
+def test_due_deadline_never_restarts_with_zero(app, monkeypatch):
+    s = DumpScheduler()
+    s._pending[Storage()] = [0.0, 0.0]
+    monkeypatch.setattr(s, "_deadline", lambda entry: 10.0)
+    monkeypatch.setattr(schedulerModule.time, "monotonic", lambda: 11.0)
+    s._restartTimer()
+    assert s._timer.interval() >= 1
@@ -0,0 +1,49 @@
+from src.utils.search_index import SearchIndex, iconTag
+
+
+def makeIndex(*names):
+    index = SearchIndex()
+    for i, name in enumerate(names):
+        index.add(str(i), name, "")
+    return index
+
+
+def test_icon_tag():
+    assert iconTag("OMT-go_to_work") == "go to work"
+    assert iconTag("") == ""
+
+
+def test_prefix_before_word_before_infix():
+    index = makeIndex("homework", "read book", "daily work", "work out")
+    assert index.search("work") == ["3", "2", "0"]
+
+
+def test_shorter_text_first_within_a_rank():
+    index = makeIndex("workshop tools", "workshop", "work")
+    assert index.search("work") == ["2", "1", "0"]
+
+
+def test_short_queries_match_word_starts():
+    index = makeIndex("read book", "bread", "run")
+    assert index.search("r") == ["2", "0"]
+    assert index.search("bo") == ["0"]
+
+
+def test_icon_is_searched():
+    index = SearchIndex()
+    index.add("a", "monday", "OMT-go_to_work")
+    assert index.search("go to") == ["a"]
+
+
+def test_limit_and_remove():
+    index = makeIndex("a1 work", "a2 work", "a3 work")
+    assert len(index.search("work", limit=2)) == 2
+    index.remove("1")
+    assert sorted(index.search("work")) == ["0", "2"]
+    assert len(index) == 2
+
+
+def test_fuzzy_appends_similar_texts():
+    index = makeIndex("programming", "programing notes")
+    assert index.search("programming") == ["0"]
+    assert index.search("programming", fuzzy=True) == ["0", "1"]
@@ -0,0 +1,20 @@
+import pytest
+
+from src.utils.serializer import SERIALIZERS
+
+DOC = {"name": "项目", "subItems": [{"hours": 1.5, "uid": "a"}], "empty": []}
+
+
+@pytest.mark.parametrize("name", sorted(SERIALIZERS))
+def test_round_trip(name):
+    serializer = SERIALIZERS[name]()
+    for pretty in (False, True):
+        assert serializer.loads(serializer.dumps(DOC, pretty=pretty)) == DOC
+
+
+def test_backends_write_the_same_bytes():
+    if "orjson" not in SERIALIZERS:
+        pytest.skip("orjson is not installed")
+    json, orjson = SERIALIZERS["json"](), SERIALIZERS["orjson"]()
+    assert json.dumps(DOC) == orjson.dumps(DOC)
+    assert json.dumps(DOC, pretty=True) == orjson.dumps(DOC, pretty=True)
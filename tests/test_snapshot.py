@@ -0,0 +1,39 @@
+from src.utils.file import JsonDataStorage
+from src.utils.snapshot import SnapshotCache
+
+
+def makeStorage(tmp_path, name):
+    storage = JsonDataStorage(str(tmp_path / f"{name}.json"))
+    storage.create({"name": name, "icon": "", "hours": 0.0, "uid": name, "breakTime": 0.0, "subItems": []})
+    return storage
+
+
+def test_save_skips_unchanged_storages(app, tmp_path, monkeypatch):
+    a, b = makeStorage(tmp_path, "a"), makeStorage(tmp_path, "b")
+    cache = SnapshotCache(str(tmp_path / "snapshot.pickle"))
+    assert cache.save([a, b])
+    assert not cache.save([a, b])
+
+    copied = []
+    import src.utils.snapshot as snapshot
+    original = snapshot.pyQDictToDictCopy
+    monkeypatch.setattr(snapshot, "pyQDictToDictCopy", lambda d: copied.append(d["uid"]) or original(d))
+    a.dict["hours"] = 1.0
+    a.dumpNow(wait=True)
+    assert a.hasSidecar()
+    assert cache.save([a, b])
+    assert copied == ["a"]
+    assert not a.hasSidecar()
+
+    reloaded = SnapshotCache(cache.path)
+    assert reloaded.load() == 2
+    assert reloaded.lookup(a)["hours"] == 1.0
+    assert reloaded.lookup(b)["name"] == "b"
+
+
+def test_removed_storage_rewrites_the_snapshot(app, tmp_path):
+    a, b = makeStorage(tmp_path, "a"), makeStorage(tmp_path, "b")
+    cache = SnapshotCache(str(tmp_path / "snapshot.pickle"))
+    cache.save([a, b])
+    assert cache.save([a])
+    assert SnapshotCache(cache.path).load() == 1